@@ -0,0 +1,235 @@
+"""
+Lithium Control Center - Realtime Event Hub
+Fans out per-guild Redis pub/sub events to local SSE subscribers.
+
+Each API process holds one pub/sub connection and subscribes to
+``guild:{id}:events`` only while it has at least one viewer for that guild,
+so Redis load is independent of the number of connected dashboards.
+After the last viewer leaves, the channel and its replay buffer are kept for
+a short grace period so a reconnecting tab can still resume.
+"""
+import asyncio
+import json
+import os
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, Optional, Set, Tuple
+
+import redis.asyncio as redis_async
+import structlog
+
+from lithium_core.utils.guild_events import guild_events_channel
+
+logger = structlog.get_logger()
+
+HEARTBEAT_FRAME = ": ping\n\n"
+
+
+class Subscription:
+    """A single SSE client with a bounded frame queue"""
+
+    __slots__ = ("guild_id", "queue", "dropped")
+
+    def __init__(self, guild_id: str, maxsize: int):
+        self.guild_id = guild_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def push(self, frame: str) -> None:
+        """Enqueue a frame, dropping the oldest one if the client is lagging"""
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+            except asyncio.QueueEmpty:
+                pass
+        self.queue.put_nowait(frame)
+
+    async def frames(self, heartbeat_interval: float) -> AsyncIterator[str]:
+        """Yield queued frames, or a heartbeat comment when idle"""
+        while True:
+            try:
+                yield await asyncio.wait_for(self.queue.get(), timeout=heartbeat_interval)
+            except asyncio.TimeoutError:
+                yield HEARTBEAT_FRAME
+
+
+class GuildEventHub:
+    """Process-wide fan-out of guild events to SSE subscribers"""
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        queue_size: int = 100,
+        replay_size: int = 200,
+        heartbeat_interval: float = 15.0,
+        replay_grace: float = 60.0
+    ):
+        self.redis_url = redis_url or os.getenv("REDIS_URL", "redis://redis:6379/0")
+        self.queue_size = queue_size
+        self.replay_size = replay_size
+        self.heartbeat_interval = heartbeat_interval
+        self.replay_grace = replay_grace
+
+        # An empty set means the guild is in its grace period
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        # Recent (event_id, frame) pairs per guild for Last-Event-ID resume
+        self._replay: Dict[str, Deque[Tuple[int, str]]] = {}
+        # guild_id -> pending release of an idle guild
+        self._releases: Dict[str, asyncio.Task] = {}
+        self._redis = None
+        self._pubsub = None
+        self._reader: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    # ============================================
+    # Subscription Management
+    # ============================================
+
+    async def subscribe(self, guild_id: str, last_event_id: Optional[str] = None) -> Tuple[Subscription, bool]:
+        """
+        Register a subscriber for a guild.
+        Returns the subscription and whether Last-Event-ID could be fully resumed;
+        when it could not, the caller should send a fresh snapshot.
+        """
+        sub = Subscription(guild_id, self.queue_size)
+        async with self._lock:
+            if self._pubsub is None:
+                self._redis = redis_async.from_url(self.redis_url)
+                self._pubsub = self._redis.pubsub()
+
+            release = self._releases.pop(guild_id, None)
+            if release:
+                release.cancel()
+            if guild_id not in self._subscribers:
+                await self._pubsub.subscribe(guild_events_channel(guild_id))
+                self._subscribers[guild_id] = set()
+            self._subscribers[guild_id].add(sub)
+
+            if self._reader is None or self._reader.done():
+                self._reader = asyncio.create_task(self._read_loop())
+
+        return sub, self._replay_into(sub, last_event_id)
+
+    async def unsubscribe(self, sub: Subscription) -> None:
+        """Remove a subscriber; the guild channel is dropped after the grace period"""
+        async with self._lock:
+            subscribers = self._subscribers.get(sub.guild_id)
+            if not subscribers:
+                return
+            subscribers.discard(sub)
+            if not subscribers and sub.guild_id not in self._releases:
+                self._releases[sub.guild_id] = asyncio.create_task(self._release_later(sub.guild_id))
+
+        if sub.dropped:
+            logger.info(f"SSE client for guild {sub.guild_id} dropped {sub.dropped} frames")
+
+    async def _release_later(self, guild_id: str) -> None:
+        """Drop an idle guild's channel and replay buffer once nobody came back"""
+        await asyncio.sleep(self.replay_grace)
+        async with self._lock:
+            if self._releases.get(guild_id) is not asyncio.current_task():
+                return
+            del self._releases[guild_id]
+            if self._subscribers.get(guild_id):
+                return
+            self._subscribers.pop(guild_id, None)
+            self._replay.pop(guild_id, None)
+            try:
+                await self._pubsub.unsubscribe(guild_events_channel(guild_id))
+            except Exception as e:
+                logger.warning(f"Event hub unsubscribe failed: {e}")
+
+    async def close(self) -> None:
+        """Stop the reader and release the Redis connection"""
+        for release in self._releases.values():
+            release.cancel()
+        self._releases.clear()
+        if self._reader:
+            self._reader.cancel()
+            self._reader = None
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            await self._redis.aclose()
+            self._pubsub = None
+            self._redis = None
+        self._subscribers.clear()
+        self._replay.clear()
+
+    def _replay_into(self, sub: Subscription, last_event_id: Optional[str]) -> bool:
+        """Queue buffered events newer than last_event_id"""
+        if not last_event_id:
+            return False
+        try:
+            last_id = int(last_event_id)
+        except ValueError:
+            return False
+
+        buffered = self._replay.get(sub.guild_id)
+        # Resume is exact only if the buffer reaches back to the client's position
+        if not buffered or buffered[0][0] > last_id + 1:
+            return False
+        for event_id, frame in buffered:
+            if event_id > last_id:
+                sub.push(frame)
+        return True
+
+    # ============================================
+    # Redis Reader
+    # ============================================
+
+    async def _read_loop(self) -> None:
+        """Single reader for all subscribed guild channels"""
+        while True:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message and message["type"] == "message":
+                    self._dispatch(message["channel"], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Event hub reader error: {e}")
+                await asyncio.sleep(1)
+                await self._resubscribe()
+
+    async def _resubscribe(self) -> None:
+        """Recreate the pub/sub connection after a Redis failure"""
+        async with self._lock:
+            try:
+                if self._pubsub is not None:
+                    await self._pubsub.aclose()
+                self._pubsub = self._redis.pubsub()
+                channels = [guild_events_channel(gid) for gid in self._subscribers]
+                if channels:
+                    await self._pubsub.subscribe(*channels)
+            except Exception as e:
+                logger.warning(f"Event hub resubscribe failed: {e}")
+
+    def _dispatch(self, channel, raw) -> None:
+        """Push one Redis message to every local subscriber of its guild"""
+        if isinstance(channel, bytes):
+            channel = channel.decode()
+        if isinstance(raw, bytes):
+            raw = raw.decode()
+
+        # guild:{id}:events
+        guild_id = channel.split(":")[1]
+        subscribers = self._subscribers.get(guild_id)
+        # Idle guilds in their grace period still buffer for resume
+        if subscribers is None:
+            return
+
+        try:
+            event_id = int(json.loads(raw)["id"])
+        except (ValueError, KeyError, TypeError):
+            logger.warning(f"Malformed guild event on {channel}")
+            return
+
+        frame = f"id: {event_id}\ndata: {raw}\n\n"
+        replay = self._replay.setdefault(guild_id, deque(maxlen=self.replay_size))
+        replay.append((event_id, frame))
+
+        for sub in subscribers:
+            sub.push(frame)
+
+
+event_hub = GuildEventHub()
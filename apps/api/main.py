@@ -47,6 +47,11 @@ app.include_router(guilds.router)
 app.include_router(modules.router)
 app.include_router(guilds_v2.router)
 
+@app.on_event("shutdown")
+async def close_event_hub():
+    from apps.api.event_hub import event_hub
+    await event_hub.close()
+
 @app.get("/health")
 @limiter.limit("5/minute")
 async def health_check(request: Request, db: AsyncSession = Depends(get_db)):
@@ -2,7 +2,7 @@
 Lithium Control Center - Production API Router
 Standardized endpoints for dashboard, moderation, tickets, analytics, settings
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Header
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text, func
@@ -16,6 +16,9 @@ import uuid
 from apps.api.auth import get_me, User
 from apps.api.db import get_db
 from apps.api.redis_client import get_redis
+from apps.api.event_hub import event_hub
+from lithium_core.utils.pagination import encode_cursor, decode_cursor
+from lithium_core.utils.bot_status import get_guild_heartbeat
 import structlog
 
 logger = structlog.get_logger()
@@ -132,6 +135,47 @@ class GuildSettings(BaseModel):
     notify_on_ban: bool = True
 
 
+# ============================================
+# Pagination Helpers
+# ============================================
+
+def _apply_cursor(query: str, params: dict, cursor: Optional[str]) -> str:
+    """Append the keyset predicate for a (created_at, id) cursor"""
+    if not cursor:
+        return query
+    try:
+        cursor_ts, cursor_id = decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    params["cursor_ts"] = cursor_ts
+    params["cursor_id"] = cursor_id
+    return query + " AND (created_at, id) < (:cursor_ts, :cursor_id)"
+
+
+def _next_cursor(rows: list, limit: int, id_idx: int, created_idx: int) -> Optional[str]:
+    """Cursor for the page after `rows` (fetched with LIMIT limit + 1), or None on the last page"""
+    if len(rows) <= limit:
+        return None
+    last = rows[limit - 1]
+    if not last[created_idx]:
+        return None
+    return encode_cursor(last[created_idx], last[id_idx])
+
+
+async def _approximate_total(db: AsyncSession, table: str, guild_id: str) -> Optional[int]:
+    """Unfiltered row count from the trigger-maintained listing_counters table"""
+    try:
+        result = await db.execute(
+            text("SELECT row_count FROM listing_counters WHERE guild_id = :gid AND table_name = :table"),
+            {"gid": guild_id, "table": table}
+        )
+        return result.scalar() or 0
+    except Exception as e:
+        logger.warning(f"Listing counter error: {e}")
+        await db.rollback()
+        return None
+
+
 # ============================================
 # Dashboard Endpoint
 # ============================================
@@ -206,7 +250,7 @@ async def get_dashboard(guild_id: str, user: User = Depends(get_me), db: AsyncSe
     try:
         r = await get_redis()
         # Bot status
-        heartbeat = await r.get(f"bot:heartbeat:{guild_id}")
+        heartbeat = await get_guild_heartbeat(r, guild_id)
         bot_status = "online" if heartbeat else "offline"
         system_status.append(ServiceStatus(name="Bot", status=bot_status))
         
@@ -287,24 +331,37 @@ async def get_moderation_overview(
     status: Optional[str] = None,
     page: int = 1,
     limit: int = 20,
+    cursor: Optional[str] = None,
     user: User = Depends(get_me),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get moderation cases, warnings, and active punishments"""
+    """
+    Get moderation cases, warnings, and active punishments.
+    Pass `cursor` (from a previous `next_cursor`) for keyset pagination on large guilds;
+    otherwise `page` is used.
+    """
     offset = (page - 1) * limit
     
     cases = []
+    next_cursor = None
     try:
         query = """
             SELECT id, case_id, action_type, user_id, moderator_id, reason, active, duration, created_at
             FROM moderation_cases WHERE guild_id = :gid
         """
+        params = {"gid": guild_id, "limit": limit + 1}
         if status == "active":
             query += " AND active = true"
-        query += " ORDER BY created_at DESC LIMIT :limit OFFSET :offset"
+        query = _apply_cursor(query, params, cursor)
+        query += " ORDER BY created_at DESC, id DESC LIMIT :limit"
+        if not cursor:
+            query += " OFFSET :offset"
+            params["offset"] = offset
         
-        result = await db.execute(text(query), {"gid": guild_id, "limit": limit, "offset": offset})
-        for row in result.fetchall():
+        result = await db.execute(text(query), params)
+        rows = result.fetchall()
+        next_cursor = _next_cursor(rows, limit, id_idx=0, created_idx=8)
+        for row in rows[:limit]:
             cases.append(ModerationCase(
                 id=row[0],
                 case_id=row[1],
@@ -316,16 +373,28 @@ async def get_moderation_overview(
                 duration=row[7],
                 created_at=row[8].isoformat() if row[8] else ""
             ))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Moderation query error: {e}")
     
+    if cursor:
+        # Deep pages: approximate total from the maintained counter (unfiltered only)
+        total = None if status == "active" else await _approximate_total(db, "moderation_cases", guild_id)
+        return ApiResponse(data={
+            "items": [c.model_dump() for c in cases],
+            "total": total,
+            "total_approximate": True,
+            "next_cursor": next_cursor
+        })
+    
     # Get total count
     total = 0
     try:
-        result = await db.execute(
-            text("SELECT COUNT(*) FROM moderation_cases WHERE guild_id = :gid"),
-            {"gid": guild_id}
-        )
+        count_query = "SELECT COUNT(*) FROM moderation_cases WHERE guild_id = :gid"
+        if status == "active":
+            count_query += " AND active = true"
+        result = await db.execute(text(count_query), {"gid": guild_id})
         total = result.scalar() or 0
     except:
         pass
@@ -334,7 +403,8 @@ async def get_moderation_overview(
         "items": [c.model_dump() for c in cases],
         "total": total,
         "page": page,
-        "pages": (total // limit) + (1 if total % limit else 0) or 1
+        "pages": (total // limit) + (1 if total % limit else 0) or 1,
+        "next_cursor": next_cursor
     })
 
 
@@ -375,25 +445,33 @@ async def get_tickets(
     status: Optional[str] = None,
     page: int = 1,
     limit: int = 20,
+    cursor: Optional[str] = None,
     user: User = Depends(get_me),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get ticket list with optional status filter"""
+    """Get ticket list with optional status filter (page or keyset `cursor` pagination)"""
     offset = (page - 1) * limit
     
     tickets = []
+    next_cursor = None
     try:
         query = "SELECT id, channel_id, owner_id, status, category, created_at FROM tickets WHERE guild_id = :gid"
         if status:
             query += f" AND status = :status"
-        query += " ORDER BY created_at DESC LIMIT :limit OFFSET :offset"
         
-        params = {"gid": guild_id, "limit": limit, "offset": offset}
+        params = {"gid": guild_id, "limit": limit + 1}
         if status:
             params["status"] = status.upper()
+        query = _apply_cursor(query, params, cursor)
+        query += " ORDER BY created_at DESC, id DESC LIMIT :limit"
+        if not cursor:
+            query += " OFFSET :offset"
+            params["offset"] = offset
         
         result = await db.execute(text(query), params)
-        for row in result.fetchall():
+        rows = result.fetchall()
+        next_cursor = _next_cursor(rows, limit, id_idx=0, created_idx=5)
+        for row in rows[:limit]:
             # Get message count
             msg_result = await db.execute(
                 text("SELECT COUNT(*) FROM ticket_messages WHERE ticket_id = :tid"),
@@ -410,6 +488,8 @@ async def get_tickets(
                 messages_count=msg_count,
                 created_at=row[5].isoformat() if row[5] else ""
             ))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Tickets query error: {e}")
     
@@ -428,7 +508,8 @@ async def get_tickets(
     return ApiResponse(data={
         "items": [t.model_dump() for t in tickets],
         "counts": counts,
-        "page": page
+        "page": page,
+        "next_cursor": next_cursor
     })
 
 
@@ -464,34 +545,48 @@ async def get_audit_logs(
     to_date: Optional[str] = None,
     page: int = 1,
     limit: int = 50,
+    cursor: Optional[str] = None,
     user: User = Depends(get_me),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get audit logs with filters"""
+    """
+    Get audit logs with filters.
+    Pass `cursor` (from a previous `next_cursor`) for keyset pagination on large guilds;
+    otherwise `page` is used.
+    """
     offset = (page - 1) * limit
     
     logs = []
+    next_cursor = None
+    filters = ""
+    params = {"gid": guild_id}
     try:
         query = "SELECT id, user_id, action, target, changes, created_at FROM audit_logs WHERE guild_id = :gid"
-        params = {"gid": guild_id, "limit": limit, "offset": offset}
         
         if action:
-            query += " AND action = :action"
+            filters += " AND action = :action"
             params["action"] = action
         if actor:
-            query += " AND user_id = :actor"
+            filters += " AND user_id = :actor"
             params["actor"] = actor
         if from_date:
-            query += " AND created_at >= :from_date"
+            filters += " AND created_at >= :from_date"
             params["from_date"] = from_date
         if to_date:
-            query += " AND created_at <= :to_date"
+            filters += " AND created_at <= :to_date"
             params["to_date"] = to_date
         
-        query += " ORDER BY created_at DESC LIMIT :limit OFFSET :offset"
+        page_params = {**params, "limit": limit + 1}
+        query = _apply_cursor(query + filters, page_params, cursor)
+        query += " ORDER BY created_at DESC, id DESC LIMIT :limit"
+        if not cursor:
+            query += " OFFSET :offset"
+            page_params["offset"] = offset
         
-        result = await db.execute(text(query), params)
-        for row in result.fetchall():
+        result = await db.execute(text(query), page_params)
+        rows = result.fetchall()
+        next_cursor = _next_cursor(rows, limit, id_idx=0, created_idx=5)
+        for row in rows[:limit]:
             logs.append(AuditLogEntry(
                 id=row[0],
                 actor_id=row[1] or "",
@@ -501,13 +596,36 @@ async def get_audit_logs(
                 diff_json=row[4] if isinstance(row[4], dict) else None,
                 created_at=row[5].isoformat() if row[5] else ""
             ))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Audit logs query error: {e}")
     
+    if cursor:
+        # Deep pages: approximate total from the maintained counter (unfiltered only)
+        total = None if filters else await _approximate_total(db, "audit_logs", guild_id)
+        return ApiResponse(data={
+            "items": [l.model_dump() for l in logs],
+            "total": total,
+            "total_approximate": True,
+            "next_cursor": next_cursor
+        })
+    
+    total = 0
+    try:
+        result = await db.execute(
+            text("SELECT COUNT(*) FROM audit_logs WHERE guild_id = :gid" + filters),
+            params
+        )
+        total = result.scalar() or 0
+    except Exception as e:
+        logger.warning(f"Audit logs count error: {e}")
+    
     return ApiResponse(data={
         "items": [l.model_dump() for l in logs],
         "page": page,
-        "total": len(logs)
+        "total": total,
+        "next_cursor": next_cursor
     })
 
 
@@ -683,43 +801,51 @@ async def update_settings(
 # ============================================
 
 @router.get("/events")
-async def event_stream(guild_id: str, user: User = Depends(get_me)):
-    """Server-Sent Events for real-time updates"""
+async def event_stream(
+    guild_id: str,
+    user: User = Depends(get_me),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID")
+):
+    """Server-Sent Events for real-time updates (pushed by the bot via Redis pub/sub)"""
+    
+    async def snapshot() -> str:
+        """Current stats, sent on connect when there is nothing to resume from"""
+        r = await get_redis()
+        try:
+            members_raw, today, week = await r.mget(
+                f"guild:stats:{guild_id}:members",
+                f"guild:stats:{guild_id}:messages:today",
+                f"guild:stats:{guild_id}:messages:week"
+            )
+            heartbeat = await get_guild_heartbeat(r, guild_id)
+        finally:
+            await r.aclose()
+        
+        event_data = {
+            "type": "stats_update",
+            "data": {
+                "members": json.loads(members_raw) if members_raw else {"total": 0, "online": 0},
+                "messages": {"today": int(today or 0), "week": int(week or 0)},
+                "bot_status": "online" if heartbeat else "offline"
+            }
+        }
+        return f"data: {json.dumps(event_data)}\n\n"
     
     async def generate():
-        while True:
-            try:
-                r = await get_redis()
-                
-                # Get latest stats
-                members_raw = await r.get(f"guild:stats:{guild_id}:members")
-                members = json.loads(members_raw) if members_raw else {"total": 0, "online": 0}
-                
-                messages_raw = await r.get(f"guild:stats:{guild_id}:messages")
-                messages = json.loads(messages_raw) if messages_raw else {"today": 0, "week": 0}
-                
-                # Check bot heartbeat
-                heartbeat = await r.get(f"bot:heartbeat:{guild_id}")
-                bot_status = "online" if heartbeat else "offline"
-                
-                await r.aclose()
-                
-                event_data = {
-                    "type": "stats_update",
-                    "data": {
-                        "members": members,
-                        "messages": messages,
-                        "bot_status": bot_status
-                    }
-                }
-                
-                yield f"data: {json.dumps(event_data)}\n\n"
-                
-            except Exception as e:
-                logger.error(f"SSE error: {e}")
-                yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+        subscription, resumed = await event_hub.subscribe(guild_id, last_event_id)
+        try:
+            yield "retry: 3000\n\n"
+            if not resumed:
+                try:
+                    yield await snapshot()
+                except Exception as e:
+                    logger.error(f"SSE snapshot error: {e}")
+                    yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
             
-            await asyncio.sleep(10)
+            async for frame in subscription.frames(event_hub.heartbeat_interval):
+                yield frame
+        finally:
+            await event_hub.unsubscribe(subscription)
     
     return StreamingResponse(
         generate(),
@@ -727,5 +853,6 @@ async def event_stream(guild_id: str, user: User = Depends(get_me)):
         headers={
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
         }
     )
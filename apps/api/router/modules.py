@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, text
 from lithium_core.database.session import get_db
 from lithium_core.models import User, OAuthSession
+from lithium_core.utils.bot_status import get_guild_heartbeat
 from .auth import get_me
 from pydantic import BaseModel
 from typing import Optional, Any, List, Dict
@@ -653,12 +654,11 @@ async def get_system_status(guild_id: str, request: Request, user: User = Depend
     # Bot Status - Check via Redis pub/sub heartbeat or guild cache
     try:
         r = await get_redis()
-        bot_heartbeat = await r.get(f"bot:heartbeat:{guild_id}")
+        bot_heartbeat = await get_guild_heartbeat(r, guild_id)
         await r.aclose()
         if bot_heartbeat:
             # Check if heartbeat is recent (within last 60 seconds)
-            last_beat = datetime.fromisoformat(bot_heartbeat.decode())
-            if (datetime.utcnow() - last_beat).total_seconds() < 60:
+            if datetime.now().timestamp() - bot_heartbeat < 60:
                 services.insert(0, ServiceStatus(name="Bot", status="online", latency_ms=None))
             else:
                 services.insert(0, ServiceStatus(name="Bot", status="degraded", latency_ms=None))
@@ -0,0 +1,137 @@
+"""
+Lithium Bot - Cluster Launcher
+Runs the bot as N processes, each an AutoShardedBot over a contiguous slice
+of shard ids, so gateway traffic is spread across cores.
+
+    CLUSTER_COUNT=4 python apps/bot/cluster.py
+
+SHARD_COUNT overrides the shard count recommended by Discord. Cluster i
+serves /health on HEALTH_PORT + i. Crashed clusters are restarted with backoff.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from typing import List, Tuple
+
+import aiohttp
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Add project root to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("lithium-bot")
+
+GATEWAY_URL = "https://discord.com/api/v10/gateway/bot"
+
+
+def split_shards(shard_count: int, cluster_count: int) -> List[List[int]]:
+    """Split shard ids into contiguous, evenly sized slices (one per cluster)"""
+    cluster_count = max(1, min(cluster_count, shard_count))
+    base, extra = divmod(shard_count, cluster_count)
+    slices, start = [], 0
+    for i in range(cluster_count):
+        size = base + (1 if i < extra else 0)
+        slices.append(list(range(start, start + size)))
+        start += size
+    return slices
+
+
+async def fetch_gateway_info(token: str) -> Tuple[int, int]:
+    """Recommended shard count and identify max_concurrency for this token"""
+    async with aiohttp.ClientSession() as session:
+        async with session.get(GATEWAY_URL, headers={"Authorization": f"Bot {token}"}) as resp:
+            resp.raise_for_status()
+            data = await resp.json()
+    return data["shards"], data["session_start_limit"]["max_concurrency"]
+
+
+def run_cluster(cluster_id: int, shard_ids: List[int], shard_count: int, max_concurrency: int):
+    """Process entry point for a single cluster"""
+    from apps.bot.main import main
+
+    logger.info(f"Cluster {cluster_id} starting with shards {shard_ids[0]}-{shard_ids[-1]}")
+    try:
+        asyncio.run(main(
+            shard_ids=shard_ids,
+            shard_count=shard_count,
+            cluster_id=cluster_id,
+            max_concurrency=max_concurrency
+        ))
+    except KeyboardInterrupt:
+        pass
+
+
+class ClusterLauncher:
+    """Spawns and supervises cluster processes"""
+
+    def __init__(self, shard_count: int, cluster_count: int, max_concurrency: int):
+        self.shard_count = shard_count
+        self.max_concurrency = max_concurrency
+        self.slices = split_shards(shard_count, cluster_count)
+        self.ctx = multiprocessing.get_context("spawn")
+        self.processes = {}
+        self.restarts = {}
+        self.stopping = False
+
+    def start_cluster(self, cluster_id: int):
+        process = self.ctx.Process(
+            target=run_cluster,
+            args=(cluster_id, self.slices[cluster_id], self.shard_count, self.max_concurrency),
+            name=f"lithium-cluster-{cluster_id}"
+        )
+        process.start()
+        self.processes[cluster_id] = process
+
+    def stop(self, *_):
+        self.stopping = True
+        for process in self.processes.values():
+            if process.is_alive():
+                process.terminate()
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        logger.info(f"Launching {len(self.slices)} clusters for {self.shard_count} shards")
+        for cluster_id in range(len(self.slices)):
+            self.start_cluster(cluster_id)
+
+        while not self.stopping:
+            time.sleep(5)
+            for cluster_id, process in list(self.processes.items()):
+                if process.is_alive() or self.stopping:
+                    continue
+                self.restarts[cluster_id] = self.restarts.get(cluster_id, 0) + 1
+                delay = min(60, 5 * self.restarts[cluster_id])
+                logger.error(f"Cluster {cluster_id} exited with code {process.exitcode}, restarting in {delay}s")
+                time.sleep(delay)
+                if not self.stopping:
+                    self.start_cluster(cluster_id)
+
+        for process in self.processes.values():
+            process.join(timeout=30)
+        logger.info("All clusters stopped.")
+
+
+def main():
+    token = os.getenv("DISCORD_TOKEN")
+    if not token:
+        logger.error("DISCORD_TOKEN not found in environment!")
+        return
+
+    recommended, max_concurrency = asyncio.run(fetch_gateway_info(token))
+    shard_count = int(os.getenv("SHARD_COUNT", recommended))
+    cluster_count = int(os.getenv("CLUSTER_COUNT", os.cpu_count() or 1))
+
+    ClusterLauncher(shard_count, cluster_count, max_concurrency).run()
+
+
+if __name__ == "__main__":
+    main()
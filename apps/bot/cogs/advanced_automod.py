@@ -7,29 +7,34 @@ Gelişmiş AutoMod Sistemi
 - Sesli Kanal Koruması (Mic Spam)
 """
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
 from lithium_core.database.session import AsyncSessionLocal
 from lithium_core.models import Guild
 from lithium_core.models.security import (
     AutoModConfig, BadWordFilter, TempMute, VoiceSpamLog
 )
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, update
+from apps.bot.utils.concurrency import gather_limited
+from apps.bot.utils.voice_spam import VoiceJoinTracker, MAX_THRESHOLD
+from apps.bot.utils.timer_scheduler import retry_at
 import logging
 import re
 import os
+import time
 import redis.asyncio as redis
 from datetime import datetime, timedelta
+from typing import Optional
 
 logger = logging.getLogger("lithium-bot")
 
-
 class AdvancedAutoMod(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.redis = None
-        self.voice_join_cache = {}  # {guild_id-user_id: [timestamps]}
-        self.unmute_checker.start()
+        self.voice_joins = VoiceJoinTracker()
+        # guild_id -> AutoModConfig, or None when automod is off for the guild
+        self.configs = {}
         
         # Varsayılan Türkçe küfür listesi
         self.default_bad_words = [
@@ -40,21 +45,33 @@ class AdvancedAutoMod(commands.Cog):
     async def cog_load(self):
         redis_url = os.getenv("REDIS_URL", "redis://redis:6379/0")
         self.redis = redis.from_url(redis_url)
+        self.bot.timers.register("unmute", self.expire_mutes, self.load_pending_mutes)
 
     def cog_unload(self):
-        self.unmute_checker.cancel()
+        self.bot.timers.unregister("unmute")
 
-    async def get_config(self, guild_id: int) -> AutoModConfig:
-        """AutoMod config al veya varsayılan oluştur"""
-        async with AsyncSessionLocal() as db:
-            stmt = select(AutoModConfig).where(AutoModConfig.guild_id == str(guild_id))
-            config = (await db.execute(stmt)).scalar_one_or_none()
-            if not config:
-                config = AutoModConfig(guild_id=str(guild_id))
-                db.add(config)
-                await db.commit()
-                await db.refresh(config)
-            return config
+    async def get_config(self, guild_id: int) -> Optional[AutoModConfig]:
+        """AutoMod config'i önbellekten al (yoksa varsayılan oluştur); automod kapalıysa None"""
+        if guild_id not in self.configs:
+            async with AsyncSessionLocal() as db:
+                stmt = select(Guild).where(Guild.discord_id == str(guild_id))
+                guild = (await db.execute(stmt)).scalar_one_or_none()
+                config = None
+                if guild and guild.automod_enabled:
+                    stmt = select(AutoModConfig).where(AutoModConfig.guild_id == str(guild_id))
+                    config = (await db.execute(stmt)).scalar_one_or_none()
+                    if not config:
+                        config = AutoModConfig(guild_id=str(guild_id))
+                        db.add(config)
+                        await db.commit()
+                        await db.refresh(config)
+            self.configs[guild_id] = config
+        return self.configs[guild_id]
+
+    @commands.Cog.listener()
+    async def on_guild_config_changed(self, data: dict):
+        if data.get("guild_id"):
+            self.configs.pop(int(data["guild_id"]), None)
 
     async def get_bad_words(self, guild_id: int) -> list:
         """Sunucu için yasaklı kelime listesi al"""
@@ -101,38 +118,78 @@ class AdvancedAutoMod(commands.Cog):
                 )
                 db.add(mute)
                 await db.commit()
+            self.bot.timers.schedule("unmute", mute.id, mute.unmute_at)
             
             return True
         except Exception as e:
             logger.error(f"Mute failed: {e}")
             return False
 
-    @tasks.loop(minutes=1)
-    async def unmute_checker(self):
-        """Süresi dolan mute'ları kaldır"""
+    async def load_pending_mutes(self):
+        """Aktif mute'ların bitiş zamanları (scheduler başlangıcında yüklenir)"""
+        async with AsyncSessionLocal() as db:
+            stmt = select(TempMute.id, TempMute.unmute_at, TempMute.guild_id).where(TempMute.active == True)
+            rows = (await db.execute(stmt)).all()
+        # Other clusters expire their own guilds' mutes
+        return [(mute_id, unmute_at) for mute_id, unmute_at, guild_id in rows if self.bot.owns_guild(guild_id)]
+
+    def retry_unmute(self, mute_id: int, unmute_at: datetime, now: datetime) -> bool:
+        """Artan bekleme ile yeniden dene; çok gecikmişse False"""
+        retry = retry_at(unmute_at, now)
+        if retry is None:
+            logger.warning(f"Giving up on unmute {mute_id}, pending since {unmute_at}")
+            return False
+        self.bot.timers.schedule("unmute", mute_id, retry)
+        return True
+
+    async def expire_mutes(self, mute_ids: list):
+        """Süresi dolan mute'ları toplu olarak kaldır"""
         async with AsyncSessionLocal() as db:
-            stmt = select(TempMute).where(
-                TempMute.active == True,
-                TempMute.unmute_at <= datetime.utcnow()
+            stmt = select(TempMute.id, TempMute.guild_id, TempMute.user_id, TempMute.unmute_at).where(
+                TempMute.id.in_(mute_ids),
+                TempMute.active == True
             )
-            expired_mutes = (await db.execute(stmt)).scalars().all()
+            expired_mutes = (await db.execute(stmt)).all()
+            if not expired_mutes:
+                return
             
-            for mute in expired_mutes:
-                try:
-                    guild = self.bot.get_guild(int(mute.guild_id))
-                    if guild:
-                        member = guild.get_member(int(mute.user_id))
-                        if member and member.is_timed_out():
-                            await member.timeout(None, reason="Mute süresi doldu")
-                    
-                    mute.active = False
-                    await db.commit()
-                except Exception as e:
-                    logger.error(f"Unmute error: {e}")
-
-    @unmute_checker.before_loop
-    async def before_unmute_checker(self):
-        await self.bot.wait_until_ready()
+            handled, pending = [], []
+            now = datetime.utcnow()
+            for mute_id, guild_id, user_id, unmute_at in expired_mutes:
+                if not self.bot.owns_guild(guild_id):
+                    continue
+                guild = self.bot.get_guild(int(guild_id))
+                if not guild:
+                    # Unavailable for now; a guild gone for good is given up on after a day
+                    if not self.retry_unmute(mute_id, unmute_at, now):
+                        handled.append(mute_id)
+                    continue
+                member = guild.get_member(int(user_id))
+                if member and member.is_timed_out():
+                    pending.append((mute_id, unmute_at, member))
+                else:
+                    # Left the guild or already unmuted
+                    handled.append(mute_id)
+            
+            results = await gather_limited(
+                member.timeout(None, reason="Mute süresi doldu") for _, _, member in pending
+            )
+            for (mute_id, unmute_at, member), result in zip(pending, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Unmute error for {member}, retrying: {result}")
+                    if not self.retry_unmute(mute_id, unmute_at, now):
+                        handled.append(mute_id)
+                else:
+                    handled.append(mute_id)
+            
+            # Tek toplu güncelleme + commit
+            if handled:
+                await db.execute(
+                    update(TempMute)
+                    .where(TempMute.id.in_(handled), TempMute.active == True)
+                    .values(active=False)
+                )
+                await db.commit()
 
     # ==================== MESAJ FİLTRELERİ ====================
 
@@ -141,14 +198,9 @@ class AdvancedAutoMod(commands.Cog):
         if not message.guild or message.author.bot:
             return
         
-        # Guild config kontrolü
-        async with AsyncSessionLocal() as db:
-            stmt = select(Guild).where(Guild.discord_id == str(message.guild.id))
-            guild = (await db.execute(stmt)).scalar_one_or_none()
-            if not guild or not guild.automod_enabled:
-                return
-
         config = await self.get_config(message.guild.id)
+        if not config:
+            return
         
         # Admin/Mod kontrolü
         if await self.is_immune(message.author, config):
@@ -243,59 +295,37 @@ class AdvancedAutoMod(commands.Cog):
         if before.channel == after.channel:
             return
 
-        async with AsyncSessionLocal() as db:
-            stmt = select(Guild).where(Guild.discord_id == str(member.guild.id))
-            guild_config = (await db.execute(stmt)).scalar_one_or_none()
-            if not guild_config or not guild_config.automod_enabled:
-                return
-
         config = await self.get_config(member.guild.id)
-        
-        if not config.voice_spam_enabled:
+        if not config or not config.voice_spam_enabled:
             return
 
-        key = f"{member.guild.id}-{member.id}"
-        now = datetime.utcnow()
-        
-        # Cache'i güncelle
-        if key not in self.voice_join_cache:
-            self.voice_join_cache[key] = []
-        
-        # Eski kayıtları temizle
-        self.voice_join_cache[key] = [
-            t for t in self.voice_join_cache[key] 
-            if (now - t).seconds < config.voice_spam_interval
-        ]
-        
-        # Yeni kaydı ekle
-        self.voice_join_cache[key].append(now)
-        
-        # Threshold kontrolü
-        if len(self.voice_join_cache[key]) >= config.voice_spam_threshold:
-            try:
-                # Kullanıcıyı sesli kanaldan at
-                await member.move_to(None, reason="Sesli kanal spam koruması")
-                
-                # Kısa süreli mute
-                await self.mute_user(member, 60, "Sesli kanal spam")
-                
-                # Log kaydet
-                async with AsyncSessionLocal() as db:
-                    log = VoiceSpamLog(
-                        guild_id=str(member.guild.id),
-                        user_id=str(member.id),
-                        action_taken="DISCONNECT",
-                        join_count=len(self.voice_join_cache[key])
-                    )
-                    db.add(log)
-                    await db.commit()
-                
-                # Cache temizle
-                self.voice_join_cache[key] = []
-                
-                logger.info(f"Voice spam protection triggered for {member} in {member.guild.name}")
-            except Exception as e:
-                logger.error(f"Voice spam action failed: {e}")
+        # O(1): compares against the oldest of the last `threshold` joins
+        key = (member.guild.id, member.id)
+        if not self.voice_joins.hit(key, time.monotonic(), config.voice_spam_threshold, config.voice_spam_interval):
+            return
+        self.voice_joins.reset(key)
+
+        try:
+            # Kullanıcıyı sesli kanaldan at
+            await member.move_to(None, reason="Sesli kanal spam koruması")
+            
+            # Kısa süreli mute
+            await self.mute_user(member, 60, "Sesli kanal spam")
+            
+            # Log kaydet
+            async with AsyncSessionLocal() as db:
+                log = VoiceSpamLog(
+                    guild_id=str(member.guild.id),
+                    user_id=str(member.id),
+                    action_taken="DISCONNECT",
+                    join_count=config.voice_spam_threshold
+                )
+                db.add(log)
+                await db.commit()
+            
+            logger.info(f"Voice spam protection triggered for {member} in {member.guild.name}")
+        except Exception as e:
+            logger.error(f"Voice spam action failed: {e}")
 
     # ==================== YAPILANDIRMA KOMUTLARI ====================
 
@@ -306,7 +336,8 @@ class AdvancedAutoMod(commands.Cog):
         spam_enabled="Spam koruması",
         spam_threshold="Spam eşiği (mesaj sayısı)",
         link_enabled="Link koruması",
-        bad_words_enabled="Küfür filtresi"
+        bad_words_enabled="Küfür filtresi",
+        voice_spam_threshold=f"Ses spam eşiği (giriş sayısı, en fazla {MAX_THRESHOLD})"
     )
     @app_commands.checks.has_permissions(administrator=True)
     async def automod_config(
@@ -317,7 +348,8 @@ class AdvancedAutoMod(commands.Cog):
         spam_enabled: bool = None,
         spam_threshold: int = None,
         link_enabled: bool = None,
-        bad_words_enabled: bool = None
+        bad_words_enabled: bool = None,
+        voice_spam_threshold: int = None
     ):
         async with AsyncSessionLocal() as db:
             stmt = select(AutoModConfig).where(AutoModConfig.guild_id == str(interaction.guild_id))
@@ -340,9 +372,12 @@ class AdvancedAutoMod(commands.Cog):
                 config.link_enabled = link_enabled
             if bad_words_enabled is not None:
                 config.bad_words_enabled = bad_words_enabled
+            if voice_spam_threshold is not None:
+                config.voice_spam_threshold = max(2, min(MAX_THRESHOLD, voice_spam_threshold))
             
             await db.commit()
             await db.refresh(config)
+        self.configs.pop(interaction.guild_id, None)
 
         # Mevcut ayarları göster
         embed = discord.Embed(
@@ -373,7 +408,7 @@ class AdvancedAutoMod(commands.Cog):
         )
         embed.add_field(
             name="Ses Spam Koruması",
-            value=f"{'✅ Aktif' if config.voice_spam_enabled else '❌ Kapalı'}",
+            value=f"{'✅ Aktif' if config.voice_spam_enabled else '❌ Kapalı'} ({min(config.voice_spam_threshold, MAX_THRESHOLD)} giriş/{config.voice_spam_interval}s)",
             inline=True
         )
         
@@ -457,6 +492,7 @@ class AdvancedAutoMod(commands.Cog):
                 flag_modified(config, "link_whitelist")
                 
                 await db.commit()
+        self.configs.pop(interaction.guild_id, None)
         
         await interaction.response.send_message(
             f"✅ `{domain}` link whitelist'e eklendi.",
@@ -484,6 +520,7 @@ class AdvancedAutoMod(commands.Cog):
                 flag_modified(config, "link_allowed_roles")
                 
                 await db.commit()
+        self.configs.pop(interaction.guild_id, None)
         
         await interaction.response.send_message(
             f"✅ {role.mention} artık link atabilir.",
@@ -1,13 +1,18 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
+import asyncio
 import logging
 import os
 import json
 import redis.asyncio as redis
 from datetime import datetime, timedelta
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, update
 from lithium_core.database.session import AsyncSessionLocal
+from apps.bot.utils.trigger_index import TriggerIndex
+from apps.bot.utils.sticky import StickyCoordinator
+from apps.bot.utils.temp_voice import TempVoiceQueue
+from apps.bot.utils.timer_scheduler import retry_at
 from lithium_core.models import (
     Reminder, StickyMessage, AFKState, AutoResponder, 
     VoiceConfig, StarboardConfig, Guild
@@ -15,109 +20,277 @@ from lithium_core.models import (
 
 logger = logging.getLogger("lithium-bot")
 
+# Per-guild module toggles read from the Guild row (`{module}_enabled`, off by default)
+GUILD_MODULES = ("afk", "auto_responder", "sticky_messages", "starboard")
+
+# Hash of temp voice channel id -> guild id, shared by every bot process
+TEMP_VC_KEY = "temp_vc:channels"
+
+# Star counts live in Redis for a week after the last reaction
+STARBOARD_TTL = 60 * 60 * 24 * 7
+
+# Store the post id and raise (never lower) the count to the fetched reaction count
+STARBOARD_POSTED_LUA = """
+redis.call('HSET', KEYS[1], 'post', ARGV[1])
+local count = tonumber(redis.call('HGET', KEYS[1], 'count') or '0')
+if tonumber(ARGV[2]) > count then
+    count = tonumber(ARGV[2])
+    redis.call('HSET', KEYS[1], 'count', count)
+end
+return count
+"""
+
+
 class AdvancedUtils(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.redis = None
+        # guild_id -> {module: enabled} or None when the guild has no row
+        self.guild_flags = {}
+        # guild_id -> (TriggerIndex, {responder_id: (response, cooldown)})
+        self.responders = {}
+        # guild_id -> AFK user ids
+        self.afk_users = {}
+        self.stickies = StickyCoordinator(self.repost_sticky)
+        # guild_id -> (channel_id, threshold, emoji) or None
+        self.starboard_configs = {}
+        # source message_id -> (starboard channel, post id, count, source channel)
+        self.starboard_edits = {}
+        self._starboard_posted = None
+        # guild_id -> (hub channel_id, name template) or None
+        self.voice_hubs = {}
+        self.temp_channels = set()
+        self.temp_voice = TempVoiceQueue(self.create_temp_channel, self.delete_temp_channel)
 
     async def cog_load(self):
         redis_url = os.getenv("REDIS_URL", "redis://redis:6379/0")
         self.redis = redis.from_url(redis_url)
+        self.bot.timers.register("reminder", self.deliver_reminders, self.load_pending_reminders)
+        await self.load_stickies()
+        self.flush_stickies.start()
+        self.flush_starboard.start()
+        await self.load_temp_channels()
+        self.gc_task = asyncio.create_task(self.collect_temp_channels())
+
+    async def cog_unload(self):
+        self.bot.timers.unregister("reminder")
+        self.stickies.stop()
+        self.flush_stickies.cancel()
+        self.flush_starboard.cancel()
+        self.gc_task.cancel()
+        self.temp_voice.stop()
+        await self.save_stickies()
+
+    async def get_guild_flags(self, guild_id: int):
+        """Modül açık/kapalı bilgisini önbellekten al"""
+        if guild_id not in self.guild_flags:
+            async with AsyncSessionLocal() as db:
+                stmt = select(Guild).where(Guild.discord_id == str(guild_id))
+                guild_config = (await db.execute(stmt)).scalar_one_or_none()
+            self.guild_flags[guild_id] = None if not guild_config else {
+                name: getattr(guild_config, f"{name}_enabled") for name in GUILD_MODULES
+            }
+        return self.guild_flags[guild_id]
+
+    async def get_responders(self, guild_id: int):
+        """Sunucunun otomatik yanıtlayıcı indeksini önbellekten al"""
+        if guild_id not in self.responders:
+            async with AsyncSessionLocal() as db:
+                stmt = select(AutoResponder).where(AutoResponder.guild_id == str(guild_id))
+                rows = (await db.execute(stmt)).scalars().all()
+            index = TriggerIndex((ar.trigger, ar.id) for ar in rows)
+            self.responders[guild_id] = (index, {ar.id: (ar.response, ar.cooldown) for ar in rows})
+        return self.responders[guild_id]
+
+    async def get_afk_users(self, guild_id: int) -> set:
+        if guild_id not in self.afk_users:
+            async with AsyncSessionLocal() as db:
+                stmt = select(AFKState.user_id).where(AFKState.guild_id == str(guild_id))
+                self.afk_users[guild_id] = {int(user_id) for user_id in (await db.execute(stmt)).scalars().all()}
+        return self.afk_users[guild_id]
 
+    @commands.Cog.listener()
+    async def on_guild_config_changed(self, data: dict):
+        if not data.get("guild_id"):
+            return
+        guild_id = int(data["guild_id"])
+        self.guild_flags.pop(guild_id, None)
+        self.responders.pop(guild_id, None)
+        self.afk_users.pop(guild_id, None)
+        self.starboard_configs.pop(guild_id, None)
+        self.voice_hubs.pop(guild_id, None)
+
+    @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
         if message.author.bot or not message.guild:
             return
 
-        async with AsyncSessionLocal() as db:
-            stmt = select(Guild).where(Guild.discord_id == str(message.guild.id))
-            guild_config = (await db.execute(stmt)).scalar_one_or_none()
-            if not guild_config:
-                return
-
-            # 1. AFK Logic
-            if guild_config.afk_enabled:
-                stmt = select(AFKState).where(AFKState.user_id == str(message.author.id), AFKState.guild_id == str(message.guild.id))
-                afk = (await db.execute(stmt)).scalar_one_or_none()
-                if afk:
-                    await db.delete(afk)
-                    await db.commit()
-                    await message.channel.send(f"👋 Welcome back {message.author.mention}, I removed your AFK status.", delete_after=5)
-
-                if message.mentions:
-                    for user in message.mentions:
-                        stmt = select(AFKState).where(AFKState.user_id == str(user.id), AFKState.guild_id == str(message.guild.id))
-                        afk = (await db.execute(stmt)).scalar_one_or_none()
-                        if afk:
-                            await message.channel.send(f"💤 {user.name} is AFK: {afk.message or 'No reason provided'}", delete_after=10)
-
-            # 2. Auto Responder
-            if guild_config.auto_responder_enabled:
-                stmt = select(AutoResponder).where(AutoResponder.guild_id == str(message.guild.id))
-                responders = (await db.execute(stmt)).scalars().all()
-                for ar in responders:
-                    if ar.trigger.lower() in message.content.lower():
-                        key = f"ar_cooldown:{message.guild.id}:{ar.id}"
-                        if not await self.redis.get(key):
-                            await message.channel.send(ar.response)
-                            await self.redis.set(key, "1", ex=ar.cooldown)
-                            break
-
-            # 3. Sticky Message Handler
-            if guild_config.sticky_messages_enabled:
-                stmt = select(StickyMessage).where(StickyMessage.channel_id == str(message.channel.id))
-                sticky = (await db.execute(stmt)).scalar_one_or_none()
-                if sticky:
-                    if sticky.last_message_id:
-                        try:
-                            old_msg = await message.channel.fetch_message(int(sticky.last_message_id))
-                            await old_msg.delete()
-                        except: pass
-                    
-                    new_msg = await message.channel.send(f"📌 **Sticky Message**\n{sticky.content}")
-                    sticky.last_message_id = str(new_msg.id)
+        flags = await self.get_guild_flags(message.guild.id)
+        if not flags:
+            return
+
+        # 1. AFK Logic
+        if flags["afk"]:
+            afk_users = await self.get_afk_users(message.guild.id)
+            if message.author.id in afk_users:
+                afk_users.discard(message.author.id)
+                async with AsyncSessionLocal() as db:
+                    await db.execute(delete(AFKState).where(AFKState.user_id == str(message.author.id), AFKState.guild_id == str(message.guild.id)))
                     await db.commit()
+                await message.channel.send(f"👋 Welcome back {message.author.mention}, I removed your AFK status.", delete_after=5)
 
-    @commands.Cog.listener()
-    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
-        if str(payload.emoji) != "⭐":
-            return
+            mentioned = [user for user in message.mentions if user.id in afk_users]
+            if mentioned:
+                async with AsyncSessionLocal() as db:
+                    stmt = select(AFKState).where(AFKState.user_id.in_([str(u.id) for u in mentioned]), AFKState.guild_id == str(message.guild.id))
+                    afk_states = {int(afk.user_id): afk for afk in (await db.execute(stmt)).scalars().all()}
+                for user in mentioned:
+                    afk = afk_states.get(user.id)
+                    if afk:
+                        await message.channel.send(f"💤 {user.name} is AFK: {afk.message or 'No reason provided'}", delete_after=10)
 
+        # 2. Auto Responder
+        if flags["auto_responder"]:
+            index, responses = await self.get_responders(message.guild.id)
+            if index:
+                # One pass over the message finds every matching trigger
+                for responder_id in sorted(index.matches(message.content)):
+                    response, cooldown = responses[responder_id]
+                    key = f"ar_cooldown:{message.guild.id}:{responder_id}"
+                    if await self.redis.set(key, "1", ex=cooldown or 5, nx=True):
+                        await message.channel.send(response)
+                        break
+
+        # 3. Sticky Message Handler (debounced, see apps/bot/utils/sticky.py)
+        if flags["sticky_messages"]:
+            self.stickies.note_message(message.channel.id)
+
+    # --- STICKY COORDINATION ---
+    async def load_stickies(self):
         async with AsyncSessionLocal() as db:
-            guild_stmt = select(Guild).where(Guild.discord_id == str(payload.guild_id))
-            guild_config = (await db.execute(guild_stmt)).scalar_one_or_none()
-            if not guild_config or not guild_config.starboard_enabled:
-                return
-
-            stmt = select(StarboardConfig).where(StarboardConfig.guild_id == str(payload.guild_id))
-            config = (await db.execute(stmt)).scalar_one_or_none()
-            if not config:
-                return
-
-            channel = self.bot.get_channel(payload.channel_id)
-            if not channel: return
+            stmt = select(StickyMessage.id, StickyMessage.channel_id, StickyMessage.content, StickyMessage.last_message_id)
+            for sticky_id, channel_id, content, last_message_id in (await db.execute(stmt)).all():
+                self.stickies.set(sticky_id, int(channel_id), content, int(last_message_id) if last_message_id else None)
+
+    async def repost_sticky(self, channel_id: int, content: str, previous_id):
+        channel = self.bot.get_channel(channel_id)
+        if not channel:
+            return None
+        if previous_id:
+            # Delete by id, no fetch needed
+            try:
+                await channel.get_partial_message(previous_id).delete()
+            except discord.HTTPException:
+                pass
+        new_msg = await channel.send(f"📌 **Sticky Message**\n{content}")
+        return new_msg.id
+
+    async def save_stickies(self):
+        """Son sabit mesaj id'lerini toplu olarak kaydet"""
+        changed = self.stickies.take_dirty()
+        if not changed:
+            return
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(StickyMessage), [
+                {"id": sticky_id, "last_message_id": str(message_id)} for sticky_id, message_id in changed
+            ])
+            await db.commit()
+
+    @tasks.loop(seconds=30)
+    async def flush_stickies(self):
+        try:
+            await self.save_stickies()
+        except Exception as e:
+            logger.error(f"Sticky state flush failed: {e}")
+
+    # --- STARBOARD ---
+    async def get_starboard_config(self, guild_id: int):
+        """(kanal id, eşik, emoji) ya da starboard kapalıysa None"""
+        if guild_id not in self.starboard_configs:
+            flags = await self.get_guild_flags(guild_id)
+            config = None
+            if flags and flags["starboard"]:
+                async with AsyncSessionLocal() as db:
+                    stmt = select(StarboardConfig).where(StarboardConfig.guild_id == str(guild_id))
+                    config = (await db.execute(stmt)).scalar_one_or_none()
+            self.starboard_configs[guild_id] = config and (int(config.channel_id), config.threshold or 3, config.emoji or "⭐")
+        return self.starboard_configs[guild_id]
+
+    async def count_star(self, payload: discord.RawReactionActionEvent, delta: int):
+        if not payload.guild_id:
+            return
+        config = await self.get_starboard_config(payload.guild_id)
+        if not config or str(payload.emoji) != config[2]:
+            return
+
+        # Counts come from raw events; no fetch per star
+        key = f"starboard:{payload.message_id}"
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hincrby(key, "count", delta)
+            pipe.expire(key, STARBOARD_TTL)
+            pipe.hget(key, "post")
+            count, _, post = await pipe.execute()
+
+        if post:
+            if post != b"pending":
+                self.starboard_edits[payload.message_id] = (config[0], int(post), count, payload.channel_id)
+        elif count >= config[1] and await self.redis.hsetnx(key, "post", "pending"):
+            await self.post_starboard(payload, config, key)
+
+    async def post_starboard(self, payload: discord.RawReactionActionEvent, config, key: str):
+        """Eşiği geçen mesajı bir kez çekip starboard kanalına gönder"""
+        channel_id, _, emoji = config
+        starboard_channel = self.bot.get_channel(channel_id)
+        channel = self.bot.get_channel(payload.channel_id)
+        try:
+            if not starboard_channel or not channel:
+                raise LookupError("channel not found")
             message = await channel.fetch_message(payload.message_id)
-            
-            star_reaction = discord.utils.get(message.reactions, emoji="⭐")
-            if star_reaction and star_reaction.count >= config.threshold:
-                # Move to starboard channel
-                starboard_channel = self.bot.get_channel(int(config.channel_id))
-                if not starboard_channel: return
-
-                # Prevent double posting
-                key = f"starboard_posted:{message.id}"
-                if await self.redis.get(key):
-                    return
-
-                embed = discord.Embed(description=message.content, color=discord.Color.gold())
-                embed.set_author(name=message.author.display_name, icon_url=message.author.display_avatar.url)
-                embed.add_field(name="Source", value=f"[Jump to Message]({message.jump_url})")
-                
-                # Check for attachments
-                if message.attachments:
-                    embed.set_image(url=message.attachments[0].url)
-                
-                await starboard_channel.send(embed=embed)
-                await self.redis.set(key, "1", ex=60*60*24*7) # Cache for 1 week
+            # Stars added before tracking started are only visible here
+            star_reaction = next((r for r in message.reactions if str(r.emoji) == emoji), None)
+            count = star_reaction.count if star_reaction else 0
+
+            embed = discord.Embed(description=message.content, color=discord.Color.gold())
+            embed.set_author(name=message.author.display_name, icon_url=message.author.display_avatar.url)
+            embed.add_field(name="Source", value=f"[Jump to Message]({message.jump_url})")
+            if message.attachments:
+                embed.set_image(url=message.attachments[0].url)
+
+            post = await starboard_channel.send(f"{emoji} **{count}** | <#{payload.channel_id}>", embed=embed)
+        except Exception as e:
+            # Let the next star retry
+            await self.redis.hdel(key, "post")
+            logger.warning(f"Starboard post failed for {payload.message_id}: {e}")
+            return
+        # Stars counted while we were fetching stay counted
+        if self._starboard_posted is None:
+            self._starboard_posted = self.redis.register_script(STARBOARD_POSTED_LUA)
+        stored = await self._starboard_posted(keys=[key], args=[post.id, count])
+        if stored != count:
+            self.starboard_edits[payload.message_id] = (channel_id, post.id, stored, payload.channel_id)
+
+    @tasks.loop(seconds=10)
+    async def flush_starboard(self):
+        """Birikmiş sayı değişikliklerini gönderi başına tek düzenlemeyle uygula"""
+        edits, self.starboard_edits = self.starboard_edits, {}
+        for channel_id, post_id, count, source_channel_id in edits.values():
+            channel = self.bot.get_channel(channel_id)
+            if not channel:
+                continue
+            config = self.starboard_configs.get(channel.guild.id)
+            emoji = config[2] if config else "⭐"
+            try:
+                await channel.get_partial_message(post_id).edit(content=f"{emoji} **{max(count, 0)}** | <#{source_channel_id}>")
+            except discord.HTTPException as e:
+                logger.warning(f"Starboard count edit failed for {post_id}: {e}")
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
+        await self.count_star(payload, 1)
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
+        await self.count_star(payload, -1)
 
     @app_commands.command(name="afk", description="Set your AFK status")
     async def afk(self, interaction: discord.Interaction, message: str = "AFK"):
@@ -129,9 +302,61 @@ class AdvancedUtils(commands.Cog):
             )
             db.add(afk)
             await db.commit()
+        if interaction.guild_id in self.afk_users:
+            self.afk_users[interaction.guild_id].add(interaction.user.id)
         await interaction.response.send_message(f"💤 You are now AFK: {message}", ephemeral=True)
 
     # --- REMINDERS ---
+    async def load_pending_reminders(self):
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(select(Reminder.id, Reminder.remind_at, Reminder.guild_id))).all()
+        # Other clusters deliver their own guilds' reminders
+        return [(reminder_id, remind_at) for reminder_id, remind_at, guild_id in rows if self.bot.owns_guild(guild_id)]
+
+    def retry_reminder(self, reminder: Reminder, now: datetime) -> bool:
+        """Hatırlatıcıyı artan bekleme ile yeniden zamanla; çok gecikmişse False"""
+        retry = retry_at(reminder.remind_at, now)
+        if retry is None:
+            logger.warning(f"Reminder {reminder.id} dropped: undeliverable since {reminder.remind_at}")
+            return False
+        self.bot.timers.schedule("reminder", reminder.id, retry)
+        return True
+
+    async def deliver_reminders(self, reminder_ids: list):
+        handled = []
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as db:
+            reminders = (await db.execute(select(Reminder).where(Reminder.id.in_(reminder_ids)))).scalars().all()
+            for reminder in reminders:
+                if not self.bot.owns_guild(reminder.guild_id):
+                    continue
+                guild = self.bot.get_guild(int(reminder.guild_id))
+                if not guild:
+                    # Guild not available yet (outage, still loading): try again later, up to a day
+                    if not self.retry_reminder(reminder, now):
+                        handled.append(reminder.id)
+                    continue
+
+                channel = guild.get_channel_or_thread(int(reminder.channel_id))
+                if not channel:
+                    logger.warning(f"Reminder {reminder.id} dropped: channel {reminder.channel_id} no longer exists")
+                    handled.append(reminder.id)
+                    continue
+                try:
+                    await channel.send(f"⏰ <@{reminder.user_id}>, reminder: {reminder.content}")
+                except (discord.Forbidden, discord.NotFound) as e:
+                    logger.warning(f"Reminder {reminder.id} dropped, cannot post in {reminder.channel_id}: {e}")
+                except Exception as e:
+                    logger.warning(f"Reminder delivery failed, retrying: {e}")
+                    if not self.retry_reminder(reminder, now):
+                        handled.append(reminder.id)
+                    continue
+                handled.append(reminder.id)
+
+            if handled:
+                await db.execute(delete(Reminder).where(Reminder.id.in_(handled)))
+                await db.commit()
+
     @app_commands.command(name="remind", description="Set a reminder")
     async def remind(self, interaction: discord.Interaction, time: str, content: str):
         # Very simple parser: "10m", "1h", etc.
@@ -151,6 +376,7 @@ class AdvancedUtils(commands.Cog):
             )
             db.add(reminder)
             await db.commit()
+        self.bot.timers.schedule("reminder", reminder.id, remind_at)
             
         await interaction.response.send_message(f"⏰ Okay, I will remind you about '{content}' in {time}.", ephemeral=True)
 
@@ -163,6 +389,7 @@ class AdvancedUtils(commands.Cog):
             existing = (await db.execute(stmt)).scalar_one_or_none()
             if existing:
                 existing.content = content
+                sticky = existing
             else:
                 sticky = StickyMessage(
                     guild_id=str(interaction.guild_id),
@@ -170,37 +397,100 @@ class AdvancedUtils(commands.Cog):
                     content=content
                 )
                 db.add(sticky)
+            await db.flush()
+            sticky_id = sticky.id
             await db.commit()
+        self.stickies.set(sticky_id, interaction.channel_id, content)
         await interaction.response.send_message(f"📌 Sticky message set for this channel.", ephemeral=True)
 
+    # --- TEMP VOICE ---
+    async def get_voice_hub(self, guild_id: int):
+        """(hub kanal id, isim şablonu) ya da None; sunucu başına bir kez okunur"""
+        if guild_id not in self.voice_hubs:
+            async with AsyncSessionLocal() as db:
+                stmt = select(VoiceConfig).where(VoiceConfig.guild_id == str(guild_id))
+                config = (await db.execute(stmt)).scalar_one_or_none()
+            self.voice_hubs[guild_id] = config and (int(config.category_id), config.channel_name_tpl or "{user}'s room")
+        return self.voice_hubs[guild_id]
+
+    async def load_temp_channels(self):
+        """Sahip olunan geçici kanalları Redis'ten geri yükle"""
+        for channel_id in await self.redis.hkeys(TEMP_VC_KEY):
+            self.temp_channels.add(int(channel_id))
+        # Channels tracked with the old one-key-per-channel layout
+        async for key in self.redis.scan_iter(match="temp_vc:[0-9]*"):
+            channel_id = int(key.decode().split(":")[1])
+            channel = self.bot.get_channel(channel_id)
+            await self.redis.hset(TEMP_VC_KEY, channel_id, channel.guild.id if channel else 0)
+            await self.redis.delete(key)
+            self.temp_channels.add(channel_id)
+
+    async def collect_temp_channels(self):
+        """Kapalıyken boşalan ya da silinen geçici kanalları temizle"""
+        await self.bot.wait_until_ready()
+        owners = await self.redis.hgetall(TEMP_VC_KEY)
+        for channel_id, guild_id in owners.items():
+            channel_id, guild_id = int(channel_id), int(guild_id)
+            channel = self.bot.get_channel(channel_id)
+            if channel:
+                if not guild_id:
+                    await self.redis.hset(TEMP_VC_KEY, channel_id, channel.guild.id)
+                if not channel.members:
+                    self.temp_voice.submit_delete(channel.guild.id, channel_id)
+            # Only forget channels of guilds this process serves
+            elif guild_id and self.bot.get_guild(guild_id):
+                self.temp_channels.discard(channel_id)
+                await self.redis.hdel(TEMP_VC_KEY, channel_id)
+
+    async def create_temp_channel(self, guild_id: int, member_id: int):
+        guild = self.bot.get_guild(guild_id)
+        hub = await self.get_voice_hub(guild_id)
+        member = guild and guild.get_member(member_id)
+        # Left the hub while queued
+        if not hub or not member or not member.voice or not member.voice.channel or member.voice.channel.id != hub[0]:
+            return
+
+        new_channel = await guild.create_voice_channel(
+            hub[1].format(user=member.name), category=member.voice.channel.category
+        )
+        self.temp_channels.add(new_channel.id)
+        await self.redis.hset(TEMP_VC_KEY, new_channel.id, guild_id)
+        try:
+            await member.move_to(new_channel)
+        except discord.HTTPException:
+            self.temp_voice.submit_delete(guild_id, new_channel.id)
+
+    async def delete_temp_channel(self, guild_id: int, channel_id: int):
+        channel = self.bot.get_channel(channel_id)
+        # Someone joined again while queued
+        if channel and channel.members:
+            return
+        if channel:
+            try:
+                await channel.delete()
+            except discord.NotFound:
+                pass
+        self.temp_channels.discard(channel_id)
+        await self.redis.hdel(TEMP_VC_KEY, channel_id)
+
     @commands.Cog.listener()
-    async def on_message_sticky_handler(self, message: discord.Message):
-        # Already handled in on_message above
-        pass
+    async def on_guild_channel_delete(self, channel):
+        if channel.id in self.temp_channels:
+            self.temp_channels.discard(channel.id)
+            await self.redis.hdel(TEMP_VC_KEY, channel.id)
 
     @commands.Cog.listener()
     async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
+        if before.channel == after.channel:
+            return
+
         if after.channel:
-            async with AsyncSessionLocal() as db:
-                stmt = select(VoiceConfig).where(VoiceConfig.guild_id == str(member.guild.id))
-                config = (await db.execute(stmt)).scalar_one_or_none()
-                if config and str(after.channel.id) == config.category_id: # Usually use a specific channel ID
-                    # Create new channel
-                    category = after.channel.category
-                    name = config.channel_name_tpl.format(user=member.name)
-                    new_channel = await member.guild.create_voice_channel(name, category=category)
-                    await member.move_to(new_channel)
-                    
-                    # Track in Redis to delete later
-                    key = f"temp_vc:{new_channel.id}"
-                    await self.redis.set(key, "1")
-
-        if before.channel:
-            key = f"temp_vc:{before.channel.id}"
-            if await self.redis.get(key):
-                if len(before.channel.members) == 0:
-                    await before.channel.delete()
-                    await self.redis.delete(key)
+            hub = await self.get_voice_hub(member.guild.id)
+            if hub and after.channel.id == hub[0]:
+                self.temp_voice.submit_create(member.guild.id, member.id)
+
+        if before.channel and before.channel.id in self.temp_channels and not before.channel.members:
+            self.temp_voice.submit_delete(member.guild.id, before.channel.id)
 
 async def setup(bot):
     await bot.add_cog(AdvancedUtils(bot))
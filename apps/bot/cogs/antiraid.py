@@ -1,90 +1,115 @@
 import discord
 from discord.ext import commands
 import logging
-from datetime import datetime, timedelta
-from sqlalchemy import select
+import time
+from datetime import datetime
+from sqlalchemy import select, insert
 from lithium_core.database.session import AsyncSessionLocal
 from lithium_core.models import Guild, QuarantineConfig, QuarantineLog
+from apps.bot.utils.join_rate import BucketCounter
+from apps.bot.utils.raid_responder import RaidResponder
 
 logger = logging.getLogger("lithium-bot")
 
+# Raid mode stays on until the join rate has been normal for this long
+RAID_MODE_COOLDOWN = 120
+# Flagged joiners are collected for this long and handled together
+RAID_BATCH_WINDOW = 2.0
+
 class AntiRaid(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.joins = {} # Cache joins: {guild_id: [datetime, ...]}
+        self.joins = {} # {guild_id: BucketCounter over the last minute}
+        # guild_id -> QuarantineConfig, or None when anti-raid is off
+        self.configs = {}
+        # guild_id -> monotonic time raid mode ends
+        self.raid_until = {}
+        self.responder = RaidResponder(self.record_actions, window=RAID_BATCH_WINDOW)
+
+    def cog_unload(self):
+        self.responder.stop()
+
+    async def get_config(self, guild_id: int):
+        """Anti-raid ayarlarını önbellekten al"""
+        if guild_id not in self.configs:
+            async with AsyncSessionLocal() as db:
+                stmt = select(Guild).where(Guild.discord_id == str(guild_id))
+                guild = (await db.execute(stmt)).scalar_one_or_none()
+                config = None
+                if guild and guild.quarantine_enabled:
+                    stmt = select(QuarantineConfig).where(QuarantineConfig.guild_id == str(guild_id))
+                    config = (await db.execute(stmt)).scalar_one_or_none()
+            self.configs[guild_id] = config
+        return self.configs[guild_id]
+
+    @commands.Cog.listener()
+    async def on_guild_config_changed(self, data: dict):
+        if data.get("guild_id"):
+            self.configs.pop(int(data["guild_id"]), None)
+
+    def in_raid_mode(self, guild_id: int, now: float) -> bool:
+        return self.raid_until.get(guild_id, 0) > now
 
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
-        async with AsyncSessionLocal() as db:
-            stmt = select(Guild).where(Guild.discord_id == str(member.guild.id))
-            guild = (await db.execute(stmt)).scalar_one_or_none()
-            
-            if not guild or not guild.quarantine_enabled:
-                return
-
-            stmt = select(QuarantineConfig).where(QuarantineConfig.guild_id == str(member.guild.id))
-            config = (await db.execute(stmt)).scalar_one_or_none()
-            if not config:
-                return
-
-            # 1. Join Rate Check
-            now = datetime.utcnow()
-            guild_id = str(member.guild.id)
-            if guild_id not in self.joins:
-                self.joins[guild_id] = []
-            
-            # Clean old joins
-            self.joins[guild_id] = [j for j in self.joins[guild_id] if j > now - timedelta(minutes=1)]
-            self.joins[guild_id].append(now)
-
-            triggered = False
-            reason = ""
-
-            if len(self.joins[guild_id]) > config.max_joins_per_minute:
-                triggered = True
-                reason = "Join rate exceeded"
+        config = await self.get_config(member.guild.id)
+        if not config:
+            return
 
-            # 2. Account Age Check
-            if not triggered and config.min_account_age_days > 0:
-                age = (now - member.created_at.replace(tzinfo=None)).days
-                if age < config.min_account_age_days:
-                    triggered = True
-                    reason = f"Account too young ({age} days)"
+        # 1. Join Rate Check
+        now = time.monotonic()
+        guild_id = member.guild.id
+        counter = self.joins.get(guild_id)
+        if counter is None:
+            counter = self.joins[guild_id] = BucketCounter()
+        joins_last_minute = counter.add(now)
 
-            # 3. Avatar Check
-            if not triggered and config.require_avatar and not member.avatar:
+        if joins_last_minute > config.max_joins_per_minute:
+            if not self.in_raid_mode(guild_id, now):
+                logger.warning(f"Raid mode enabled in {member.guild.name} ({joins_last_minute} joins/min)")
+                await self.bot.publish_guild_event(guild_id, "raid_mode", {
+                    "enabled": True, "joins_per_minute": joins_last_minute
+                })
+            self.raid_until[guild_id] = now + RAID_MODE_COOLDOWN
+
+        # Raid mode: every joiner is handled, in batches
+        if self.in_raid_mode(guild_id, now):
+            self.take_action(member, config, "Join rate exceeded")
+            return
+
+        triggered = False
+        reason = ""
+
+        # 2. Account Age Check
+        if config.min_account_age_days > 0:
+            age = (datetime.utcnow() - member.created_at.replace(tzinfo=None)).days
+            if age < config.min_account_age_days:
                 triggered = True
-                reason = "No avatar"
-
-            if triggered:
-                await self.take_action(member, config, reason)
-
-    async def take_action(self, member: discord.Member, config: QuarantineConfig, reason: str):
-        action = config.action
-        try:
-            if action == "KICK":
-                await member.kick(reason=f"[Anti-Raid] {reason}")
-            elif action == "BAN":
-                await member.ban(reason=f"[Anti-Raid] {reason}")
-            elif action == "QUARANTINE_ROLE" and config.quarantine_role_id:
-                role = member.guild.get_role(int(config.quarantine_role_id))
-                if role:
-                    await member.add_roles(role, reason=f"[Anti-Raid] {reason}")
-
-            # Log to DB
-            async with AsyncSessionLocal() as db:
-                log = QuarantineLog(
-                    guild_id=str(member.guild.id),
-                    user_id=str(member.id),
-                    reason=reason,
-                    action_taken=action
-                )
-                db.add(log)
-                await db.commit()
-                
-            logger.info(f"Anti-Raid action {action} on {member} in {member.guild.name} for {reason}")
-        except Exception as e:
-            logger.error(f"Failed to take Anti-Raid action on {member}: {e}")
+                reason = f"Account too young ({age} days)"
+
+        # 3. Avatar Check
+        if not triggered and config.require_avatar and not member.avatar:
+            triggered = True
+            reason = "No avatar"
+
+        if triggered:
+            self.take_action(member, config, reason)
+
+    def take_action(self, member: discord.Member, config: QuarantineConfig, reason: str):
+        """Üyeyi toplu işlem kuyruğuna ekle"""
+        role_id = int(config.quarantine_role_id) if config.quarantine_role_id else None
+        if config.action == "QUARANTINE_ROLE" and not role_id:
+            return
+        self.responder.submit(member, config.action, reason, role_id if config.action == "QUARANTINE_ROLE" else None)
+
+    async def record_actions(self, rows: list):
+        """Bir partinin log kayıtlarını tek insert ile yaz"""
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(QuarantineLog), [
+                {"guild_id": str(guild_id), "user_id": str(user_id), "reason": reason, "action_taken": action}
+                for guild_id, user_id, action, reason in rows
+            ])
+            await db.commit()
 
 async def setup(bot):
     await bot.add_cog(AntiRaid(bot))
@@ -1,174 +1,157 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
 from lithium_core.database.session import AsyncSessionLocal
 from lithium_core.models.economy import EconomyProfile
+from lithium_core.services.economy_service import EconomyService
+from lithium_core.utils import leaderboards
+from apps.bot.utils.game_state import BlackjackState, GameStore
 from sqlalchemy import select
 from datetime import datetime, timedelta
 import random
-import asyncio
 import logging
+import math
+import time
+from typing import Optional
 
 logger = logging.getLogger("lithium-bot")
 
-# Define Games Logic Separately
 
-class BlackjackGame:
-    def __init__(self, bot, interaction, amount, profile, db):
-        self.bot = bot
-        self.interaction = interaction
-        self.amount = amount
-        self.profile = profile
-        self.db = db
-        
-        self.deck = [2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10, 11] * 4
-        random.shuffle(self.deck)
-        
-        self.player_hand = [self.draw_card(), self.draw_card()]
-        self.dealer_hand = [self.draw_card(), self.draw_card()]
-
-    def draw_card(self):
-        return self.deck.pop()
-
-    def calculate_score(self, hand):
-        score = sum(hand)
-        aces = hand.count(11)
-        while score > 21 and aces:
-            score -= 10
-            aces -= 1
-        return score
-
-    def create_embed(self, reveal_dealer=False):
-        p_score = self.calculate_score(self.player_hand)
-        
-        if reveal_dealer:
-            d_score = self.calculate_score(self.dealer_hand)
-            d_hand_str = f"{self.dealer_hand} ({d_score})"
-        else:
-            d_hand_str = f"[{self.dealer_hand[0]}, ?]"
-            
-        embed = discord.Embed(title="🃏 Blackjack", color=discord.Color.blue())
-        embed.add_field(name="Your Hand", value=f"{self.player_hand} ({p_score})", inline=True)
-        embed.add_field(name="Dealer's Hand", value=d_hand_str, inline=True)
-        embed.set_footer(text=f"Bet: {self.amount} TL")
-        return embed
+async def update_balance_board(bot, guild_id: str, user_id: str, balance: float):
+    """Keep the balance leaderboard in step with a committed balance"""
+    if not bot.redis or balance is None:
+        return
+    try:
+        await leaderboards.set_scores(bot.redis, guild_id, leaderboards.BALANCE_BOARD, {user_id: balance})
+    except Exception as e:
+        logger.warning(f"Balance leaderboard update failed: {e}")
 
-    async def update_message(self, interaction):
-        embed = self.create_embed()
-        await interaction.edit_original_response(embed=embed)
+# Blackjack games live in Redis (apps/bot/utils/game_state.py); buttons carry
+# the game id so they keep working after a restart.
 
-    async def end_game(self, interaction, result):
-        embed = self.create_embed(reveal_dealer=True)
-        
-        if result == "win" or result == "dealer_bust":
-            self.profile.balance += self.amount
-            embed.color = discord.Color.green()
-            embed.description = "**YOU WIN!** 🏆" if result == "win" else "**DEALER BUST! YOU WIN!** 🏆"
-        elif result == "loss" or result == "bust":
-            self.profile.balance -= self.amount
-            embed.color = discord.Color.red()
-            embed.description = "**YOU LOSE.** 💸" if result == "loss" else "**BUST! YOU LOSE.** 💸"
-        elif result == "push":
-            embed.color = discord.Color.gold()
-            embed.description = "**PUSH!** (Tie)"
-            
-        embed.add_field(name="New Balance", value=f"{self.profile.balance} TL", inline=False)
-        await self.db.commit()
-        # Keep db open? No, good practice to close if created locally.
-        # But session was created in Cog command. We'll close there? No, we passed it here.
-        # Ideally, we should close it here if we are done.
-        # However, View might still exist? No, we remove view.
-        await interaction.edit_original_response(embed=embed, view=None)
-
-class BlackjackView(discord.ui.View):
-    def __init__(self, player_id, game_logic):
-        super().__init__(timeout=60)
-        self.player_id = player_id
-        self.game = game_logic
-        self.finished = False
-
-    @discord.ui.button(label="Hit", style=discord.ButtonStyle.success)
-    async def hit(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if interaction.user.id != self.player_id: return
-        
-        await interaction.response.defer()
-        card = self.game.draw_card()
-        self.game.player_hand.append(card)
-        
-        if self.game.calculate_score(self.game.player_hand) > 21:
-            self.finished = True
-            await self.game.end_game(interaction, "bust")
-            self.stop()
-        else:
-            await self.game.update_message(interaction)
+BLACKJACK_TIMEOUT = 120
 
-    @discord.ui.button(label="Stand", style=discord.ButtonStyle.danger)
-    async def stand(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if interaction.user.id != self.player_id: return
-        
-        await interaction.response.defer()
-        self.finished = True
-        
-        # Dealer turn
-        while self.game.calculate_score(self.game.dealer_hand) < 17:
-            self.game.dealer_hand.append(self.game.draw_card())
-            
-        dealer_score = self.game.calculate_score(self.game.dealer_hand)
-        player_score = self.game.calculate_score(self.game.player_hand)
+
+def blackjack_embed(state: BlackjackState, reveal_dealer=False):
+    p_score = state.calculate_score(state.player_hand)
+    
+    if reveal_dealer:
+        d_score = state.calculate_score(state.dealer_hand)
+        d_hand_str = f"{state.dealer_hand} ({d_score})"
+    else:
+        d_hand_str = f"[{state.dealer_hand[0]}, ?]"
         
-        if dealer_score > 21:
-            result = "dealer_bust"
-        elif dealer_score > player_score:
-            result = "loss"
-        elif dealer_score < player_score:
-            result = "win"
-        else:
-            result = "push"
-            
-        await self.game.end_game(interaction, result)
-        self.stop()
+    embed = discord.Embed(title="🃏 Blackjack", color=discord.Color.blue())
+    embed.add_field(name="Your Hand", value=f"{state.player_hand} ({p_score})", inline=True)
+    embed.add_field(name="Dealer's Hand", value=d_hand_str, inline=True)
+    embed.set_footer(text=f"Bet: {state.amount} TL")
+    return embed
+
+
+class BlackjackButton(discord.ui.DynamicItem[discord.ui.Button], template=r"bj:(?P<action>hit|stand):(?P<game_id>[0-9a-f]+)"):
+    def __init__(self, action: str, game_id: str):
+        super().__init__(discord.ui.Button(
+            label=action.capitalize(),
+            style=discord.ButtonStyle.success if action == "hit" else discord.ButtonStyle.danger,
+            custom_id=f"bj:{action}:{game_id}"
+        ))
+        self.action = action
+        self.game_id = game_id
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(match["action"], match["game_id"])
+
+    async def callback(self, interaction: discord.Interaction):
+        cog = interaction.client.get_cog("Economy")
+        if cog:
+            await cog.blackjack_action(interaction, self.game_id, self.action)
+
+
+def blackjack_view(game_id: str) -> discord.ui.View:
+    view = discord.ui.View(timeout=None)
+    view.add_item(BlackjackButton("hit", game_id))
+    view.add_item(BlackjackButton("stand", game_id))
+    return view
 
 class Economy(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.max_bet = 200000
 
-    async def get_profile(self, db, guild_id: str, user_id: str):
-        stmt = select(EconomyProfile).where(
-            EconomyProfile.guild_id == guild_id, 
-            EconomyProfile.user_id == user_id
-        )
-        profile = (await db.execute(stmt)).scalar_one_or_none()
-        if not profile:
-            profile = EconomyProfile(guild_id=guild_id, user_id=user_id, balance=0)
-            db.add(profile)
-        return profile
+    async def cog_load(self):
+        self.games = GameStore(self.bot.redis)
+        self.bot.add_dynamic_items(BlackjackButton)
+        self.bot.timers.register("blackjack_timeout", self.expire_blackjack, self.load_blackjack_timeouts)
+        self.reconcile_leaderboards.start()
+
+    def cog_unload(self):
+        self.bot.remove_dynamic_items(BlackjackButton)
+        self.bot.timers.unregister("blackjack_timeout")
+        self.reconcile_leaderboards.cancel()
+
+    async def rebuild_leaderboard(self, guild_id: int):
+        """Bakiye leaderboard'unu Postgres'ten yeniden oluştur"""
+        # Writes from here until the swap are replayed onto the rebuilt set
+        await leaderboards.begin_rebuild(self.bot.redis, guild_id, leaderboards.BALANCE_BOARD)
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(EconomyProfile.user_id, EconomyProfile.balance)
+                .where(EconomyProfile.guild_id == str(guild_id))
+            )
+            scores = {user_id: balance for user_id, balance in result.all()}
+        await leaderboards.rebuild(self.bot.redis, guild_id, leaderboards.BALANCE_BOARD, scores)
+
+    @tasks.loop(minutes=1)
+    async def reconcile_leaderboards(self):
+        # Each guild is rebuilt once an hour, spread over the minutes
+        if not self.bot.redis:
+            return
+        slot = datetime.utcnow().minute
+        for guild in self.bot.guilds:
+            if leaderboards.reconcile_slot(guild.id) != slot:
+                continue
+            try:
+                await self.rebuild_leaderboard(guild.id)
+            except Exception as e:
+                logger.error(f"Balance leaderboard reconcile failed for {guild.id}: {e}")
 
     @app_commands.command(name="daily", description="Claim your daily reward (500-1000 TL)")
     async def daily(self, interaction: discord.Interaction):
+        guild_id, user_id = str(interaction.guild_id), str(interaction.user.id)
+        reward = random.randint(500, 1000)
         async with AsyncSessionLocal() as db:
-            profile = await self.get_profile(db, str(interaction.guild_id), str(interaction.user.id))
-            
-            now = datetime.utcnow()
-            if profile.last_daily and now - profile.last_daily < timedelta(hours=24):
-                remaining = timedelta(hours=24) - (now - profile.last_daily)
-                hours, remainder = divmod(int(remaining.total_seconds()), 3600)
-                minutes, _ = divmod(remainder, 60)
-                return await interaction.response.send_message(f"⏳ You can claim your daily in **{hours}h {minutes}m**.", ephemeral=True)
-            
-            reward = random.randint(500, 1000)
-            profile.balance += reward
-            profile.last_daily = now
-            await db.commit()
-            
-            await interaction.response.send_message(f"💰 You claimed **{reward} TL**! New balance: **{profile.balance} TL**")
+            balance, last_daily = await EconomyService(db).claim_daily(guild_id, user_id, reward)
+
+        if balance is None:
+            remaining = timedelta(hours=24) - (datetime.utcnow() - last_daily)
+            hours, remainder = divmod(max(int(remaining.total_seconds()), 0), 3600)
+            minutes, _ = divmod(remainder, 60)
+            return await interaction.response.send_message(f"⏳ You can claim your daily in **{hours}h {minutes}m**.", ephemeral=True)
+
+        await update_balance_board(self.bot, guild_id, user_id, balance)
+        await interaction.response.send_message(f"💰 You claimed **{reward} TL**! New balance: **{balance} TL**")
             
     @app_commands.command(name="balance", description="Check your wallet balance")
     async def balance(self, interaction: discord.Interaction, user: discord.Member = None):
         target = user or interaction.user
         async with AsyncSessionLocal() as db:
-            profile = await self.get_profile(db, str(interaction.guild_id), str(target.id))
-            await interaction.response.send_message(f"💳 **{target.name}**'s Balance: **{profile.balance:.2f} TL**")
+            balance = await EconomyService(db).get_balance(str(interaction.guild_id), str(target.id))
+        await interaction.response.send_message(f"💳 **{target.name}**'s Balance: **{balance:.2f} TL**")
+
+    @app_commands.command(name="baltop", description="Show the richest members of the server")
+    async def baltop(self, interaction: discord.Interaction, page: app_commands.Range[int, 1, 1000] = 1):
+        if not await leaderboards.exists(self.bot.redis, interaction.guild_id, leaderboards.BALANCE_BOARD):
+            await self.rebuild_leaderboard(interaction.guild_id)
+        entries, total = await leaderboards.get_page(self.bot.redis, interaction.guild_id, leaderboards.BALANCE_BOARD, page)
+        if not entries:
+            return await interaction.response.send_message("No leaderboard data on this page.", ephemeral=True)
+
+        start = (page - 1) * 10
+        lines = [f"**#{start + i + 1}** <@{user_id}> — {score:.2f} TL" for i, (user_id, score) in enumerate(entries)]
+        embed = discord.Embed(title="💰 Richest Members", description="\n".join(lines), color=discord.Color.gold())
+        embed.set_footer(text=f"Page {page}/{math.ceil(total / 10)} • {total} members")
+        await interaction.response.send_message(embed=embed, allowed_mentions=discord.AllowedMentions.none())
 
     @app_commands.command(name="coinflip", description="Bet on coinflip (Max 200k TL)")
     @app_commands.describe(amount="Amount to bet", choice="heads or tails")
@@ -182,29 +165,30 @@ class Economy(commands.Cog):
         if amount > self.max_bet:
             return await interaction.response.send_message(f"❌ Max bet limit is **{self.max_bet} TL**!", ephemeral=True)
 
+        guild_id, user_id = str(interaction.guild_id), str(interaction.user.id)
+        outcome = random.choice(["heads", "tails"])
+        won = outcome == choice
+
+        # The bet must be covered either way
         async with AsyncSessionLocal() as db:
-            profile = await self.get_profile(db, str(interaction.guild_id), str(interaction.user.id))
-            
-            if profile.balance < amount:
-                return await interaction.response.send_message("❌ Insufficient funds!", ephemeral=True)
-                
-            outcome = random.choice(["heads", "tails"])
-            won = outcome == choice
-            
-            if won:
-                profile.balance += amount
-                result_text = f"Outcome: **{outcome.capitalize()}** 🏆 You won **{amount} TL**!"
-                color = discord.Color.green()
-            else:
-                profile.balance -= amount
-                result_text = f"Outcome: **{outcome.capitalize()}** 💸 You lost **{amount} TL**."
-                color = discord.Color.red()
-                
-            await db.commit()
-            
-            embed = discord.Embed(title="🪙 Coin Flip", description=result_text, color=color)
-            embed.set_footer(text=f"New Balance: {profile.balance} TL")
-            await interaction.response.send_message(embed=embed)
+            balance = await EconomyService(db).apply(
+                guild_id, user_id, amount if won else -amount,
+                "coinflip_win" if won else "coinflip_loss", min_balance=amount
+            )
+        if balance is None:
+            return await interaction.response.send_message("❌ Insufficient funds!", ephemeral=True)
+        await update_balance_board(self.bot, guild_id, user_id, balance)
+
+        if won:
+            result_text = f"Outcome: **{outcome.capitalize()}** 🏆 You won **{amount} TL**!"
+            color = discord.Color.green()
+        else:
+            result_text = f"Outcome: **{outcome.capitalize()}** 💸 You lost **{amount} TL**."
+            color = discord.Color.red()
+
+        embed = discord.Embed(title="🪙 Coin Flip", description=result_text, color=color)
+        embed.set_footer(text=f"New Balance: {balance} TL")
+        await interaction.response.send_message(embed=embed)
 
     @app_commands.command(name="blackjack", description="Play Blackjack (Max 200k TL)")
     async def blackjack(self, interaction: discord.Interaction, amount: int):
@@ -213,26 +197,114 @@ class Economy(commands.Cog):
         if amount > self.max_bet:
             return await interaction.response.send_message(f"❌ Max bet limit is **{self.max_bet} TL**!", ephemeral=True)
 
-        db = AsyncSessionLocal()
+        guild_id, user_id = str(interaction.guild_id), str(interaction.user.id)
+        # Take the bet up front so it can't be spent twice while the game runs
+        async with AsyncSessionLocal() as db:
+            balance = await EconomyService(db).apply(guild_id, user_id, -amount, "blackjack_bet")
+        if balance is None:
+            return await interaction.response.send_message("❌ Insufficient funds!", ephemeral=True)
+        await update_balance_board(self.bot, guild_id, user_id, balance)
+
+        # Start Game Logic
+        state = BlackjackState.deal(interaction.guild_id, interaction.user.id, amount, balance)
+        # Persist before the buttons exist so an early click finds the game
+        await self.games.save(state)
+        self.bot.timers.schedule("blackjack_timeout", state.game_id, time.time() + BLACKJACK_TIMEOUT)
         try:
-            profile = await self.get_profile(db, str(interaction.guild_id), str(interaction.user.id))
-            
-            if profile.balance < amount:
-                await db.close()
-                return await interaction.response.send_message("❌ Insufficient funds!", ephemeral=True)
-            
-            # Start Game Logic
-            game = BlackjackGame(self.bot, interaction, amount, profile, db)
-            
-            embed = game.create_embed()
-            view = BlackjackView(interaction.user.id, game)
-            
-            await interaction.response.send_message(embed=embed, view=view)
+            await interaction.response.send_message(embed=blackjack_embed(state), view=blackjack_view(state.game_id))
+        except Exception:
+            # Nobody can play this game: give the bet back (once, in case the timeout got there first)
+            if await self.games.finish(BlackjackState, state.game_id):
+                self.bot.timers.cancel("blackjack_timeout", state.game_id)
+                async with AsyncSessionLocal() as db:
+                    balance = await EconomyService(db).apply(guild_id, user_id, amount, "blackjack_refund")
+                await update_balance_board(self.bot, guild_id, user_id, balance)
+            raise
+
+        # Record where the game lives (for the timeout edit) without reviving a game already finished
+        message = await interaction.original_response()
+        await self.games.set_once(BlackjackState, state.game_id, "channel_id", message.channel.id)
+        await self.games.set_once(BlackjackState, state.game_id, "message_id", message.id)
+
+    async def blackjack_action(self, interaction: discord.Interaction, game_id: str, action: str):
+        state = await self.games.load(BlackjackState, game_id)
+        if not state:
+            return await interaction.response.send_message("❌ This game has ended.", ephemeral=True)
+        if interaction.user.id != state.user_id:
+            return await interaction.response.send_message("❌ This is not your game!", ephemeral=True)
+
+        await interaction.response.defer()
+        if action == "hit":
+            state.player_hand.append(state.draw_card())
+            if state.calculate_score(state.player_hand) <= 21:
+                # Settled (stand, timeout) or moved by another click meanwhile: don't revive it
+                if not await self.games.update(state, "deck", "player_hand"):
+                    return await interaction.followup.send("❌ This game was updated or has ended.", ephemeral=True)
+                self.bot.timers.schedule("blackjack_timeout", game_id, time.time() + BLACKJACK_TIMEOUT)
+                return await interaction.edit_original_response(embed=blackjack_embed(state))
+            result = "bust"
+        else:
+            result = state.dealer_play()
+
+        embed = await self.finish_blackjack(state, result)
+        if embed:
+            await interaction.edit_original_response(embed=embed, view=None)
+
+    async def finish_blackjack(self, state: BlackjackState, result: str) -> Optional[discord.Embed]:
+        """Pay out a finished game; None if it was already settled elsewhere"""
+        if not await self.games.finish(BlackjackState, state.game_id, state):
+            return None
+        self.bot.timers.cancel("blackjack_timeout", state.game_id)
+
+        embed = blackjack_embed(state, reveal_dealer=True)
+        
+        # The bet was taken when the game started; pay out winnings / refunds
+        payout = 0
+        if result == "win" or result == "dealer_bust":
+            payout = state.amount * 2
+            embed.color = discord.Color.green()
+            embed.description = "**YOU WIN!** 🏆" if result == "win" else "**DEALER BUST! YOU WIN!** 🏆"
+        elif result == "loss" or result == "bust":
+            embed.color = discord.Color.red()
+            embed.description = "**YOU LOSE.** 💸" if result == "loss" else "**BUST! YOU LOSE.** 💸"
+        elif result == "push":
+            payout = state.amount
+            embed.color = discord.Color.gold()
+            embed.description = "**PUSH!** (Tie)"
             
-        except Exception as e:
-            await db.close()
-            raise e
+        if payout:
+            guild_id, user_id = str(state.guild_id), str(state.user_id)
+            async with AsyncSessionLocal() as db:
+                state.balance = await EconomyService(db).apply(guild_id, user_id, payout, f"blackjack_{result}")
+            await update_balance_board(self.bot, guild_id, user_id, state.balance)
+
+        embed.add_field(name="New Balance", value=f"{state.balance} TL", inline=False)
+        return embed
+
+    async def load_blackjack_timeouts(self):
+        """Açık blackjack oyunları (yeniden başlatmadan sonra zaman aşımları)"""
+        pending = []
+        async for key in self.bot.redis.scan_iter(match=GameStore.key(BlackjackState.kind, "*"), count=500):
+            key = key.decode() if isinstance(key, bytes) else key
+            ttl = await self.bot.redis.ttl(key)
+            if ttl > 0:
+                # Saved games expire GAME_TTL after their last move
+                pending.append((key.rsplit(":", 1)[1], time.time() + max(ttl - (self.games.ttl - BLACKJACK_TIMEOUT), 0)))
+        return pending
 
+    async def expire_blackjack(self, game_ids: list):
+        """Süresi dolan oyunlarda oyuncu 'stand' yapmış sayılır"""
+        for game_id in game_ids:
+            state = await self.games.load(BlackjackState, game_id)
+            if not state or not self.bot.get_guild(state.guild_id):
+                continue
+            embed = await self.finish_blackjack(state, state.dealer_play())
+            channel = self.bot.get_channel(state.channel_id)
+            if embed and channel:
+                try:
+                    await channel.get_partial_message(state.message_id).edit(embed=embed, view=None)
+                except discord.HTTPException:
+                    pass
 
     @app_commands.command(name="add_money", description="Add money to a user (Admin Only)")
     @app_commands.describe(user="Target user", amount="Amount to add")
@@ -243,12 +315,12 @@ class Economy(commands.Cog):
         if amount <= 0:
              return await interaction.response.send_message("❌ Amount must be positive.", ephemeral=True)
              
+        guild_id = str(interaction.guild_id)
         async with AsyncSessionLocal() as db:
-            profile = await self.get_profile(db, str(interaction.guild_id), str(user.id))
-            profile.balance += amount
-            await db.commit()
+            balance = await EconomyService(db).apply(guild_id, str(user.id), amount, "admin_grant")
+        await update_balance_board(self.bot, guild_id, str(user.id), balance)
             
-            await interaction.response.send_message(f"✅ Added **{amount} TL** to {user.mention}. New balance: **{profile.balance} TL**", ephemeral=True)
+        await interaction.response.send_message(f"✅ Added **{amount} TL** to {user.mention}. New balance: **{balance} TL**", ephemeral=True)
 
 async def setup(bot):
     logger.info("Loading Economy cog...")
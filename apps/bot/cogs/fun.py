@@ -6,13 +6,18 @@ Eğlence ve Oyun Sistemi
 - Aşk Ölçer / Uyum Testi
 """
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
 from lithium_core.database.session import AsyncSessionLocal
 from lithium_core.models.fun import (
     Giveaway, Birthday, BirthdayConfig, DuelStats
 )
-from sqlalchemy import select, delete
+from apps.bot.utils.game_state import DuelState, GameStore
+from apps.bot.utils.birthdays import (
+    get_zone, local_today, next_local_midnight, birthday_keys, announcement_gap
+)
+from apps.bot.utils.timer_scheduler import retry_at
+from sqlalchemy import select, delete, update, and_, or_
 import logging
 import random
 import asyncio
@@ -22,6 +27,9 @@ from typing import Optional
 
 logger = logging.getLogger("lithium-bot")
 
+# Ended giveaways keep their entrant set this long for /giveaway_reroll
+GIVEAWAY_REROLL_TTL = 60 * 60 * 24 * 7
+
 
 def parse_duration(duration_str: str) -> int:
     """Süre string'ini saniyeye çevir"""
@@ -37,170 +45,184 @@ def parse_duration(duration_str: str) -> int:
 
 
 class GiveawayView(discord.ui.View):
-    def __init__(self, giveaway_id: int):
+    """Kalıcı katılım butonu; çekiliş mesaj ID'sinden bulunur"""
+
+    def __init__(self):
         super().__init__(timeout=None)
-        self.giveaway_id = giveaway_id
 
     @discord.ui.button(label="🎉 Katıl", style=discord.ButtonStyle.success, custom_id="giveaway_join")
     async def join_giveaway(self, interaction: discord.Interaction, button: discord.ui.Button):
-        # Redis'te katılımcıları tut (veya embed reaction kullan)
-        await interaction.response.send_message("✅ Çekilişe katıldınız! Şansınız bol olsun! 🍀", ephemeral=True)
+        cog = interaction.client.get_cog("FunGames")
+        if cog:
+            await cog.join_giveaway(interaction)
 
 
-class DuelView(discord.ui.View):
-    def __init__(self, player1: discord.Member, player2: discord.Member, bet: int = 0):
-        super().__init__(timeout=60)
-        self.player1 = player1
-        self.player2 = player2
-        self.bet = bet
-        self.player1_choice = None
-        self.player2_choice = None
-
-    @discord.ui.button(label="🪨 Taş", style=discord.ButtonStyle.secondary)
-    async def rock(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await self.make_choice(interaction, "rock")
-
-    @discord.ui.button(label="📄 Kağıt", style=discord.ButtonStyle.secondary)
-    async def paper(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await self.make_choice(interaction, "paper")
-
-    @discord.ui.button(label="✂️ Makas", style=discord.ButtonStyle.secondary)
-    async def scissors(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await self.make_choice(interaction, "scissors")
-
-    async def make_choice(self, interaction: discord.Interaction, choice: str):
-        if interaction.user.id == self.player1.id:
-            if self.player1_choice:
-                return await interaction.response.send_message("Zaten seçim yaptınız!", ephemeral=True)
-            self.player1_choice = choice
-            await interaction.response.send_message(f"✅ Seçiminiz: {choice}", ephemeral=True)
-        elif interaction.user.id == self.player2.id:
-            if self.player2_choice:
-                return await interaction.response.send_message("Zaten seçim yaptınız!", ephemeral=True)
-            self.player2_choice = choice
-            await interaction.response.send_message(f"✅ Seçiminiz: {choice}", ephemeral=True)
-        else:
-            return await interaction.response.send_message("Bu düello size ait değil!", ephemeral=True)
+DUEL_CHOICES = {"rock": "🪨 Taş", "paper": "📄 Kağıt", "scissors": "✂️ Makas"}
 
-        # İki oyuncu da seçti mi?
-        if self.player1_choice and self.player2_choice:
-            await self.finish_game(interaction)
 
-    async def finish_game(self, interaction: discord.Interaction):
-        emojis = {"rock": "🪨", "paper": "📄", "scissors": "✂️"}
-        
-        p1 = self.player1_choice
-        p2 = self.player2_choice
-        
-        # Kazanan belirle
-        if p1 == p2:
-            result = "draw"
-            winner = None
-        elif (p1 == "rock" and p2 == "scissors") or \
-             (p1 == "paper" and p2 == "rock") or \
-             (p1 == "scissors" and p2 == "paper"):
-            result = "player1"
-            winner = self.player1
-            loser = self.player2
-        else:
-            result = "player2"
-            winner = self.player2
-            loser = self.player1
+class DuelButton(discord.ui.DynamicItem[discord.ui.Button], template=r"duel:(?P<choice>rock|paper|scissors):(?P<game_id>[0-9a-f]+)"):
+    """Düello durumu Redis'te; buton custom_id'si oyun kimliğini taşır"""
 
-        embed = discord.Embed(title="⚔️ Düello Sonucu", timestamp=datetime.utcnow())
-        embed.add_field(
-            name=self.player1.display_name,
-            value=f"{emojis[p1]} {p1.title()}",
-            inline=True
-        )
-        embed.add_field(name="VS", value="⚔️", inline=True)
-        embed.add_field(
-            name=self.player2.display_name,
-            value=f"{emojis[p2]} {p2.title()}",
-            inline=True
-        )
+    def __init__(self, choice: str, game_id: str):
+        super().__init__(discord.ui.Button(
+            label=DUEL_CHOICES[choice],
+            style=discord.ButtonStyle.secondary,
+            custom_id=f"duel:{choice}:{game_id}"
+        ))
+        self.choice = choice
+        self.game_id = game_id
 
-        if result == "draw":
-            embed.description = "🤝 **BERABERE!**"
-            embed.color = discord.Color.gold()
-        else:
-            embed.description = f"🏆 **{winner.mention} KAZANDI!**"
-            embed.color = discord.Color.green()
-            
-            # İstatistik güncelle
-            async with AsyncSessionLocal() as db:
-                # Kazanan
-                stmt = select(DuelStats).where(
-                    DuelStats.guild_id == str(interaction.guild_id),
-                    DuelStats.user_id == str(winner.id)
-                )
-                winner_stats = (await db.execute(stmt)).scalar_one_or_none()
-                if not winner_stats:
-                    winner_stats = DuelStats(guild_id=str(interaction.guild_id), user_id=str(winner.id))
-                    db.add(winner_stats)
-                winner_stats.wins += 1
-                
-                # Kaybeden
-                stmt = select(DuelStats).where(
-                    DuelStats.guild_id == str(interaction.guild_id),
-                    DuelStats.user_id == str(loser.id)
-                )
-                loser_stats = (await db.execute(stmt)).scalar_one_or_none()
-                if not loser_stats:
-                    loser_stats = DuelStats(guild_id=str(interaction.guild_id), user_id=str(loser.id))
-                    db.add(loser_stats)
-                loser_stats.losses += 1
-                
-                await db.commit()
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(match["choice"], match["game_id"])
 
-        await interaction.message.edit(embed=embed, view=None)
-        self.stop()
+    async def callback(self, interaction: discord.Interaction):
+        cog = interaction.client.get_cog("FunGames")
+        if cog:
+            await cog.duel_choice(interaction, self.game_id, self.choice)
+
+
+def duel_view(game_id: str) -> discord.ui.View:
+    view = discord.ui.View(timeout=None)
+    for choice in DUEL_CHOICES:
+        view.add_item(DuelButton(choice, game_id))
+    return view
+
+
+def giveaway_key(message_id: int, part: str) -> str:
+    """
+    giveaway:{id}:buttons   - joined with the button
+    giveaway:{id}:reactions - reacted with 🎉 (complete only while `tracked` exists)
+    giveaway:{id}:tracked   - every reaction since creation was seen live
+    giveaway:{id}:entrants  - union of both, built at the draw and kept for rerolls
+    """
+    return f"giveaway:{message_id}:{part}"
 
 
 class FunGames(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.giveaway_checker.start()
-        self.birthday_checker.start()
+        # message_id -> (host_id, required_role_id) for giveaways still running
+        self.active_giveaways = {}
+
+    async def cog_load(self):
+        self.games = GameStore(self.bot.redis)
+        self.bot.add_dynamic_items(DuelButton)
+        self.bot.add_view(GiveawayView())
+        self.bot.timers.register("giveaway", self.end_giveaways, self.load_pending_giveaways)
+        self.bot.timers.register("birthday", self.birthday_checker, self.load_birthday_timer)
 
     def cog_unload(self):
-        self.giveaway_checker.cancel()
-        self.birthday_checker.cancel()
+        self.bot.remove_dynamic_items(DuelButton)
+        self.bot.timers.unregister("giveaway")
+        self.bot.timers.unregister("birthday")
 
     # ==================== ÇEKİLİŞ SİSTEMİ ====================
 
-    @tasks.loop(seconds=30)
-    async def giveaway_checker(self):
-        """Biten çekilişleri kontrol et"""
+    async def load_pending_giveaways(self):
+        """Devam eden çekilişlerin bitiş zamanları (scheduler başlangıcında yüklenir)"""
+        async with AsyncSessionLocal() as db:
+            stmt = select(
+                Giveaway.id, Giveaway.ends_at, Giveaway.message_id, Giveaway.host_id,
+                Giveaway.required_role_id, Giveaway.guild_id
+            ).where(Giveaway.ended == False)
+            rows = (await db.execute(stmt)).all()
+        rows = [row for row in rows if self.bot.owns_guild(row.guild_id)]
+        for _, _, message_id, host_id, required_role_id, _ in rows:
+            self.track_giveaway(int(message_id), host_id, required_role_id)
+        # Reactions added while the bot was down were missed: rescan these at the draw
+        if rows:
+            await self.bot.redis.delete(*(giveaway_key(int(row.message_id), "tracked") for row in rows))
+        return [(giveaway_id, ends_at) for giveaway_id, ends_at, *_ in rows]
+
+    def track_giveaway(self, message_id: int, host_id: str, required_role_id: Optional[str]):
+        self.active_giveaways[message_id] = (int(host_id), int(required_role_id) if required_role_id else None)
+
+    def can_enter(self, message_id: int, member: discord.Member) -> bool:
+        host_id, required_role_id = self.active_giveaways[message_id]
+        if member.bot or member.id == host_id:
+            return False
+        return not required_role_id or any(role.id == required_role_id for role in member.roles)
+
+    async def join_giveaway(self, interaction: discord.Interaction):
+        """Buton ile katılım; katılımcılar Redis set'inde tutulur"""
+        message_id = interaction.message.id
+        if message_id not in self.active_giveaways:
+            return await interaction.response.send_message("❌ Bu çekiliş sona erdi!", ephemeral=True)
+        if not self.can_enter(message_id, interaction.user):
+            return await interaction.response.send_message("❌ Bu çekilişe katılamazsınız!", ephemeral=True)
+
+        if not await self.bot.redis.sadd(giveaway_key(message_id, "buttons"), interaction.user.id):
+            return await interaction.response.send_message("ℹ️ Zaten katıldınız!", ephemeral=True)
+        await interaction.response.send_message("✅ Çekilişe katıldınız! Şansınız bol olsun! 🍀", ephemeral=True)
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
+        if payload.message_id not in self.active_giveaways or str(payload.emoji) != "🎉" or not payload.member:
+            return
+        if self.can_enter(payload.message_id, payload.member):
+            await self.bot.redis.sadd(giveaway_key(payload.message_id, "reactions"), payload.user_id)
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
+        if payload.message_id in self.active_giveaways and str(payload.emoji) == "🎉":
+            # Button entries stay; only the reaction entry is withdrawn
+            await self.bot.redis.srem(giveaway_key(payload.message_id, "reactions"), payload.user_id)
+
+    async def scan_giveaway_reactions(self, message: discord.Message, giveaway: Giveaway) -> list:
+        """Canlı izlenmemiş çekilişler için 🎉 tepkilerini tara"""
+        participants = []
+        for reaction in message.reactions:
+            if str(reaction.emoji) == "🎉":
+                async for user in reaction.users():
+                    member = message.guild.get_member(user.id) if message.guild else None
+                    if member is not None and message.id in self.active_giveaways:
+                        if self.can_enter(message.id, member):
+                            participants.append(user.id)
+                    elif not user.bot and str(user.id) != giveaway.host_id:
+                        participants.append(user.id)
+        return participants
+
+    async def end_giveaways(self, giveaway_ids: list):
+        """Biten çekilişleri sonuçlandır"""
+        now = datetime.utcnow()
+        abandoned = []
         async with AsyncSessionLocal() as db:
             stmt = select(Giveaway).where(
-                Giveaway.ended == False,
-                Giveaway.ends_at <= datetime.utcnow()
+                Giveaway.id.in_(giveaway_ids),
+                Giveaway.ended == False
             )
             giveaways = (await db.execute(stmt)).scalars().all()
             
             for giveaway in giveaways:
+                # Read up front for the error path
+                giveaway_id, ends_at, message_id = giveaway.id, giveaway.ends_at, int(giveaway.message_id)
                 try:
                     channel = self.bot.get_channel(int(giveaway.channel_id))
                     if not channel:
+                        # Guild unavailable or channel deleted: retry, then give up
+                        if not self.retry_giveaway(giveaway_id, ends_at, now):
+                            abandoned.append((giveaway_id, message_id))
                         continue
-                    
-                    message = await channel.fetch_message(int(giveaway.message_id))
-                    if not message:
-                        continue
-                    
-                    # Katılımcıları al (🎉 reaction)
-                    participants = []
-                    for reaction in message.reactions:
-                        if str(reaction.emoji) == "🎉":
-                            async for user in reaction.users():
-                                if not user.bot and str(user.id) != giveaway.host_id:
-                                    participants.append(user)
-                    
-                    # Kazananları seç
-                    winner_count = min(giveaway.winner_count, len(participants))
-                    
-                    if winner_count == 0:
+
+                    reactions_key = giveaway_key(message_id, "reactions")
+                    key = giveaway_key(message_id, "entrants")
+                    if await self.bot.redis.exists(giveaway_key(message_id, "tracked")):
+                        message = channel.get_partial_message(message_id)
+                    else:
+                        # Started before tracking or spanned a restart: the scan is the full reaction list
+                        message = await channel.fetch_message(message_id)
+                        participants = await self.scan_giveaway_reactions(message, giveaway)
+                        await self.bot.redis.delete(reactions_key)
+                        if participants:
+                            await self.bot.redis.sadd(reactions_key, *participants)
+
+                    await self.bot.redis.sunionstore(key, [giveaway_key(message_id, "buttons"), reactions_key])
+                    entrant_count = await self.bot.redis.scard(key)
+                    # Distinct random members, drawn server-side
+                    winner_ids = [int(uid) for uid in await self.bot.redis.srandmember(key, giveaway.winner_count)]
+
+                    if not winner_ids:
                         embed = discord.Embed(
                             title="🎉 Çekiliş Sona Erdi",
                             description=f"**Ödül:** {giveaway.prize}\n\n❌ Yeterli katılımcı olmadığı için kazanan yok!",
@@ -208,30 +230,54 @@ class FunGames(commands.Cog):
                         )
                         await message.edit(embed=embed, view=None)
                     else:
-                        winners = random.sample(participants, winner_count)
-                        winner_mentions = ", ".join([w.mention for w in winners])
+                        winner_mentions = ", ".join(f"<@{uid}>" for uid in winner_ids)
                         
                         embed = discord.Embed(
                             title="🎉 Çekiliş Sona Erdi!",
                             description=f"**Ödül:** {giveaway.prize}\n\n🏆 **Kazananlar:** {winner_mentions}",
                             color=discord.Color.gold()
                         )
-                        embed.set_footer(text=f"Katılımcı: {len(participants)}")
+                        embed.set_footer(text=f"Katılımcı: {entrant_count}")
                         
                         await message.edit(embed=embed, view=None)
                         await channel.send(f"🎊 Tebrikler {winner_mentions}! **{giveaway.prize}** kazandınız!")
                         
-                        giveaway.winners = [str(w.id) for w in winners]
+                        giveaway.winners = [str(uid) for uid in winner_ids]
                     
                     giveaway.ended = True
                     await db.commit()
+                    self.active_giveaways.pop(message_id, None)
+                    # Keep entrants around for rerolls
+                    await self.bot.redis.expire(key, GIVEAWAY_REROLL_TTL)
+                    await self.bot.redis.delete(
+                        giveaway_key(message_id, "buttons"), reactions_key, giveaway_key(message_id, "tracked")
+                    )
                     
+                except discord.NotFound:
+                    logger.warning(f"Giveaway {giveaway_id}: message {message_id} is gone, ending without a draw")
+                    abandoned.append((giveaway_id, message_id))
                 except Exception as e:
                     logger.error(f"Giveaway check error: {e}")
+                    if not self.retry_giveaway(giveaway_id, ends_at, now):
+                        abandoned.append((giveaway_id, message_id))
 
-    @giveaway_checker.before_loop
-    async def before_giveaway_checker(self):
-        await self.bot.wait_until_ready()
+        if abandoned:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(Giveaway).where(Giveaway.id.in_([gid for gid, _ in abandoned])).values(ended=True)
+                )
+                await db.commit()
+            for _, message_id in abandoned:
+                self.active_giveaways.pop(message_id, None)
+
+    def retry_giveaway(self, giveaway_id: int, ends_at: datetime, now: datetime) -> bool:
+        """Çekilişi artan bekleme ile yeniden zamanla; çok gecikmişse False"""
+        retry = retry_at(ends_at, now)
+        if retry is None:
+            logger.warning(f"Giving up on giveaway {giveaway_id}, undrawn since {ends_at}")
+            return False
+        self.bot.timers.schedule("giveaway", giveaway_id, retry)
+        return True
 
     @app_commands.command(name="giveaway", description="Çekiliş başlat")
     @app_commands.describe(
@@ -260,7 +306,7 @@ class FunGames(commands.Cog):
         
         embed = discord.Embed(
             title="🎉 ÇEKİLİŞ!",
-            description=f"**Ödül:** {prize}\n\n🎯 Katılmak için 🎉 emojisine tıklayın!",
+            description=f"**Ödül:** {prize}\n\n🎯 Katılmak için 🎉 emojisine ya da Katıl butonuna tıklayın!",
             color=discord.Color.gold(),
             timestamp=ends_at
         )
@@ -273,8 +319,10 @@ class FunGames(commands.Cog):
         
         embed.set_footer(text="Çekiliş bitiş zamanı")
         
-        await interaction.response.send_message(embed=embed)
+        await interaction.response.send_message(embed=embed, view=GiveawayView())
         message = await interaction.original_response()
+        # Accept entries as soon as the message id is known; until then a click is answered as ended
+        self.track_giveaway(message.id, str(interaction.user.id), str(required_role.id) if required_role else None)
         await message.add_reaction("🎉")
         
         # Database kaydet
@@ -291,93 +339,122 @@ class FunGames(commands.Cog):
             )
             db.add(giveaway)
             await db.commit()
+        self.bot.timers.schedule("giveaway", giveaway.id, ends_at)
+
+        # Reactions before track_giveaway were not seen live: pick them up once, then the set is complete
+        try:
+            message = await message.fetch()
+            participants = await self.scan_giveaway_reactions(message, giveaway)
+        except discord.HTTPException:
+            return  # Left untracked; the draw rescans the reactions
+        if participants:
+            await self.bot.redis.sadd(giveaway_key(message.id, "reactions"), *participants)
+        await self.bot.redis.set(giveaway_key(message.id, "tracked"), "1")
 
     @app_commands.command(name="giveaway_reroll", description="Çekiliş kazananını yeniden çek")
     @app_commands.describe(message_id="Çekiliş mesaj ID'si")
     @app_commands.checks.has_permissions(manage_guild=True)
     async def giveaway_reroll(self, interaction: discord.Interaction, message_id: str):
-        try:
-            message = await interaction.channel.fetch_message(int(message_id))
-        except:
+        if not message_id.isdigit():
             return await interaction.response.send_message("❌ Mesaj bulunamadı!", ephemeral=True)
-        
-        # Katılımcıları al
-        participants = []
-        for reaction in message.reactions:
-            if str(reaction.emoji) == "🎉":
-                async for user in reaction.users():
-                    if not user.bot:
-                        participants.append(user)
-        
-        if not participants:
-            return await interaction.response.send_message("❌ Katılımcı yok!", ephemeral=True)
-        
-        winner = random.choice(participants)
-        await interaction.response.send_message(f"🎊 Yeni kazanan: {winner.mention}! Tebrikler!")
+
+        winner_id = await self.bot.redis.srandmember(giveaway_key(int(message_id), "entrants"))
+        if winner_id:
+            winner_id = int(winner_id)
+        else:
+            try:
+                message = await interaction.channel.fetch_message(int(message_id))
+            except discord.HTTPException:
+                return await interaction.response.send_message("❌ Mesaj bulunamadı!", ephemeral=True)
+
+            participants = []
+            for reaction in message.reactions:
+                if str(reaction.emoji) == "🎉":
+                    async for user in reaction.users():
+                        if not user.bot:
+                            participants.append(user.id)
+            if not participants:
+                return await interaction.response.send_message("❌ Katılımcı yok!", ephemeral=True)
+            winner_id = random.choice(participants)
+
+        await interaction.response.send_message(f"🎊 Yeni kazanan: <@{winner_id}>! Tebrikler!")
 
     # ==================== DOĞUM GÜNÜ SİSTEMİ ====================
 
-    @tasks.loop(hours=1)
-    async def birthday_checker(self):
-        """Her saat doğum günlerini kontrol et"""
+    async def load_birthday_timer(self):
+        """Her saat dilimi için hemen bir kontrol (bugün kaçırılanlar); sonrası gece yarısına kurulur"""
+        async with AsyncSessionLocal() as db:
+            zones = (await db.execute(select(BirthdayConfig.timezone).distinct())).scalars().all()
+        # Fire now for the current local date; the per-date marker skips anyone already celebrated
         now = datetime.utcnow()
-        
+        return [(tz, now) for tz in {tz or "UTC" for tz in zones}]
+
+    async def birthday_checker(self, zones: list):
+        """Yerel günü başlayan saat dilimlerindeki doğum günlerini kutla"""
+        now = datetime.utcnow()
+        for tz in zones:
+            self.bot.timers.schedule("birthday", tz, next_local_midnight(tz, now))
+
+        # (timezone, local date) for each due zone; one joined query for all of them
+        local_dates = {tz: local_today(tz, now) for tz in zones}
+        conditions = [
+            and_(BirthdayConfig.timezone == tz, Birthday.month == month, Birthday.day == day)
+            for tz, today in local_dates.items()
+            for month, day in birthday_keys(today)
+        ]
+        if "UTC" in local_dates:
+            conditions += [
+                and_(BirthdayConfig.timezone == None, Birthday.month == month, Birthday.day == day)
+                for month, day in birthday_keys(local_dates["UTC"])
+            ]
+
         async with AsyncSessionLocal() as db:
-            # Bugünün doğum günlerini bul
-            stmt = select(Birthday).where(
-                Birthday.day == now.day,
-                Birthday.month == now.month
-            )
-            birthdays = (await db.execute(stmt)).scalars().all()
-            
-            for birthday in birthdays:
+            stmt = select(
+                Birthday.guild_id, Birthday.user_id, BirthdayConfig.timezone,
+                BirthdayConfig.channel_id, BirthdayConfig.message_template, BirthdayConfig.role_id
+            ).join(BirthdayConfig, BirthdayConfig.guild_id == Birthday.guild_id).where(or_(*conditions))
+            rows = (await db.execute(stmt)).all()
+
+        gap = announcement_gap(len(rows))
+        for guild_id, user_id, tz, channel_id, template, role_id in rows:
+            try:
+                guild = self.bot.get_guild(int(guild_id))
+                if not guild:
+                    continue
+                member = guild.get_member(int(user_id))
+                channel = guild.get_channel(int(channel_id))
+                if not member or not channel:
+                    continue
+
+                # Celebrate once per local date, even if the timer fires again
+                today = local_dates.get(tz or "UTC")
+                marker = f"birthday:{guild_id}:{user_id}:{today.isoformat()}"
+                if not await self.bot.redis.set(marker, "1", ex=60 * 60 * 48, nx=True):
+                    continue
+
+                embed = discord.Embed(
+                    title="🎂 Doğum Günün Kutlu Olsun!",
+                    description=(template or "").replace("{user}", member.mention),
+                    color=discord.Color.magenta()
+                )
+                embed.set_thumbnail(url=member.display_avatar.url)
                 try:
-                    # Config al
-                    config_stmt = select(BirthdayConfig).where(
-                        BirthdayConfig.guild_id == birthday.guild_id
-                    )
-                    config = (await db.execute(config_stmt)).scalar_one_or_none()
-                    if not config:
-                        continue
-                    
-                    guild = self.bot.get_guild(int(birthday.guild_id))
-                    if not guild:
-                        continue
-                    
-                    member = guild.get_member(int(birthday.user_id))
-                    if not member:
-                        continue
-                    
-                    channel = guild.get_channel(int(config.channel_id))
-                    if not channel:
-                        continue
-                    
-                    # Bugün zaten kutlandı mı? (Redis ile kontrol)
-                    # Basit versiyon: her saat kontrol eder ama gün içinde tekrarlamaz
-                    
-                    message = config.message_template.replace("{user}", member.mention)
-                    
-                    embed = discord.Embed(
-                        title="🎂 Doğum Günün Kutlu Olsun!",
-                        description=message,
-                        color=discord.Color.magenta()
-                    )
-                    embed.set_thumbnail(url=member.display_avatar.url)
-                    
                     await channel.send(embed=embed)
-                    
-                    # Birthday role ver (varsa)
-                    if config.role_id:
-                        role = guild.get_role(int(config.role_id))
-                        if role and role not in member.roles:
-                            await member.add_roles(role, reason="Doğum günü!")
-                    
-                except Exception as e:
-                    logger.error(f"Birthday check error: {e}")
-
-    @birthday_checker.before_loop
-    async def before_birthday_checker(self):
-        await self.bot.wait_until_ready()
+                except Exception:
+                    # Not celebrated: let the next check (e.g. after a restart) try again
+                    await self.bot.redis.delete(marker)
+                    raise
+
+                # Birthday role ver (varsa)
+                if role_id:
+                    role = guild.get_role(int(role_id))
+                    if role and role not in member.roles:
+                        await member.add_roles(role, reason="Doğum günü!")
+            except Exception as e:
+                logger.error(f"Birthday announcement error: {e}")
+
+            if gap:
+                await asyncio.sleep(gap)
 
     @app_commands.command(name="birthday_set", description="Doğum gününüzü kaydedin")
     @app_commands.describe(day="Gün (1-31)", month="Ay (1-12)")
@@ -415,13 +492,20 @@ class FunGames(commands.Cog):
         )
 
     @app_commands.command(name="birthday_setup", description="Doğum günü kanalını ayarla")
+    @app_commands.describe(timezone="Saat dilimi (örn: Europe/Istanbul), varsayılan UTC")
     @app_commands.checks.has_permissions(administrator=True)
     async def birthday_setup(
         self, 
         interaction: discord.Interaction, 
         channel: discord.TextChannel,
-        role: discord.Role = None
+        role: discord.Role = None,
+        timezone: str = None
     ):
+        if timezone and not get_zone(timezone):
+            return await interaction.response.send_message(
+                "❌ Geçersiz saat dilimi! Örnek: Europe/Istanbul", ephemeral=True
+            )
+
         async with AsyncSessionLocal() as db:
             stmt = select(BirthdayConfig).where(BirthdayConfig.guild_id == str(interaction.guild_id))
             config = (await db.execute(stmt)).scalar_one_or_none()
@@ -433,8 +517,13 @@ class FunGames(commands.Cog):
             config.channel_id = str(channel.id)
             if role:
                 config.role_id = str(role.id)
+            if timezone:
+                config.timezone = timezone
             
             await db.commit()
+            zone = config.timezone or "UTC"
+        # Run today's check now in case the local midnight has already passed
+        self.bot.timers.schedule("birthday", zone, datetime.utcnow())
         
         await interaction.response.send_message(
             f"✅ Doğum günü kutlamaları {channel.mention} kanalına gönderilecek!",
@@ -456,8 +545,92 @@ class FunGames(commands.Cog):
             color=discord.Color.red()
         )
         
-        view = DuelView(interaction.user, opponent)
-        await interaction.response.send_message(embed=embed, view=view)
+        state = DuelState(guild_id=interaction.guild_id, player1_id=interaction.user.id, player2_id=opponent.id)
+        await self.games.save(state)
+        await interaction.response.send_message(embed=embed, view=duel_view(state.game_id))
+
+    async def duel_choice(self, interaction: discord.Interaction, game_id: str, choice: str):
+        state = await self.games.load(DuelState, game_id)
+        if not state:
+            return await interaction.response.send_message("❌ Bu düello sona erdi!", ephemeral=True)
+
+        if interaction.user.id == state.player1_id:
+            field = "player1_choice"
+        elif interaction.user.id == state.player2_id:
+            field = "player2_choice"
+        else:
+            return await interaction.response.send_message("Bu düello size ait değil!", ephemeral=True)
+
+        # Atomic: a second click (or a click racing another process) can't overwrite the choice
+        if not await self.games.set_once(DuelState, game_id, field, choice):
+            return await interaction.response.send_message("Zaten seçim yaptınız!", ephemeral=True)
+        await interaction.response.send_message(f"✅ Seçiminiz: {choice}", ephemeral=True)
+
+        # İki oyuncu da seçti mi?
+        state = await self.games.load(DuelState, game_id)
+        if state and state.player1_choice and state.player2_choice:
+            if await self.games.finish(DuelState, game_id):
+                await self.finish_duel(interaction, state)
+
+    async def finish_duel(self, interaction: discord.Interaction, state: DuelState):
+        emojis = {"rock": "🪨", "paper": "📄", "scissors": "✂️"}
+        
+        p1 = state.player1_choice
+        p2 = state.player2_choice
+        player1 = interaction.guild.get_member(state.player1_id)
+        player2 = interaction.guild.get_member(state.player2_id)
+        
+        # Kazanan belirle
+        winner_id = state.winner_id()
+        loser_id = state.player2_id if winner_id == state.player1_id else state.player1_id
+
+        embed = discord.Embed(title="⚔️ Düello Sonucu", timestamp=datetime.utcnow())
+        embed.add_field(
+            name=player1.display_name if player1 else str(state.player1_id),
+            value=f"{emojis[p1]} {p1.title()}",
+            inline=True
+        )
+        embed.add_field(name="VS", value="⚔️", inline=True)
+        embed.add_field(
+            name=player2.display_name if player2 else str(state.player2_id),
+            value=f"{emojis[p2]} {p2.title()}",
+            inline=True
+        )
+
+        if winner_id is None:
+            embed.description = "🤝 **BERABERE!**"
+            embed.color = discord.Color.gold()
+        else:
+            embed.description = f"🏆 **<@{winner_id}> KAZANDI!**"
+            embed.color = discord.Color.green()
+            
+            # İstatistik güncelle
+            async with AsyncSessionLocal() as db:
+                # Kazanan
+                stmt = select(DuelStats).where(
+                    DuelStats.guild_id == str(interaction.guild_id),
+                    DuelStats.user_id == str(winner_id)
+                )
+                winner_stats = (await db.execute(stmt)).scalar_one_or_none()
+                if not winner_stats:
+                    winner_stats = DuelStats(guild_id=str(interaction.guild_id), user_id=str(winner_id))
+                    db.add(winner_stats)
+                winner_stats.wins += 1
+                
+                # Kaybeden
+                stmt = select(DuelStats).where(
+                    DuelStats.guild_id == str(interaction.guild_id),
+                    DuelStats.user_id == str(loser_id)
+                )
+                loser_stats = (await db.execute(stmt)).scalar_one_or_none()
+                if not loser_stats:
+                    loser_stats = DuelStats(guild_id=str(interaction.guild_id), user_id=str(loser_id))
+                    db.add(loser_stats)
+                loser_stats.losses += 1
+                
+                await db.commit()
+
+        await interaction.message.edit(embed=embed, view=None)
 
     @app_commands.command(name="coinflip_duel", description="Yazı-Tura düellosu")
     async def coinflip_duel(self, interaction: discord.Interaction, opponent: discord.Member):
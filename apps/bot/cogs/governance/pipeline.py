@@ -16,6 +16,7 @@ import hashlib
 import asyncio
 import re
 import os
+import time
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
 import redis.asyncio as redis
@@ -406,15 +407,22 @@ class EventPipeline(commands.Cog):
                 if risk.is_high_risk:
                     config = await governance_svc.get_or_create_config(guild_id)
                     
+                    # During a raid, role grants and logs are batched by AntiRaid
+                    antiraid = self.bot.get_cog("AntiRaid")
+                    raid_mode = antiraid is not None and antiraid.in_raid_mode(member.guild.id, time.monotonic())
+                    
                     # Quarantine
                     if config.quarantine_role_id:
                         quarantine_role = member.guild.get_role(int(config.quarantine_role_id))
                         if quarantine_role:
-                            await member.add_roles(quarantine_role, reason="High risk newcomer")
+                            if raid_mode:
+                                antiraid.responder.submit(member, "QUARANTINE_ROLE", "High risk newcomer", quarantine_role.id)
+                            else:
+                                await member.add_roles(quarantine_role, reason="High risk newcomer")
                             await risk_svc.quarantine_user(guild_id, user_id)
                     
-                    # Alert
-                    if config.alerts_channel_id:
+                    # Alert (one per member is too noisy during a raid)
+                    if config.alerts_channel_id and not raid_mode:
                         alert_channel = self.bot.get_channel(int(config.alerts_channel_id))
                         if alert_channel:
                             embed = discord.Embed(
@@ -24,6 +24,24 @@ class SafeModeHandler(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
     
+    async def cog_load(self):
+        self.bot.timers.register("lockdown", self.expire_lockdowns, self.load_pending_lockdowns)
+    
+    def cog_unload(self):
+        self.bot.timers.unregister("lockdown")
+    
+    async def load_pending_lockdowns(self):
+        """Aktif lockdown bitiş zamanları (scheduler başlangıcında yüklenir)"""
+        async with AsyncSessionLocal() as db:
+            rows = await GovernanceService(db).get_pending_lockdowns()
+        # Other clusters expire their own guilds' lockdowns
+        return [(guild_id, expires_at) for guild_id, expires_at in rows if self.bot.owns_guild(guild_id)]
+    
+    async def expire_lockdowns(self, guild_ids: list):
+        """Süresi dolan lockdown'ları kaldır"""
+        async with AsyncSessionLocal() as db:
+            await GovernanceService(db).check_expired_lockdowns(guild_ids)
+    
     def is_owner(self, interaction: discord.Interaction) -> bool:
         """Check if user is server owner"""
         return interaction.user.id == interaction.guild.owner_id
@@ -222,6 +240,7 @@ class SafeModeHandler(commands.Cog):
                     reason,
                     duration * 60  # dakikayı saniyeye çevir
                 )
+                self.bot.timers.schedule("lockdown", config.guild_id, config.lockdown_expires_at)
                 
                 # Audit
                 await case_svc.log_audit_event(
@@ -254,6 +273,7 @@ class SafeModeHandler(commands.Cog):
             
             else:  # disable
                 config = await governance_svc.disable_lockdown(str(interaction.guild_id))
+                self.bot.timers.cancel("lockdown", config.guild_id)
                 
                 # Audit
                 await case_svc.log_audit_event(
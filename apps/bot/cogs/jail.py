@@ -5,17 +5,24 @@ Jail (Hapis) ve Gelişmiş Mute Sistemi
 - Unjail/Unmute komutları
 """
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
 from lithium_core.database.session import AsyncSessionLocal
 from lithium_core.models.security import JailConfig, JailedUser, TempMute
 from sqlalchemy import select, delete
+from apps.bot.utils.concurrency import gather_limited
+from apps.bot.utils.roles import release_role_list
 import logging
 from datetime import datetime, timedelta
 import re
 
 logger = logging.getLogger("lithium-bot")
 
+# Releases that could not be applied are retried; the wait grows with how overdue
+# the release is, so a member who left for good is not retried every minute
+JAIL_RETRY_MIN = timedelta(seconds=60)
+JAIL_RETRY_MAX = timedelta(hours=6)
+
 
 def parse_duration(duration_str: str) -> int:
     """Süre string'ini saniyeye çevir (örn: 10m, 1h, 1d)"""
@@ -39,63 +46,75 @@ def parse_duration(duration_str: str) -> int:
 class JailSystem(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.jail_checker.start()
+
+    async def cog_load(self):
+        self.bot.timers.register("unjail", self.release_expired, self.load_pending_releases)
 
     def cog_unload(self):
-        self.jail_checker.cancel()
+        self.bot.timers.unregister("unjail")
 
-    @tasks.loop(minutes=1)
-    async def jail_checker(self):
-        """Süresi dolan jail'leri kontrol et"""
+    async def load_pending_releases(self):
+        """Süreli jail kayıtları (scheduler başlangıcında yüklenir)"""
         async with AsyncSessionLocal() as db:
-            stmt = select(JailedUser).where(
-                JailedUser.release_at != None,
-                JailedUser.release_at <= datetime.utcnow()
-            )
+            stmt = select(JailedUser.id, JailedUser.release_at, JailedUser.guild_id).where(JailedUser.release_at != None)
+            rows = (await db.execute(stmt)).all()
+        # Other clusters release their own guilds' members
+        return [(jailed_id, release_at) for jailed_id, release_at, guild_id in rows if self.bot.owns_guild(guild_id)]
+
+    def retry_release(self, jailed: JailedUser, now: datetime):
+        """Bırakılamayan jail'i artan bekleme ile yeniden zamanla"""
+        delay = min(max(now - (jailed.release_at or now), JAIL_RETRY_MIN), JAIL_RETRY_MAX)
+        self.bot.timers.schedule("unjail", jailed.id, now + delay)
+
+    async def release_expired(self, jailed_ids: list):
+        """Süresi dolan jail'leri toplu olarak kaldır"""
+        async with AsyncSessionLocal() as db:
+            stmt = select(JailedUser).where(JailedUser.id.in_(jailed_ids))
             expired = (await db.execute(stmt)).scalars().all()
+            if not expired:
+                return
+            
+            # Tüm guild config'leri tek sorguda
+            guild_ids = {jailed.guild_id for jailed in expired}
+            config_stmt = select(JailConfig).where(JailConfig.guild_id.in_(guild_ids))
+            configs = {c.guild_id: c for c in (await db.execute(config_stmt)).scalars().all()}
             
+            releases = []
+            now = datetime.utcnow()
             for jailed in expired:
-                try:
-                    guild = self.bot.get_guild(int(jailed.guild_id))
-                    if not guild:
-                        continue
-                    
-                    member = guild.get_member(int(jailed.user_id))
-                    if not member:
-                        continue
-                    
-                    # Config al
-                    config_stmt = select(JailConfig).where(JailConfig.guild_id == jailed.guild_id)
-                    config = (await db.execute(config_stmt)).scalar_one_or_none()
-                    if not config:
-                        continue
-                    
-                    # Jail rolünü kaldır
-                    jail_role = guild.get_role(int(config.jail_role_id))
-                    if jail_role and jail_role in member.roles:
-                        await member.remove_roles(jail_role, reason="Hapis süresi doldu")
-                    
-                    # Eski rolleri geri ver
-                    if jailed.previous_roles:
-                        for role_id in jailed.previous_roles:
-                            role = guild.get_role(int(role_id))
-                            if role and role not in member.roles:
-                                try:
-                                    await member.add_roles(role, reason="Hapis süresi doldu - roller geri verildi")
-                                except:
-                                    pass
-                    
-                    # Kayıt sil
-                    await db.delete(jailed)
-                    await db.commit()
-                    
-                    logger.info(f"Auto-unjailed {member} in {guild.name}")
-                except Exception as e:
-                    logger.error(f"Jail checker error: {e}")
-
-    @jail_checker.before_loop
-    async def before_jail_checker(self):
-        await self.bot.wait_until_ready()
+                if not self.bot.owns_guild(jailed.guild_id):
+                    continue
+                guild = self.bot.get_guild(int(jailed.guild_id))
+                config = configs.get(jailed.guild_id)
+                member = guild.get_member(int(jailed.user_id)) if guild else None
+                # Guild unavailable, jail not configured or member away: try again later
+                if not config or not member:
+                    self.retry_release(jailed, now)
+                    continue
+                
+                jail_role = guild.get_role(int(config.jail_role_id))
+                roles = release_role_list(member, jail_role, jailed.previous_roles)
+                releases.append((jailed, member, roles))
+            
+            # Üye başına tek REST çağrısı (jail rolü kaldır + eski roller)
+            results = await gather_limited(
+                member.edit(roles=roles, reason="Hapis süresi doldu - roller geri verildi")
+                for _, member, roles in releases
+            )
+            
+            released_ids = []
+            for (jailed, member, _), result in zip(releases, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Jail release error for {member}, retrying: {result}")
+                    self.retry_release(jailed, now)
+                    continue
+                released_ids.append(jailed.id)
+            
+            # Tek toplu silme + commit
+            if released_ids:
+                await db.execute(delete(JailedUser).where(JailedUser.id.in_(released_ids)))
+                await db.commit()
+                logger.info(f"Auto-unjailed {len(released_ids)} members")
 
     # ==================== JAIL SETUP ====================
 
@@ -219,10 +238,9 @@ class JailSystem(commands.Cog):
             
             # Rolleri kaldır ve jail rolü ver
             try:
-                roles_to_remove = [r for r in member.roles if r != interaction.guild.default_role and r.is_assignable()]
-                if roles_to_remove:
-                    await member.remove_roles(*roles_to_remove, reason=f"Jail: {reason}")
-                await member.add_roles(jail_role, reason=f"Jail: {reason}")
+                # Atanamayan (managed / üst) roller kalır, gerisi jail rolüyle değişir
+                kept_roles = [r for r in member.roles if r != interaction.guild.default_role and not r.is_assignable()]
+                await member.edit(roles=kept_roles + [jail_role], reason=f"Jail: {reason}")
             except discord.Forbidden:
                 return await interaction.followup.send("❌ Rol değiştirme yetkisi yok!")
 
@@ -237,6 +255,8 @@ class JailSystem(commands.Cog):
             )
             db.add(jailed)
             await db.commit()
+            if release_at:
+                self.bot.timers.schedule("unjail", jailed.id, release_at)
 
         # Embed oluştur
         embed = discord.Embed(
@@ -298,25 +318,15 @@ class JailSystem(commands.Cog):
             if not jailed:
                 return await interaction.followup.send(f"❌ {member.mention} hapiste değil!")
             
-            # Jail rolünü kaldır
+            # Jail rolünü kaldır + eski rolleri geri ver (tek çağrı)
             jail_role = interaction.guild.get_role(int(config.jail_role_id))
-            if jail_role and jail_role in member.roles:
-                await member.remove_roles(jail_role, reason=reason)
-            
-            # Eski rolleri geri ver
-            if jailed.previous_roles:
-                roles_to_add = []
-                for role_id in jailed.previous_roles:
-                    role = interaction.guild.get_role(int(role_id))
-                    if role and role not in member.roles:
-                        roles_to_add.append(role)
-                
-                if roles_to_add:
-                    await member.add_roles(*roles_to_add, reason="Hapisten çıkarıldı - roller geri verildi")
+            roles = release_role_list(member, jail_role, jailed.previous_roles)
+            await member.edit(roles=roles, reason=f"{reason} - roller geri verildi")
             
             # Kayıt sil
             await db.delete(jailed)
             await db.commit()
+            self.bot.timers.cancel("unjail", jailed.id)
 
         embed = discord.Embed(
             title="🔓 Üye Hapisten Çıkarıldı",
@@ -411,6 +421,7 @@ class JailSystem(commands.Cog):
                 )
                 db.add(mute)
                 await db.commit()
+            self.bot.timers.schedule("unmute", mute.id, mute.unmute_at)
             
             embed = discord.Embed(
                 title="🔇 Üye Susturuldu",
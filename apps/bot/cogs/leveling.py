@@ -1,78 +1,297 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
 from lithium_core.database.session import AsyncSessionLocal
 from lithium_core.models.leveling import UserLevel as LevelingState, LevelingConfig, LevelReward
-from lithium_core.models.core import Guild
-from sqlalchemy import select
+from apps.bot.utils.xp_accumulator import XPAccumulator
+from apps.bot.utils.level_math import LevelCurve, build_reward_tables
+from lithium_core.utils import leaderboards
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from datetime import datetime
 from typing import Optional
+import asyncio
+import json
+import logging
 import time
 import math
 
+logger = logging.getLogger("lithium-bot")
+
+BASE_XP = 15
+FLUSH_INTERVAL = 5
+# Minimum seconds between early flushes while the XP cache is over capacity
+EARLY_FLUSH_GAP = 1
+# Keeps each upsert well under the driver's bind parameter limit
+FLUSH_CHUNK = 1000
+
+
 class Leveling(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.cooldowns = {}
+        # XP and cooldowns live in memory and are flushed in bulk
+        self.xp = XPAccumulator(cooldown=60)
+        # guild_id -> (xp per message, no-XP channel ids); missing = disabled
+        self.configs = {}
+        self.curve = LevelCurve()
+        # guild_id -> RewardTable
+        self.rewards = {}
+        # Running level-up announcements (keeps the tasks referenced until done)
+        self.announcements = set()
+        # Serializes the periodic flush with early ones triggered by a full cache
+        self.flush_lock = asyncio.Lock()
+        self.last_early_flush = float("-inf")
+        self.early_flush: Optional[asyncio.Task] = None
+
+    async def cog_load(self):
+        await self.load_configs()
+        self.flush_xp.start()
+        self.reconcile_leaderboards.start()
+
+    async def cog_unload(self):
+        self.flush_xp.cancel()
+        self.reconcile_leaderboards.cancel()
+        await self.flush()
+
+    async def load_configs(self, guild_id: Optional[str] = None):
+        """Leveling ayarlarını ve ödül rollerini önbelleğe al"""
+        async with AsyncSessionLocal() as db:
+            stmt = select(LevelingConfig)
+            reward_stmt = select(LevelReward.guild_id, LevelReward.level_requirement, LevelReward.role_id)
+            if guild_id:
+                stmt = stmt.where(LevelingConfig.guild_id == guild_id)
+                reward_stmt = reward_stmt.where(LevelReward.guild_id == guild_id)
+            configs = (await db.execute(stmt)).scalars().all()
+            rewards = build_reward_tables((await db.execute(reward_stmt)).all())
+
+        if guild_id:
+            self.configs.pop(int(guild_id), None)
+            self.rewards.pop(int(guild_id), None)
+        self.rewards.update(rewards)
+        for config in configs:
+            if not config.enabled:
+                continue
+            try:
+                no_xp = {int(c) for c in json.loads(config.no_xp_channels or "[]")}
+            except (TypeError, ValueError):
+                no_xp = set()
+            self.configs[int(config.guild_id)] = (int(BASE_XP * (config.xp_rate or 1)), no_xp)
+
+    @commands.Cog.listener()
+    async def on_guild_config_changed(self, data: dict):
+        if data.get("module") == "leveling" and data.get("guild_id"):
+            await self.load_configs(str(data["guild_id"]))
 
-    def get_xp_for_level(self, level: int):
-        return 5 * (level ** 2) + (50 * level) + 100
+    def apply_level_ups(self, entry) -> bool:
+        """Seviyeyi toplam XP'den hesapla; birden fazla seviye atlanabilir"""
+        level = self.curve.level_for(entry.xp)
+        if level <= entry.level:
+            return False
+        entry.level = level
+        return True
+
+    async def announce_level_up(self, guild: discord.Guild, member: discord.Member, channel, level: int):
+        try:
+            if channel:
+                await channel.send(f"GG {member.mention}, you leveled up to **Level {level}**!")
+
+            # Every reward up to the new level; only the new roles are sent, never the full list
+            table = self.rewards.get(guild.id)
+            if not table:
+                return
+            missing = [
+                role for role in (guild.get_role(role_id) for role_id in table.roles_up_to(level))
+                if role and role not in member.roles
+            ]
+            if missing:
+                await member.add_roles(*missing, reason=f"Level {level} rewards", atomic=False)
+        except Exception as e:
+            logger.error(f"Level-up announcement failed for {member.id} in {guild.id}: {e}")
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
         if message.author.bot or not message.guild:
             return
 
-        async with AsyncSessionLocal() as db:
-            stmt = select(Guild).where(Guild.discord_id == str(message.guild.id))
-            guild_config = (await db.execute(stmt)).scalar_one_or_none()
-            if not guild_config or not guild_config.leveling_enabled:
-                return
-            
-        now = time.time()
-        user_key = f"{message.guild.id}-{message.author.id}"
-        
-        if user_key in self.cooldowns and now - self.cooldowns[user_key] < 60:
+        config = self.configs.get(message.guild.id)
+        if not config or message.channel.id in config[1]:
             return
-            
-        self.cooldowns[user_key] = now
-        
+
+        key = (message.guild.id, message.author.id)
+        now = time.monotonic()
+        entry = self.xp.award(key, config[0], now, message.channel.id)
+        if self.xp.over_capacity and now - self.last_early_flush >= EARLY_FLUSH_GAP:
+            # Unflushed entries cannot be evicted; write them out before the next interval
+            self.last_early_flush = now
+            self.early_flush = asyncio.create_task(self.flush_xp())
+        if entry is None or not entry.loaded:
+            # On cooldown, or level-ups are checked once the flush loads the row
+            return
+
+        if self.apply_level_ups(entry):
+            await self.announce_level_up(message.guild, message.author, message.channel, entry.level)
+
+    @tasks.loop(seconds=FLUSH_INTERVAL)
+    async def flush_xp(self):
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"XP flush failed: {e}")
+
+    async def flush(self):
+        """Biriken XP'yi tek sorguyla veritabanına yaz"""
+        async with self.flush_lock:
+            await self._flush()
+
+    async def _flush(self):
+        unloaded = self.xp.unloaded_keys()
+        if unloaded:
+            await self.load_entries(unloaded)
+
+        snapshot = self.xp.take_dirty()
+        if not snapshot:
+            return
+
+        now = datetime.utcnow()
+        rows = [
+            {
+                "guild_id": str(guild_id), "user_id": str(user_id),
+                "total_xp": xp, "xp": xp - self.curve.total_for(level), "level": level,
+                "created_at": now, "updated_at": now
+            }
+            for (guild_id, user_id), (xp, level) in snapshot.items()
+        ]
+        try:
+            async with AsyncSessionLocal() as db:
+                for i in range(0, len(rows), FLUSH_CHUNK):
+                    stmt = insert(LevelingState).values(rows[i:i + FLUSH_CHUNK])
+                    stmt = stmt.on_conflict_do_update(
+                        constraint="uq_user_levels_guild_user",
+                        set_={
+                            "total_xp": stmt.excluded.total_xp, "xp": stmt.excluded.xp,
+                            "level": stmt.excluded.level, "updated_at": now
+                        }
+                    )
+                    await db.execute(stmt)
+                await db.commit()
+        except Exception:
+            self.xp.mark_dirty(snapshot)
+            raise
+
+        if self.bot.redis:
+            by_guild = {}
+            for (guild_id, user_id), (xp, level) in snapshot.items():
+                by_guild.setdefault(guild_id, {})[user_id] = xp
+            async with self.bot.redis.pipeline(transaction=False) as pipe:
+                for guild_id, scores in by_guild.items():
+                    await leaderboards.set_scores(pipe, guild_id, leaderboards.XP_BOARD, scores)
+                await pipe.execute()
+
+    async def load_entries(self, keys: list):
+        """Henüz okunmamış kullanıcıların kayıtlarını tek sorguda yükle"""
         async with AsyncSessionLocal() as db:
-            result = await db.execute(select(LevelingState).where(LevelingState.guild_id == str(message.guild.id), LevelingState.user_id == str(message.author.id)))
-            state = result.scalar_one_or_none()
-            
-            if not state:
-                state = LevelingState(guild_id=str(message.guild.id), user_id=str(message.author.id), xp=0, level=0)
-                db.add(state)
-            
-            state.xp += 15 # default xp
-            
-            xp_needed = self.get_xp_for_level(state.level)
-            if state.xp >= xp_needed:
-                state.level += 1
-                state.xp = 0 # reset or keep remainder? usually reset or subtract.
-                await message.channel.send(f"GG {message.author.mention}, you leveled up to **Level {state.level}**!")
-                
-                # Role Rewards Check
-                rewards_res = await db.execute(select(LevelReward).where(LevelReward.guild_id == str(message.guild.id), LevelReward.level <= state.level))
-                for reward in rewards_res.scalars().all():
-                    role = message.guild.get_role(int(reward.role_id))
-                    if role and role not in message.author.roles:
-                        await message.author.add_roles(role)
-            
-            await db.commit()
+            result = await db.execute(
+                select(
+                    LevelingState.guild_id, LevelingState.user_id,
+                    LevelingState.total_xp, LevelingState.xp, LevelingState.level
+                )
+                .where(tuple_(LevelingState.guild_id, LevelingState.user_id).in_(
+                    [(str(g), str(u)) for g, u in keys]
+                ))
+            )
+            stored = {
+                (int(g), int(u)): (self.stored_total(total_xp, xp, level), level)
+                for g, u, total_xp, xp, level in result.all()
+            }
+
+        for key in keys:
+            xp, level = stored.get(key, (0, 0))
+            entry = self.xp.load(key, xp, level)
+            if entry is None or not self.apply_level_ups(entry):
+                continue
+            guild = self.bot.get_guild(key[0])
+            member = guild.get_member(key[1]) if guild else None
+            if member:
+                channel = guild.get_channel(entry.channel_id) if entry.channel_id else None
+                # Don't hold up the write on Discord calls
+                task = asyncio.create_task(self.announce_level_up(guild, member, channel, entry.level))
+                self.announcements.add(task)
+                task.add_done_callback(self.announcements.discard)
+
+    def stored_total(self, total_xp: Optional[int], xp: int, level: int) -> int:
+        """Toplam XP; henüz doldurulmamış satırlarda seviye eşiği + ilerlemeden hesaplanır"""
+        if total_xp is not None:
+            return total_xp
+        return self.curve.total_for(level or 0) + (xp or 0)
+
+    async def rebuild_leaderboard(self, guild_id: int):
+        """XP leaderboard'unu Postgres'ten yeniden oluştur"""
+        # Writes from here until the swap are replayed onto the rebuilt set
+        await leaderboards.begin_rebuild(self.bot.redis, guild_id, leaderboards.XP_BOARD)
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(LevelingState.user_id, LevelingState.total_xp, LevelingState.xp, LevelingState.level)
+                .where(LevelingState.guild_id == str(guild_id))
+            )
+            scores = {user_id: self.stored_total(total_xp, xp, level) for user_id, total_xp, xp, level in result.all()}
+        # XP not flushed yet is re-added by the next flush
+        await leaderboards.rebuild(self.bot.redis, guild_id, leaderboards.XP_BOARD, scores)
+
+    async def ensure_leaderboard(self, guild_id: int):
+        if not await leaderboards.exists(self.bot.redis, guild_id, leaderboards.XP_BOARD):
+            await self.rebuild_leaderboard(guild_id)
+
+    @tasks.loop(minutes=1)
+    async def reconcile_leaderboards(self):
+        # Each guild is rebuilt once an hour, spread over the minutes
+        if not self.bot.redis:
+            return
+        slot = datetime.utcnow().minute
+        for guild in self.bot.guilds:
+            if guild.id not in self.configs or leaderboards.reconcile_slot(guild.id) != slot:
+                continue
+            try:
+                await self.rebuild_leaderboard(guild.id)
+            except Exception as e:
+                logger.error(f"XP leaderboard reconcile failed for {guild.id}: {e}")
+
+    @app_commands.command(name="leaderboard", description="Show the server's XP leaderboard")
+    async def leaderboard(self, interaction: discord.Interaction, page: app_commands.Range[int, 1, 1000] = 1):
+        await self.ensure_leaderboard(interaction.guild_id)
+        entries, total = await leaderboards.get_page(self.bot.redis, interaction.guild_id, leaderboards.XP_BOARD, page)
+        if not entries:
+            return await interaction.response.send_message("No leaderboard data on this page.", ephemeral=True)
+
+        start = (page - 1) * 10
+        lines = [f"**#{start + i + 1}** <@{user_id}> — {int(score)} XP" for i, (user_id, score) in enumerate(entries)]
+        embed = discord.Embed(title="🏆 XP Leaderboard", description="\n".join(lines), color=discord.Color.gold())
+        embed.set_footer(text=f"Page {page}/{math.ceil(total / 10)} • {total} members")
+        await interaction.response.send_message(embed=embed, allowed_mentions=discord.AllowedMentions.none())
 
     @app_commands.command(name="rank", description="Check your or someone's rank")
     async def rank(self, interaction: discord.Interaction, member: Optional[discord.Member] = None):
         member = member or interaction.user
-        async with AsyncSessionLocal() as db:
-            result = await db.execute(select(LevelingState).where(LevelingState.guild_id == str(interaction.guild_id), LevelingState.user_id == str(member.id)))
-            state = result.scalar_one_or_none()
-            
+        entry = self.xp.get((interaction.guild_id, member.id))
+        if entry and entry.loaded:
+            total = entry.xp
+        else:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(select(LevelingState).where(LevelingState.guild_id == str(interaction.guild_id), LevelingState.user_id == str(member.id)))
+                state = result.scalar_one_or_none()
+
             if not state:
                 return await interaction.response.send_message("No rank data found for this user.")
-                
-            xp_needed = self.get_xp_for_level(state.level)
-            await interaction.response.send_message(f"**{member.name}'s Rank**\nLevel: {state.level}\nXP: {state.xp}/{xp_needed}")
+            # Include XP earned since the last flush
+            total = self.stored_total(state.total_xp, state.xp, state.level) + (entry.pending if entry else 0)
+
+        level, xp, xp_needed = self.curve.progress(total)
+        position = ""
+        if self.bot.redis:
+            await self.ensure_leaderboard(interaction.guild_id)
+            rank, _, members = await leaderboards.get_rank(self.bot.redis, interaction.guild_id, leaderboards.XP_BOARD, member.id)
+            if rank:
+                position = f"\nRank: #{rank}/{members}"
+        await interaction.response.send_message(f"**{member.name}'s Rank**\nLevel: {level}\nXP: {xp}/{xp_needed}{position}")
 
 async def setup(bot):
     await bot.add_cog(Leveling(bot))
@@ -32,6 +32,17 @@ class Moderation(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+    async def publish_case(self, case: ModerationCase):
+        """Notify dashboard viewers about a new case"""
+        await self.bot.publish_guild_event(case.guild_id, "case_created", {
+            "id": case.id,
+            "user_id": case.user_id,
+            "moderator_id": case.moderator_id,
+            "action_type": case.action_type,
+            "reason": case.reason,
+            "created_at": case.created_at
+        })
+
     def create_mod_embed(self, title: str, color: discord.Color, user: discord.User, moderator: discord.User, reason: str, case_id: int = None):
         embed = discord.Embed(title=title, color=color, timestamp=datetime.utcnow())
         embed.add_field(name="User", value=f"{user.mention} ({user.id})", inline=True)
@@ -90,6 +101,7 @@ class Moderation(commands.Cog):
             await db.commit()
             await db.refresh(case)
             case_id = case.id
+        await self.publish_case(case)
 
         embed = self.create_mod_embed(translate("user_banned", user=user.name), discord.Color.red(), user, interaction.user, moderation_reason, case_id)
         await interaction.edit_original_response(content=None, embed=embed, view=None)
@@ -118,6 +130,7 @@ class Moderation(commands.Cog):
             await db.commit()
             await db.refresh(case)
             case_id = case.id
+        await self.publish_case(case)
 
         embed = self.create_mod_embed(translate("user_softbanned", lang="en"), discord.Color.orange(), user, interaction.user, reason, case_id)
         await interaction.response.send_message(embed=embed)
@@ -145,6 +158,7 @@ class Moderation(commands.Cog):
             await db.commit()
             await db.refresh(case)
             case_id = case.id
+        await self.publish_case(case)
 
         embed = self.create_mod_embed(translate("user_kicked", lang="en", user=user.name), discord.Color.gold(), user, interaction.user, moderation_reason, case_id)
         await interaction.response.send_message(embed=embed)
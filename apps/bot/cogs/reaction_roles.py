@@ -9,7 +9,8 @@ from discord.ext import commands
 from discord import app_commands
 from lithium_core.database.session import AsyncSessionLocal
 from lithium_core.models import ReactionRoleMenu
-from sqlalchemy import select
+from apps.bot.utils.reaction_roles import ReactionRoleIndex, RoleChangeBatcher
+from sqlalchemy import select, delete
 import logging
 from datetime import datetime
 from typing import Optional
@@ -45,65 +46,82 @@ class ReactionRoleSetupView(discord.ui.View):
 class ReactionRoles(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.index = ReactionRoleIndex()
+        self.role_changes = RoleChangeBatcher(self.apply_role_changes)
+
+    async def cog_load(self):
+        async with AsyncSessionLocal() as db:
+            stmt = select(ReactionRoleMenu.guild_id, ReactionRoleMenu.message_id, ReactionRoleMenu.options)
+            for guild_id, message_id, options in (await db.execute(stmt)).all():
+                self.index.set_menu(int(guild_id), int(message_id), options)
+        logger.info(f"Loaded {len(self.index)} reaction role menus")
+
+    def cog_unload(self):
+        self.role_changes.stop()
 
     @commands.Cog.listener()
-    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
-        """Reaction eklendiğinde rol ver"""
-        if payload.member.bot:
+    async def on_guild_config_changed(self, data: dict):
+        if data.get("module") != "reaction_roles" or not data.get("guild_id"):
             return
-        
         async with AsyncSessionLocal() as db:
-            stmt = select(ReactionRoleMenu).where(
-                ReactionRoleMenu.message_id == str(payload.message_id)
+            stmt = select(ReactionRoleMenu.message_id, ReactionRoleMenu.options).where(
+                ReactionRoleMenu.guild_id == str(data["guild_id"])
             )
-            menu = (await db.execute(stmt)).scalar_one_or_none()
-            if not menu:
-                return
-            
-            emoji_str = str(payload.emoji)
-            if emoji_str not in menu.options:
-                return
-            
-            role_id = int(menu.options[emoji_str])
-            role = payload.member.guild.get_role(role_id)
-            
-            if role and role not in payload.member.roles:
-                try:
-                    await payload.member.add_roles(role, reason="Reaction Role")
-                except discord.Forbidden:
-                    logger.error(f"Cannot add role {role.name} to {payload.member}")
+            rows = (await db.execute(stmt)).all()
+        self.index.replace_guild(int(data["guild_id"]), [(int(m), o) for m, o in rows])
+
+    async def apply_role_changes(self, guild_id: int, member_id: int, changes: dict):
+        """Toplanan rol değişikliklerini tek member.edit ile uygula"""
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return
+        member = guild.get_member(member_id)
+        if not member or member.bot:
+            return
+
+        roles = [r for r in member.roles if not r.is_default() and changes.get(r.id, True)]
+        for role_id, add in changes.items():
+            role = guild.get_role(role_id)
+            if add and role and role not in roles and role.is_assignable():
+                roles.append(role)
+
+        if set(roles) == {r for r in member.roles if not r.is_default()}:
+            return
+        try:
+            await member.edit(roles=roles, reason="Reaction Role")
+        except discord.Forbidden:
+            logger.error(f"Cannot update reaction roles for {member}")
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
+        """Reaction eklendiğinde rol ver"""
+        if payload.message_id not in self.index or not payload.guild_id:
+            return
+        if payload.member and payload.member.bot:
+            return
+        role_id = self.index.role_for(payload.message_id, str(payload.emoji))
+        if role_id:
+            self.role_changes.queue(payload.guild_id, payload.user_id, role_id, True)
 
     @commands.Cog.listener()
     async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
         """Reaction kaldırıldığında rolü al"""
+        if payload.message_id not in self.index or not payload.guild_id:
+            return
+        role_id = self.index.role_for(payload.message_id, str(payload.emoji))
+        if role_id:
+            self.role_changes.queue(payload.guild_id, payload.user_id, role_id, False)
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        """Silinen menüyü indeksten ve veritabanından kaldır"""
+        if not self.index.remove_menu(payload.message_id):
+            return
         async with AsyncSessionLocal() as db:
-            stmt = select(ReactionRoleMenu).where(
+            await db.execute(delete(ReactionRoleMenu).where(
                 ReactionRoleMenu.message_id == str(payload.message_id)
-            )
-            menu = (await db.execute(stmt)).scalar_one_or_none()
-            if not menu:
-                return
-            
-            guild = self.bot.get_guild(payload.guild_id)
-            if not guild:
-                return
-            
-            member = guild.get_member(payload.user_id)
-            if not member or member.bot:
-                return
-            
-            emoji_str = str(payload.emoji)
-            if emoji_str not in menu.options:
-                return
-            
-            role_id = int(menu.options[emoji_str])
-            role = guild.get_role(role_id)
-            
-            if role and role in member.roles:
-                try:
-                    await member.remove_roles(role, reason="Reaction Role")
-                except discord.Forbidden:
-                    logger.error(f"Cannot remove role {role.name} from {member}")
+            ))
+            await db.commit()
 
     @app_commands.command(name="reactionrole", description="Reaction role mesajı oluştur")
     @app_commands.describe(
@@ -213,6 +231,7 @@ class ReactionRoles(commands.Cog):
             )
             db.add(menu)
             await db.commit()
+        self.index.set_menu(interaction.guild_id, reaction_msg.id, roles_mapping)
         
         await interaction.followup.send(
             f"✅ Reaction role mesajı {channel.mention} kanalına gönderildi!",
@@ -247,6 +266,7 @@ class ReactionRoles(commands.Cog):
             flag_modified(menu, "options")
             
             await db.commit()
+        self.index.set_menu(interaction.guild_id, int(message_id), options)
         
         # Mesaja emoji ekle
         try:
@@ -288,6 +308,7 @@ class ReactionRoles(commands.Cog):
             flag_modified(menu, "options")
             
             await db.commit()
+        self.index.set_menu(interaction.guild_id, int(message_id), options)
         
         await interaction.response.send_message(f"✅ {emoji} kaldırıldı!", ephemeral=True)
 
@@ -2,60 +2,203 @@ import discord
 from discord.ext import commands, tasks
 from discord import app_commands
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from sqlalchemy import select, delete, update
 from lithium_core.database.session import AsyncSessionLocal
-from lithium_core.models import Guild, ReactionRoleMenu, ScheduledMessage, CustomCommand
+from lithium_core.models import Guild, ScheduledMessage, CustomCommand
+from apps.bot.utils.concurrency import gather_limited
+from apps.bot.utils.cron import is_misfire, next_run
+from apps.bot.utils.timer_scheduler import retry_at
 
 logger = logging.getLogger("lithium-bot")
 
+# Runs later than this (e.g. the bot was down) are skipped instead of posted late
+MISFIRE_GRACE = 300
+# Fallback scan for rows whose timer was never scheduled (no change event) or got lost
+SCHEDULE_POLL_INTERVAL = 60
+
 class SocialFeatures(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.scheduler.start()
+        # guild_id -> {name: response}, or None when custom commands are off
+        self.custom_commands = {}
+        # Scheduled message ids being sent right now; the poll must not fire them again
+        self.sending = set()
+
+    async def cog_load(self):
+        self.bot.timers.register("scheduled_message", self.send_scheduled, self.load_scheduled)
+        self.poll_scheduled.start()
 
     def cog_unload(self):
-        self.scheduler.cancel()
+        self.poll_scheduled.cancel()
+        self.bot.timers.unregister("scheduled_message")
+
+    async def load_scheduled(self, guild_id: str = None, due_before: datetime = None):
+        """Bu kümenin etkin zamanlanmış mesajlarının bir sonraki çalışma zamanları"""
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as db:
+            stmt = select(ScheduledMessage.id, ScheduledMessage.next_run_at, ScheduledMessage.guild_id).where(
+                ScheduledMessage.enabled == True,
+                ScheduledMessage.next_run_at != None
+            )
+            if guild_id:
+                stmt = stmt.where(ScheduledMessage.guild_id == guild_id)
+            if due_before:
+                stmt = stmt.where(ScheduledMessage.next_run_at <= due_before)
+            rows = (await db.execute(stmt)).all()
+
+            # Rows created without next_run_at (e.g. from the dashboard) get it computed once
+            stmt = select(
+                ScheduledMessage.id, ScheduledMessage.cron, ScheduledMessage.run_at, ScheduledMessage.guild_id
+            ).where(
+                ScheduledMessage.enabled == True,
+                ScheduledMessage.next_run_at == None
+            )
+            if guild_id:
+                stmt = stmt.where(ScheduledMessage.guild_id == guild_id)
+            updates = []
+            for message_id, cron, run_at, row_guild_id in (await db.execute(stmt)).all():
+                if not self.bot.owns_guild(row_guild_id):
+                    continue
+                try:
+                    next_run_at = next_run(cron, now, message_id) if cron else run_at
+                except ValueError as e:
+                    logger.warning(f"Scheduled message {message_id} has an invalid cron: {e}")
+                    updates.append({"id": message_id, "enabled": False})
+                    continue
+                if next_run_at:
+                    updates.append({"id": message_id, "next_run_at": next_run_at})
+                    rows.append((message_id, next_run_at, row_guild_id))
+            if updates:
+                await db.execute(update(ScheduledMessage), updates)
+                await db.commit()
+        # Other clusters post their own guilds' messages
+        return [(message_id, run_at) for message_id, run_at, row_guild_id in rows if self.bot.owns_guild(row_guild_id)]
+
+    @tasks.loop(seconds=SCHEDULE_POLL_INTERVAL)
+    async def poll_scheduled(self):
+        """Yedek tarama: dışarıdan eklenen ya da zamanlayıcısı kaybolan mesajları yakala"""
+        try:
+            due_before = datetime.utcnow() + timedelta(seconds=SCHEDULE_POLL_INTERVAL * 2)
+            for message_id, run_at in await self.load_scheduled(due_before=due_before):
+                # Pending timers (including retries) keep their time; in-flight ones are being sent
+                if message_id in self.sending or self.bot.timers.pending("scheduled_message", message_id):
+                    continue
+                self.bot.timers.schedule("scheduled_message", message_id, run_at)
+        except Exception as e:
+            logger.error(f"Scheduled message poll failed: {e}")
+
+    @poll_scheduled.before_loop
+    async def before_poll_scheduled(self):
+        await self.bot.wait_until_ready()
+
+    async def get_custom_commands(self, guild_id: int):
+        """Özel komutları sunucu başına önbelleğe al"""
+        if guild_id not in self.custom_commands:
+            async with AsyncSessionLocal() as db:
+                stmt = select(Guild).where(Guild.discord_id == str(guild_id))
+                guild = (await db.execute(stmt)).scalar_one_or_none()
+                commands_map = None
+                if guild and guild.custom_commands_enabled:
+                    stmt = select(CustomCommand.name, CustomCommand.response).where(CustomCommand.guild_id == str(guild_id))
+                    commands_map = {name.lower(): response for name, response in (await db.execute(stmt)).all()}
+            self.custom_commands[guild_id] = commands_map
+        return self.custom_commands[guild_id]
 
-    @tasks.loop(minutes=1)
-    async def scheduler(self):
+    @commands.Cog.listener()
+    async def on_guild_config_changed(self, data: dict):
+        if data.get("guild_id"):
+            self.custom_commands.pop(int(data["guild_id"]), None)
+        # Scheduled messages are created from the dashboard
+        if data.get("module") == "scheduled_messages":
+            for message_id, run_at in await self.load_scheduled(str(data.get("guild_id"))):
+                self.bot.timers.schedule("scheduled_message", message_id, run_at)
+
+    async def send_scheduled(self, message_ids: list):
+        """Vadesi gelen zamanlanmış mesajları gönder ve sonraki çalışmayı planla"""
+        now = datetime.utcnow()
+        self.sending.update(message_ids)
+        try:
+            await self._send_scheduled(message_ids, now)
+        finally:
+            self.sending.difference_update(message_ids)
+
+    async def _send_scheduled(self, message_ids: list, now: datetime):
         async with AsyncSessionLocal() as db:
-            now = datetime.utcnow()
             stmt = select(ScheduledMessage).where(
+                ScheduledMessage.id.in_(message_ids),
                 ScheduledMessage.enabled == True,
-                ScheduledMessage.run_at <= now
+                ScheduledMessage.next_run_at != None
             )
             messages = (await db.execute(stmt)).scalars().all()
+
+            sends = []
             for msg in messages:
-                channel = self.bot.get_channel(int(msg.channel_id))
-                if channel:
-                    await channel.send(msg.content)
-                
-                # Update last_run or delete
-                msg.last_run_at = now
-                if not msg.cron: # One-off
+                # Other clusters own this guild's posts
+                if not self.bot.owns_guild(msg.guild_id):
+                    continue
+                if not self.bot.get_guild(int(msg.guild_id)):
+                    # Ours but unavailable (outage or the bot was removed): retry, then give up
+                    retry = retry_at(msg.next_run_at, now)
+                    if retry:
+                        self.bot.timers.schedule("scheduled_message", msg.id, retry)
+                    else:
+                        logger.warning(f"Scheduled message {msg.id}: guild {msg.guild_id} unavailable, disabling")
+                        msg.enabled = False
+                        msg.next_run_at = None
+                    continue
+                if msg.next_run_at > now:
+                    # Moved while the timer was pending
+                    self.bot.timers.schedule("scheduled_message", msg.id, msg.next_run_at)
+                    continue
+
+                # A stale cron run is covered by the next one; a one-off is still sent late
+                if msg.cron and is_misfire(msg.next_run_at, now, MISFIRE_GRACE):
+                    logger.warning(f"Scheduled message {msg.id} missed its run at {msg.next_run_at}, skipping")
+                else:
+                    channel = self.bot.get_channel(int(msg.channel_id))
+                    if channel:
+                        sends.append(channel.send(msg.content))
+                    else:
+                        logger.warning(f"Scheduled message {msg.id}: channel {msg.channel_id} not found")
+                    msg.last_run_at = now
+
+                if msg.cron:
+                    # Missed runs are coalesced: the next run is always in the future
+                    try:
+                        msg.next_run_at = next_run(msg.cron, now, msg.id)
+                        self.bot.timers.schedule("scheduled_message", msg.id, msg.next_run_at)
+                    except ValueError as e:
+                        logger.warning(f"Scheduled message {msg.id} has an invalid cron: {e}")
+                        msg.enabled = False
+                        msg.next_run_at = None
+                else: # One-off
                     msg.enabled = False
-            
+                    msg.next_run_at = None
+
             await db.commit()
 
+        for result in await gather_limited(sends):
+            if isinstance(result, Exception):
+                logger.error(f"Scheduled message send failed: {result}")
+
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
         if message.author.bot or not message.guild:
             return
 
         # Custom Commands
-        async with AsyncSessionLocal() as db:
-            stmt = select(Guild).where(Guild.discord_id == str(message.guild.id))
-            guild = (await db.execute(stmt)).scalar_one_or_none()
-            if not guild or not guild.custom_commands_enabled:
-                return
-
-            if message.content.startswith("!"): # Prefix could be dynamic
-                cmd_name = message.content[1:].split()[0].lower()
-                stmt = select(CustomCommand).where(CustomCommand.guild_id == str(message.guild.id), CustomCommand.name == cmd_name)
-                cmd = (await db.execute(stmt)).scalar_one_or_none()
-                if cmd:
-                    await message.channel.send(cmd.response)
+        if not message.content.startswith("!") or len(message.content) < 2: # Prefix could be dynamic
+            return
+
+        commands_map = await self.get_custom_commands(message.guild.id)
+        if not commands_map:
+            return
+
+        parts = message.content[1:].split()
+        response = commands_map.get(parts[0].lower()) if parts else None
+        if response:
+            await message.channel.send(response)
 
     @app_commands.command(name="cc-add", description="Add a custom command")
     @app_commands.checks.has_permissions(manage_guild=True)
@@ -64,42 +207,9 @@ class SocialFeatures(commands.Cog):
             cmd = CustomCommand(guild_id=str(interaction.guild_id), name=name.lower(), response=response)
             db.add(cmd)
             await db.commit()
+        if self.custom_commands.get(interaction.guild_id) is not None:
+            self.custom_commands[interaction.guild_id][name.lower()] = response
         await interaction.response.send_message(f"✅ Custom command `!{name}` added.", ephemeral=True)
 
-    @commands.Cog.listener()
-    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
-        if payload.member.bot: return
-        
-        async with AsyncSessionLocal() as db:
-            stmt = select(ReactionRoleMenu).where(ReactionRoleMenu.message_id == str(payload.message_id))
-            menu = (await db.execute(stmt)).scalar_one_or_none()
-            if not menu: return
-            
-            emoji_str = str(payload.emoji)
-            if emoji_str in menu.options:
-                role_id = int(menu.options[emoji_str])
-                role = payload.member.guild.get_role(role_id)
-                if role:
-                    await payload.member.add_roles(role)
-
-    @commands.Cog.listener()
-    async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
-        async with AsyncSessionLocal() as db:
-            stmt = select(ReactionRoleMenu).where(ReactionRoleMenu.message_id == str(payload.message_id))
-            menu = (await db.execute(stmt)).scalar_one_or_none()
-            if not menu: return
-            
-            guild = self.bot.get_guild(payload.guild_id)
-            if not guild: return
-            member = guild.get_member(payload.user_id)
-            if not member or member.bot: return
-
-            emoji_str = str(payload.emoji)
-            if emoji_str in menu.options:
-                role_id = int(menu.options[emoji_str])
-                role = guild.get_role(role_id)
-                if role:
-                    await member.remove_roles(role)
-
 async def setup(bot):
     await bot.add_cog(SocialFeatures(bot))
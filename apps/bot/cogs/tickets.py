@@ -131,6 +131,13 @@ class TicketCreateSelect(discord.ui.Select):
                 )
                 db.add(ticket)
                 await db.commit()
+                await self.bot.publish_guild_event(interaction.guild.id, "ticket_created", {
+                    "id": ticket.id,
+                    "channel_id": ticket.channel_id,
+                    "owner_id": ticket.owner_id,
+                    "category": ticket.category,
+                    "status": ticket.status
+                })
                 
                 embed = discord.Embed(title=f"Ticket: {category_name.title()}", description=f"Welcome {interaction.user.mention}!\nSupport will be with you shortly.", color=discord.Color.green())
                 view = TicketControlView(self.bot)
@@ -3,9 +3,12 @@ from discord.ext import commands
 from discord import app_commands
 import asyncio
 import logging
+import math
 import sys
 import os
+import time
 import traceback
+from datetime import datetime
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -17,18 +20,35 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("lithium-bot")
 
-class LithiumBot(commands.Bot):
-    def __init__(self):
+class LithiumBot(commands.AutoShardedBot):
+    def __init__(self, shard_ids=None, shard_count=None, cluster_id=None, max_concurrency=1):
         intents = discord.Intents.default()
         intents.message_content = True
         intents.members = True
         intents.guilds = True
+        # Privileged; required for live online counts
+        intents.presences = os.getenv("ENABLE_PRESENCE_INTENT", "false").lower() == "true"
         
         super().__init__(
             command_prefix="!",
             intents=intents,
-            help_command=None
+            help_command=None,
+            shard_ids=shard_ids,
+            shard_count=shard_count
         )
+        # Set when running as one process of a cluster (see apps/bot/cluster.py)
+        self.cluster_id = cluster_id
+        self.max_concurrency = max_concurrency
+        # Seconds spent in each setup_hook phase
+        self.startup_timings = {}
+        # Shared client for publishing dashboard events
+        self.redis = None
+        # Deadlines for mutes, jails, giveaways, lockdowns... (see utils/timer_scheduler.py)
+        from apps.bot.utils.timer_scheduler import TimerScheduler
+        self.timers = TimerScheduler()
+        # Member/online counts maintained from gateway events
+        from apps.bot.utils.guild_stats import GuildStatsTracker
+        self.guild_stats = GuildStatsTracker()
 
     async def on_app_command_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
         error_msg = str(error)
@@ -45,6 +65,11 @@ class LithiumBot(commands.Bot):
         self.tree.on_error = self.on_app_command_error
         logger.info("Setting up Lithium Bot...")
 
+        import redis.asyncio as redis_async
+        self.redis = redis_async.from_url(os.getenv("REDIS_URL", "redis://redis:6379/0"))
+
+        startup_started = phase_started = time.perf_counter()
+
         # --- AUTO DB MIGRATION ---
         try:
             from apps.bot.utils.db_setup import run_migrations_async
@@ -55,19 +80,32 @@ class LithiumBot(commands.Bot):
             logger.error(f"Startup DB Migration failed: {e}")
             traceback.print_exc()
         # -------------------------
+        phase_started = self._record_phase("schema", phase_started)
 
         # Start Health Check Server
         from aiohttp import web
         async def health_check(request):
-            return web.Response(text="OK")
+            return web.json_response({
+                "status": "ok",
+                "cluster_id": self.cluster_id,
+                "ready": self.is_ready(),
+                "guilds": len(self.guilds),
+                "startup_timings": self.startup_timings,
+                "shards": {
+                    shard_id: round(shard.latency * 1000) if math.isfinite(shard.latency) else None
+                    for shard_id, shard in self.shards.items()
+                }
+            })
         
+        # Each cluster serves its own /health on HEALTH_PORT + cluster_id
+        port = int(os.getenv("HEALTH_PORT", "8080")) + (self.cluster_id or 0)
         app = web.Application()
         app.router.add_get('/health', health_check)
         runner = web.AppRunner(app)
         await runner.setup()
-        site = web.TCPSite(runner, '0.0.0.0', 8080)
+        site = web.TCPSite(runner, '0.0.0.0', port)
         await site.start()
-        logger.info("Health check server started on port 8080")
+        logger.info(f"Health check server started on port {port}")
 
         # Load Persistent Views
         try:
@@ -108,7 +146,8 @@ class LithiumBot(commands.Bot):
             'apps.bot.cogs.admin',                  # Admin tools (!sync)
         ]
         
-        for extension in extensions:
+        # Cogs are independent of each other, so load them concurrently
+        async def load(extension):
             try:
                 await self.load_extension(extension)
                 logger.info(f"Loaded extension: {extension}")
@@ -116,11 +155,65 @@ class LithiumBot(commands.Bot):
                 logger.error(f"Failed to load extension {extension}: {e}")
                 traceback.print_exc()
 
+        phase_started = self._record_phase("health_and_views", phase_started)
+        await asyncio.gather(*(load(extension) for extension in extensions))
+        phase_started = self._record_phase("extensions", phase_started)
+
         try:
-            await self.tree.sync()
-            logger.info("Slash commands synced.")
+            await self.sync_command_tree()
         except Exception as e:
             logger.error(f"Failed to sync slash commands: {e}")
+        self._record_phase("command_sync", phase_started)
+
+        self.startup_timings["total"] = round(time.perf_counter() - startup_started, 3)
+        logger.info(f"Startup timings (s): {self.startup_timings}")
+
+    def _record_phase(self, name: str, started: float) -> float:
+        """Store the duration of a startup phase and return the next phase's start"""
+        now = time.perf_counter()
+        self.startup_timings[name] = round(now - started, 3)
+        return now
+
+    async def sync_command_tree(self, force: bool = False):
+        """Sync global slash commands only when their definitions changed since the last sync"""
+        # One cluster syncs for everyone
+        if self.cluster_id not in (None, 0):
+            return
+        
+        import hashlib
+        import json
+        
+        commands_payload = sorted(
+            (command.to_dict(self.tree) for command in self.tree.get_commands()),
+            key=lambda c: (c.get("type", 1), c["name"])
+        )
+        digest = hashlib.sha256(json.dumps(commands_payload, sort_keys=True, default=str).encode()).hexdigest()
+        key = f"bot:command_tree_hash:{self.application_id}"
+        force = force or os.getenv("FORCE_COMMAND_SYNC", "false").lower() == "true"
+        
+        if not force and self.redis:
+            try:
+                stored = await self.redis.get(key)
+                if stored and stored.decode() == digest:
+                    logger.info("Slash commands unchanged, skipping sync.")
+                    return
+            except Exception as e:
+                logger.warning(f"Command hash lookup failed, syncing anyway: {e}")
+        
+        await self.tree.sync()
+        logger.info("Slash commands synced.")
+        if self.redis:
+            await self.redis.set(key, digest)
+
+    async def publish_guild_event(self, guild_id, event_type: str, data: dict):
+        """Push a realtime event to dashboard viewers of a guild (best effort)"""
+        if not self.redis:
+            return
+        try:
+            from lithium_core.utils.guild_events import publish_guild_event
+            await publish_guild_event(self.redis, guild_id, event_type, data)
+        except Exception as e:
+            logger.warning(f"Failed to publish {event_type} for guild {guild_id}: {e}")
 
     async def on_ready(self):
         logger.info(f"Logged in as {self.user} (ID: {self.user.id})")
@@ -130,6 +223,19 @@ class LithiumBot(commands.Bot):
         if not self.intents.message_content or not self.intents.members:
             logger.error("CRITICAL: Missing required intents (Message Content or Members)!")
         
+        # Seed member counters and the guild -> shard map
+        for guild in self.guilds:
+            self.guild_stats.recount(guild)
+        await self.update_guild_shards(*self.guilds)
+        if self.cluster_id is not None and self.redis:
+            from lithium_core.utils.bot_status import SHARD_CLUSTER_MAP
+            try:
+                await self.redis.hset(SHARD_CLUSTER_MAP, mapping={sid: self.cluster_id for sid in self.local_shard_ids()})
+            except Exception as e:
+                logger.warning(f"Failed to update shard cluster map: {e}")
+        
+        await self.timers.start()
+        
         logger.info("------")
         self.bg_task = self.loop.create_task(self.redis_listener())
         self.stats_task = self.loop.create_task(self.guild_stats_updater())
@@ -163,6 +269,7 @@ class LithiumBot(commands.Bot):
 
     async def on_member_join(self, member):
         """Track new member joins for dashboard stats"""
+        self.guild_stats.member_joined(member)
         try:
             import redis.asyncio as redis_async
             redis_url = os.getenv("REDIS_URL", "redis://redis:6379/0")
@@ -177,54 +284,118 @@ class LithiumBot(commands.Bot):
         except Exception as e:
             logger.warning(f"Member join tracking error: {e}")
 
+    async def on_member_remove(self, member):
+        self.guild_stats.member_left(member)
+
+    async def on_presence_update(self, before, after):
+        self.guild_stats.presence_changed(before, after)
+
+    async def on_guild_join(self, guild):
+        self.guild_stats.recount(guild)
+        await self.update_guild_shards(guild)
+
+    async def on_guild_remove(self, guild):
+        self.guild_stats.forget(guild.id)
+        if self.redis:
+            from lithium_core.utils.bot_status import GUILD_SHARD_MAP
+            try:
+                await self.redis.hdel(GUILD_SHARD_MAP, str(guild.id))
+            except Exception as e:
+                logger.warning(f"Failed to unmap guild {guild.id}: {e}")
+
+    async def update_guild_shards(self, *guilds):
+        """Record which shard serves each guild so the dashboard can resolve its heartbeat"""
+        if not self.redis or not guilds:
+            return
+        from lithium_core.utils.bot_status import GUILD_SHARD_MAP
+        try:
+            await self.redis.hset(GUILD_SHARD_MAP, mapping={str(g.id): g.shard_id or 0 for g in guilds})
+        except Exception as e:
+            logger.warning(f"Failed to update guild shard map: {e}")
+
+    async def before_identify_hook(self, shard_id, *, initial=False):
+        """Clusters share Discord's identify limit: one IDENTIFY per bucket every 5 seconds"""
+        if self.cluster_id is None or not self.redis:
+            return await super().before_identify_hook(shard_id, initial=initial)
+        
+        key = f"bot:identify:{shard_id % self.max_concurrency}"
+        try:
+            while not await self.redis.set(key, self.cluster_id, nx=True, px=5500):
+                await asyncio.sleep(0.5)
+        except Exception as e:
+            logger.warning(f"Identify coordination unavailable ({e}), falling back to local delay")
+            await super().before_identify_hook(shard_id, initial=initial)
+
+    def local_shard_ids(self):
+        """Shards handled by this process"""
+        return list(self.shards.keys()) or list(self.shard_ids or [0])
+
+    def owns_guild(self, guild_id) -> bool:
+        """Whether this process serves `guild_id`; works before the guild cache is filled"""
+        if self.cluster_id is None or not self.shard_count:
+            return True
+        return (int(guild_id) >> 22) % self.shard_count in self.local_shard_ids()
+
     async def guild_stats_updater(self):
         """Background task to cache guild stats to Redis for the dashboard"""
-        import redis.asyncio as redis_async
         import json
-        
-        redis_url = os.getenv("REDIS_URL", "redis://redis:6379/0")
+        from lithium_core.utils.bot_status import shard_heartbeat_key, HEARTBEAT_TTL
+        from lithium_core.utils.guild_events import publish_guild_event
         
         await self.wait_until_ready()
         logger.info("Guild stats updater started.")
         
         while not self.is_closed():
             try:
-                r = redis_async.from_url(redis_url)
+                r = self.redis
+                guilds = list(self.guilds)
                 
-                for guild in self.guilds:
-                    try:
-                        # Count online members
-                        online_count = sum(1 for m in guild.members if m.status != discord.Status.offline)
-                        
-                        # Get new members in last 24h from cached join counter
-                        new_24h_key = f"guild:stats:{guild.id}:joins_24h"
-                        new_24h = await r.get(new_24h_key)
-                        new_24h = int(new_24h) if new_24h else 0
-                        
+                # Correct drift from missed events, a few guilds per tick
+                self.guild_stats.reconcile_due(guilds)
+                
+                # One round-trip for every guild's cached counters
+                async with r.pipeline(transaction=False) as pipe:
+                    for guild in guilds:
+                        pipe.mget(
+                            f"guild:stats:{guild.id}:joins_24h",
+                            f"guild:stats:{guild.id}:messages:today",
+                            f"guild:stats:{guild.id}:messages:week"
+                        )
+                    counters = await pipe.execute()
+                
+                async with r.pipeline(transaction=False) as pipe:
+                    # Single heartbeat per shard instead of one per guild
+                    now = str(datetime.now().timestamp())
+                    for shard_id in self.local_shard_ids():
+                        pipe.set(shard_heartbeat_key(shard_id), now, ex=HEARTBEAT_TTL)
+                    
+                    published = []
+                    for guild, (new_24h, today, week) in zip(guilds, counters):
+                        counts = self.guild_stats.get(guild.id) or self.guild_stats.recount(guild)
                         stats = {
-                            "total": guild.member_count,
-                            "online": online_count,
-                            "new_24h": new_24h
+                            "total": counts[0],
+                            "online": counts[1],
+                            "new_24h": int(new_24h or 0)
                         }
                         
-                        # Cache member stats with 5 minute expiry
-                        await r.set(
-                            f"guild:stats:{guild.id}:members",
-                            json.dumps(stats),
-                            ex=300
-                        )
+                        messages = {"today": int(today or 0), "week": int(week or 0)}
+                        if not self.guild_stats.should_publish(guild.id, (stats, messages)):
+                            continue
+                        published.append((guild.id, (stats, messages)))
                         
-                        # Set bot heartbeat (TTL 15s, refreshed every 10s)
-                        await r.set(
-                            f"bot:heartbeat:{guild.id}",
-                            str(datetime.now().timestamp()),
-                            ex=15
-                        )
+                        # Cache member stats with 5 minute expiry
+                        pipe.set(f"guild:stats:{guild.id}:members", json.dumps(stats), ex=300)
                         
-                    except Exception as e:
-                        logger.warning(f"Failed to update stats for guild {guild.id}: {e}")
-                
-                await r.aclose()
+                        # Push to connected dashboards
+                        await publish_guild_event(pipe, guild.id, "stats_update", {
+                            "members": stats,
+                            "messages": messages,
+                            "bot_status": "online"
+                        })
+                    
+                    await pipe.execute()
+                    for guild_id, published_stats in published:
+                        self.guild_stats.mark_published(guild_id, published_stats)
                 
             except Exception as e:
                 logger.error(f"Guild stats updater error: {e}")
@@ -236,10 +407,16 @@ class LithiumBot(commands.Bot):
         import redis.asyncio as redis_async
         import json
         
+        from lithium_core.utils.bot_status import BROADCAST_CHANNEL, SHARD_CLUSTER_MAP, cluster_commands_channel
+        
         redis_url = os.getenv("REDIS_URL", "redis://redis:6379/0")
         r = redis_async.from_url(redis_url)
         pubsub = r.pubsub()
-        await pubsub.subscribe("guild_config_changed")
+        channels = [BROADCAST_CHANNEL]
+        if self.cluster_id is not None:
+            # Commands routed to the cluster owning a guild
+            channels.append(cluster_commands_channel(self.cluster_id))
+        await pubsub.subscribe(*channels)
         
         logger.info("Redis Pub/Sub listener started.")
         
@@ -249,11 +426,24 @@ class LithiumBot(commands.Bot):
                     data = json.loads(message["data"])
                     logger.info(f"Received Redis command: {data}")
                     
+                    # Let cogs react to dashboard changes (on_guild_config_changed)
+                    if data.get("module"):
+                        self.dispatch("guild_config_changed", data)
+                    
                     if data.get("action") == "DIAGNOSTIC":
                         guild_id = int(data["guild_id"])
                         request_id = data["request_id"]
                         guild = self.get_guild(guild_id)
                         
+                        # Broadcast fallback: only the cluster owning the guild's shard
+                        # answers; cluster 0 stands in when no cluster serves that shard
+                        if guild is None and not self.owns_guild(guild_id):
+                            if self.cluster_id != 0:
+                                continue
+                            shard_id = (guild_id >> 22) % self.shard_count
+                            if await r.hexists(SHARD_CLUSTER_MAP, shard_id):
+                                continue
+                        
                         diag_res = {
                             "permissions": False,
                             "role_hierarchy": False,
@@ -285,15 +475,21 @@ class LithiumBot(commands.Bot):
 
     async def close(self):
         logger.info("Shutting down Lithium Bot...")
+        self.timers.stop()
         await super().close()
 
-async def main():
+async def main(shard_ids=None, shard_count=None, cluster_id=None, max_concurrency=1):
     token = os.getenv("DISCORD_TOKEN")
     if not token:
         logger.error("DISCORD_TOKEN not found in environment!")
         return
 
-    bot = LithiumBot()
+    bot = LithiumBot(
+        shard_ids=shard_ids,
+        shard_count=shard_count,
+        cluster_id=cluster_id,
+        max_concurrency=max_concurrency
+    )
 
     @bot.command()
     @commands.check_any(commands.is_owner(), commands.has_permissions(administrator=True))
@@ -0,0 +1,48 @@
+"""
+Date helpers for the per-timezone birthday dispatcher.
+
+Each configured timezone gets one timer that fires at its local midnight;
+the handler announces the birthdays of every guild in that timezone.
+Times handed to the timer scheduler are naive UTC like the rest of the bot.
+"""
+import calendar
+from datetime import date, datetime, time, timedelta, timezone
+from typing import List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+
+def get_zone(name: Optional[str]) -> Optional[ZoneInfo]:
+    """ZoneInfo for an IANA name, or None if unknown"""
+    try:
+        return ZoneInfo(name or "UTC")
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+def local_today(tz_name: str, now: datetime) -> date:
+    """Local date in `tz_name` at naive-UTC `now`"""
+    zone = get_zone(tz_name) or ZoneInfo("UTC")
+    return now.replace(tzinfo=timezone.utc).astimezone(zone).date()
+
+
+def next_local_midnight(tz_name: str, now: datetime) -> datetime:
+    """Next local midnight after naive-UTC `now`, as naive UTC"""
+    zone = get_zone(tz_name) or ZoneInfo("UTC")
+    tomorrow = local_today(tz_name, now) + timedelta(days=1)
+    midnight = datetime.combine(tomorrow, time.min, tzinfo=zone)
+    return midnight.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def birthday_keys(day: date) -> List[Tuple[int, int]]:
+    """(month, day) pairs celebrated on `day`; 29 February falls on the 28th in common years"""
+    keys = [(day.month, day.day)]
+    if day.month == 2 and day.day == 28 and not calendar.isleap(day.year):
+        keys.append((2, 29))
+    return keys
+
+
+def announcement_gap(count: int, window: float = 900, min_gap: float = 0.5, max_gap: float = 5.0) -> float:
+    """Seconds between announcements so `count` of them spread over about `window`"""
+    if count <= 1:
+        return 0.0
+    return min(max_gap, max(min_gap, window / count))
@@ -0,0 +1,19 @@
+"""
+Helpers for running many Discord REST calls without flooding a rate-limit bucket.
+"""
+import asyncio
+from typing import Awaitable, Iterable, List
+
+
+async def gather_limited(coros: Iterable[Awaitable], limit: int = 5) -> List:
+    """
+    Run coroutines concurrently, at most `limit` at a time.
+    Exceptions are returned in place of results, like gather(return_exceptions=True).
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(coro):
+        async with semaphore:
+            return await coro
+
+    return await asyncio.gather(*(run(c) for c in coros), return_exceptions=True)
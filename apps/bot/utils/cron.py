@@ -0,0 +1,124 @@
+"""
+Five-field cron expressions for scheduled messages.
+
+Supports ``*``, lists, ranges, steps (``*/15``, ``1-5/2``), month and weekday
+names and the ``@hourly``/``@daily``/``@weekly``/``@monthly``/``@yearly``
+macros. Like Vixie cron, when both day-of-month and day-of-week are
+restricted a day matching either one fires. Expressions are parsed once
+and cached; times are naive UTC like the rest of the bot.
+"""
+import zlib
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import FrozenSet, Optional
+
+MACROS = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+}
+
+MONTH_NAMES = {name: i for i, name in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1)}
+DAY_NAMES = {name: i for i, name in enumerate(["sun", "mon", "tue", "wed", "thu", "fri", "sat"])}
+
+# Give up looking for a matching minute after this many years (e.g. "0 0 30 2 *")
+SEARCH_YEARS = 5
+
+
+def _parse_field(field: str, low: int, high: int, names: Optional[dict] = None) -> FrozenSet[int]:
+    values = set()
+    for part in field.lower().split(","):
+        part, _, step = part.partition("/")
+        step = int(step) if step else 1
+        if step < 1:
+            raise ValueError(f"invalid step in {field!r}")
+
+        if part == "*":
+            start, end = low, high
+        else:
+            first, _, last = part.partition("-")
+            start = names[first] if names and first in names else int(first)
+            end = (names[last] if names and last in names else int(last)) if last else (high if step > 1 else start)
+        if not low <= start <= end <= high:
+            raise ValueError(f"{field!r} is outside {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronExpression:
+    """Ayrıştırılmış cron ifadesi"""
+
+    __slots__ = ("minutes", "hours", "days", "months", "weekdays", "day_restricted", "weekday_restricted")
+
+    def __init__(self, expression: str):
+        expression = MACROS.get(expression.strip().lower(), expression)
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron expression needs 5 fields: {expression!r}")
+
+        minute, hour, day, month, weekday = fields
+        self.minutes = _parse_field(minute, 0, 59)
+        self.hours = _parse_field(hour, 0, 23)
+        self.days = _parse_field(day, 1, 31)
+        self.months = _parse_field(month, 1, 12, MONTH_NAMES)
+        # 7 is Sunday too
+        self.weekdays = frozenset(d % 7 for d in _parse_field(weekday, 0, 7, DAY_NAMES))
+        self.day_restricted = day != "*"
+        self.weekday_restricted = weekday != "*"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        # datetime.weekday(): Monday is 0; cron: Sunday is 0
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.day_restricted and self.weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, after: datetime) -> datetime:
+        """First matching minute strictly after `after`"""
+        moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = after.year + SEARCH_YEARS
+        while moment.year <= limit:
+            if moment.month not in self.months:
+                year, month = (moment.year + 1, 1) if moment.month == 12 else (moment.year, moment.month + 1)
+                moment = moment.replace(year=year, month=month, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+                continue
+            if moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+                continue
+            return moment
+        raise ValueError("cron expression never matches")
+
+
+@lru_cache(maxsize=4096)
+def parse_cron(expression: str) -> CronExpression:
+    return CronExpression(expression)
+
+
+def jitter_seconds(key, max_jitter: int = 30) -> int:
+    """Stable per-key offset so posts sharing a schedule don't all fire in the same second"""
+    if max_jitter <= 0:
+        return 0
+    return zlib.crc32(str(key).encode()) % (max_jitter + 1)
+
+
+def next_run(expression: str, after: datetime, key=None, max_jitter: int = 30) -> datetime:
+    """Next fire time (cron slot + per-key jitter) strictly after `after`"""
+    jitter = jitter_seconds(key, max_jitter) if key is not None else 0
+    return parse_cron(expression).next_after(after) + timedelta(seconds=jitter)
+
+
+def is_misfire(due: datetime, now: datetime, grace: float) -> bool:
+    """True if a run is later than `grace` seconds and should be skipped"""
+    return (now - due).total_seconds() > grace
@@ -1,4 +1,5 @@
 import asyncio
+import hashlib
 import logging
 import os
 import sys
@@ -76,6 +77,37 @@ def _sync_columns(conn):
                 except Exception as e:
                     logger.error(f"Failed to auto-add column {column.name} to {table_name}: {e}")
 
+def schema_fingerprint() -> str:
+    """
+    Hash of every table, column (type, nullability) and index defined by the models.
+    Any model change produces a new fingerprint and triggers a full sync.
+    """
+    parts = []
+    for table in Base.metadata.sorted_tables:
+        parts.append(f"T:{table.name}")
+        for column in table.columns:
+            parts.append(f"C:{column.name}:{column.type!r}:{column.nullable}")
+        for index in sorted(table.indexes, key=lambda i: i.name or ""):
+            parts.append(f"I:{index.name}")
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+async def _stored_fingerprint(conn):
+    await conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_fingerprints ("
+        "name VARCHAR(50) PRIMARY KEY, fingerprint VARCHAR(64) NOT NULL, updated_at TIMESTAMP DEFAULT now())"
+    ))
+    result = await conn.execute(text("SELECT fingerprint FROM schema_fingerprints WHERE name = 'models'"))
+    return result.scalar()
+
+async def _store_fingerprint(conn, fingerprint: str):
+    await conn.execute(
+        text(
+            "INSERT INTO schema_fingerprints (name, fingerprint) VALUES ('models', :fp) "
+            "ON CONFLICT (name) DO UPDATE SET fingerprint = :fp, updated_at = now()"
+        ),
+        {"fp": fingerprint}
+    )
+
 async def run_migrations_async():
     """
     Main entry point called by bot setup_hook.
@@ -91,7 +123,18 @@ async def run_migrations_async():
     
     try:
         engine = create_async_engine(db_url, echo=False)
-        await sync_schema(engine)
+        fingerprint = schema_fingerprint()
+        force = os.getenv("FORCE_SCHEMA_SYNC", "false").lower() == "true"
+        
+        async with engine.begin() as conn:
+            stored = await _stored_fingerprint(conn)
+        
+        if stored == fingerprint and not force:
+            logger.info("Schema fingerprint unchanged, skipping sync.")
+        else:
+            await sync_schema(engine)
+            async with engine.begin() as conn:
+                await _store_fingerprint(conn, fingerprint)
         await engine.dispose()
     except Exception as e:
         logger.error(f"Critical DB Sync Error: {e}")
@@ -0,0 +1,180 @@
+"""
+Restart-safe state for interactive button games (blackjack, duels).
+
+Each running game is a Redis hash ``game:{kind}:{game_id}`` with a TTL, and
+its buttons carry the game id in their custom_id. Any bot process can serve
+a click by loading the hash, so games survive restarts and nothing (least of
+all a DB session) is held in memory while players think.
+
+State objects use ``__slots__``; every slot is stored as one JSON-encoded
+hash field.
+"""
+import json
+import random
+import secrets
+from typing import List, Optional, Type, TypeVar
+
+GAME_TTL = 900
+
+# Empty fields hold JSON null; missing key (expired game) also fails
+SET_ONCE_LUA = """
+if redis.call('HGET', KEYS[1], ARGV[1]) ~= 'null' then return 0 end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+return 1
+"""
+
+# Compare-and-set on the move counter: write the given fields only if the game
+# still exists and nobody moved since it was loaded
+UPDATE_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return 0 end
+if (redis.call('HGET', KEYS[1], 'version') or 'null') ~= ARGV[1] then return 0 end
+for i = 4, #ARGV, 2 do redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1]) end
+redis.call('HSET', KEYS[1], 'version', ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+# Delete the game, optionally only at the move it was loaded at
+FINISH_LUA = """
+if ARGV[1] ~= '' and (redis.call('HGET', KEYS[1], 'version') or 'null') ~= ARGV[1] then return 0 end
+return redis.call('DEL', KEYS[1])
+"""
+
+S = TypeVar("S", bound="GameState")
+
+
+class GameState:
+    # version counts the moves written through GameStore.update
+    __slots__ = ("game_id", "version")
+    kind = "game"
+
+    def __init__(self, game_id: Optional[str] = None, **fields):
+        self.game_id = game_id or secrets.token_hex(6)
+        for slot in self.fields():
+            setattr(self, slot, fields.get(slot))
+
+    @classmethod
+    def fields(cls) -> List[str]:
+        return [s for klass in cls.__mro__ for s in getattr(klass, "__slots__", ()) if s != "game_id"]
+
+    def to_hash(self) -> dict:
+        return {slot: json.dumps(getattr(self, slot)) for slot in self.fields()}
+
+    @classmethod
+    def from_hash(cls: Type[S], game_id: str, data: dict) -> S:
+        fields = {}
+        for key, value in data.items():
+            key = key.decode() if isinstance(key, bytes) else key
+            fields[key] = json.loads(value)
+        return cls(game_id, **fields)
+
+
+class BlackjackState(GameState):
+    __slots__ = ("guild_id", "user_id", "channel_id", "message_id", "amount", "balance",
+                 "deck", "player_hand", "dealer_hand")
+    kind = "bj"
+
+    @classmethod
+    def deal(cls, guild_id: int, user_id: int, amount: int, balance: float) -> "BlackjackState":
+        deck = [2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10, 11] * 4
+        random.shuffle(deck)
+        state = cls(guild_id=guild_id, user_id=user_id, amount=amount, balance=balance, deck=deck)
+        state.player_hand = [state.draw_card(), state.draw_card()]
+        state.dealer_hand = [state.draw_card(), state.draw_card()]
+        return state
+
+    def draw_card(self) -> int:
+        return self.deck.pop()
+
+    @staticmethod
+    def calculate_score(hand: List[int]) -> int:
+        score = sum(hand)
+        aces = hand.count(11)
+        while score > 21 and aces:
+            score -= 10
+            aces -= 1
+        return score
+
+    def dealer_play(self) -> str:
+        """Dealer draws to 17; returns the result from the player's side"""
+        while self.calculate_score(self.dealer_hand) < 17:
+            self.dealer_hand.append(self.draw_card())
+
+        dealer_score = self.calculate_score(self.dealer_hand)
+        player_score = self.calculate_score(self.player_hand)
+        if dealer_score > 21:
+            return "dealer_bust"
+        if dealer_score > player_score:
+            return "loss"
+        if dealer_score < player_score:
+            return "win"
+        return "push"
+
+
+class DuelState(GameState):
+    __slots__ = ("guild_id", "player1_id", "player2_id", "player1_choice", "player2_choice")
+    kind = "duel"
+
+    BEATS = {"rock": "scissors", "paper": "rock", "scissors": "paper"}
+
+    def winner_id(self) -> Optional[int]:
+        """None on a draw"""
+        if self.player1_choice == self.player2_choice:
+            return None
+        if self.BEATS[self.player1_choice] == self.player2_choice:
+            return self.player1_id
+        return self.player2_id
+
+
+class GameStore:
+    """Oyun durumlarını Redis hash'lerinde tutar"""
+
+    def __init__(self, redis, ttl: int = GAME_TTL):
+        self.redis = redis
+        self.ttl = ttl
+        self._set_once = None
+        self._update = None
+        self._finish = None
+
+    @staticmethod
+    def key(kind: str, game_id: str) -> str:
+        return f"game:{kind}:{game_id}"
+
+    async def save(self, state: GameState) -> None:
+        """Write a new game in full"""
+        key = self.key(state.kind, state.game_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=state.to_hash())
+            pipe.expire(key, self.ttl)
+            await pipe.execute()
+
+    async def update(self, state: GameState, *fields: str) -> bool:
+        """Write `fields` of a running game; False if it ended or moved since `state` was loaded"""
+        if self._update is None:
+            self._update = self.redis.register_script(UPDATE_LUA)
+        args = [json.dumps(state.version), json.dumps((state.version or 0) + 1), self.ttl]
+        for field in fields:
+            args += [field, json.dumps(getattr(state, field))]
+        if not await self._update(keys=[self.key(state.kind, state.game_id)], args=args):
+            return False
+        state.version = (state.version or 0) + 1
+        return True
+
+    async def load(self, cls: Type[S], game_id: str) -> Optional[S]:
+        data = await self.redis.hgetall(self.key(cls.kind, game_id))
+        return cls.from_hash(game_id, data) if data else None
+
+    async def set_once(self, cls: Type[GameState], game_id: str, field: str, value) -> bool:
+        """Set a field only if it is still empty (e.g. a duel choice); False if taken or expired"""
+        if self._set_once is None:
+            self._set_once = self.redis.register_script(SET_ONCE_LUA)
+        return bool(await self._set_once(keys=[self.key(cls.kind, game_id)], args=[field, json.dumps(value)]))
+
+    async def finish(self, cls: Type[GameState], game_id: str, state: Optional[GameState] = None) -> bool:
+        """Remove a game; only the first caller gets True, so results are paid once.
+        With `state`, only if no move was made since it was loaded."""
+        if state is None:
+            return bool(await self.redis.delete(self.key(cls.kind, game_id)))
+        if self._finish is None:
+            self._finish = self.redis.register_script(FINISH_LUA)
+        return bool(await self._finish(keys=[self.key(cls.kind, game_id)], args=[json.dumps(state.version)]))
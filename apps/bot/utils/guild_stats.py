@@ -0,0 +1,103 @@
+"""
+Incrementally maintained member and online counts per guild.
+
+Counts are seeded with one full scan when a guild becomes available and then
+kept up to date from member and presence events, so the periodic stats task
+never has to iterate ``guild.members``. Each guild is reconciled against a
+full count once per ``reconcile_interval``, staggered by guild id so the scans
+are spread evenly instead of all landing on the same tick.
+"""
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import discord
+
+
+def is_online(member) -> bool:
+    return member.status != discord.Status.offline
+
+
+class GuildStatsTracker:
+    """Guild başına üye / çevrimiçi sayaçları"""
+
+    def __init__(self, reconcile_interval: float = 3600, refresh_interval: float = 240):
+        self.reconcile_interval = reconcile_interval
+        # Republish unchanged stats before their Redis TTL runs out
+        self.refresh_interval = refresh_interval
+        # guild_id -> [total, online]
+        self._counts: Dict[int, List[int]] = {}
+        # guild_id -> next full recount (monotonic)
+        self._reconcile_at: Dict[int, float] = {}
+        # guild_id -> (last published stats, published at)
+        self._published: Dict[int, Tuple[Any, float]] = {}
+
+    def recount(self, guild) -> Tuple[int, int]:
+        """Full scan; used when a guild becomes available and for reconciliation"""
+        online = sum(1 for m in guild.members if is_online(m))
+        total = guild.member_count or len(guild.members)
+        self._counts[guild.id] = [total, online]
+
+        now = time.monotonic()
+        if guild.id not in self._reconcile_at:
+            # First reconcile lands at a per-guild offset within the interval
+            self._reconcile_at[guild.id] = now + (guild.id >> 22) % max(int(self.reconcile_interval), 1)
+        else:
+            self._reconcile_at[guild.id] = now + self.reconcile_interval
+        return total, online
+
+    def reconcile_due(self, guilds, limit: int = 50) -> int:
+        """Recount guilds whose reconcile time has passed; returns how many drifted"""
+        now = time.monotonic()
+        drifted = 0
+        for guild in guilds:
+            if limit <= 0:
+                break
+            if self._reconcile_at.get(guild.id, 0) > now:
+                continue
+            before = self.get(guild.id)
+            if self.recount(guild) != before:
+                drifted += 1
+            limit -= 1
+        return drifted
+
+    def forget(self, guild_id: int) -> None:
+        self._counts.pop(guild_id, None)
+        self._reconcile_at.pop(guild_id, None)
+        self._published.pop(guild_id, None)
+
+    def get(self, guild_id: int) -> Optional[Tuple[int, int]]:
+        counts = self._counts.get(guild_id)
+        return (counts[0], counts[1]) if counts else None
+
+    def should_publish(self, guild_id: int, stats: Any) -> bool:
+        """True if stats changed since the last publish (or the cached copy is about to expire)"""
+        last = self._published.get(guild_id)
+        return not (last and last[0] == stats and time.monotonic() - last[1] < self.refresh_interval)
+
+    def mark_published(self, guild_id: int, stats: Any) -> None:
+        """Record a publish once it actually went out; a failed write is retried next round"""
+        self._published[guild_id] = (stats, time.monotonic())
+
+    def member_joined(self, member) -> None:
+        counts = self._counts.get(member.guild.id)
+        if counts is None:
+            return
+        counts[0] += 1
+        if is_online(member):
+            counts[1] += 1
+
+    def member_left(self, member) -> None:
+        counts = self._counts.get(member.guild.id)
+        if counts is None:
+            return
+        counts[0] = max(counts[0] - 1, 0)
+        if is_online(member):
+            counts[1] = max(counts[1] - 1, 0)
+
+    def presence_changed(self, before, after) -> None:
+        counts = self._counts.get(after.guild.id)
+        if counts is None:
+            return
+        was_online, now_online = is_online(before), is_online(after)
+        if was_online != now_online:
+            counts[1] = max(counts[1] + (1 if now_online else -1), 0)
@@ -0,0 +1,45 @@
+"""
+Fixed-bucket join-rate counter for anti-raid.
+
+A guild's last minute of joins is kept as 60 one-second buckets with a
+running total. Recording a join clears only the buckets that expired since
+the previous join, so the cost is O(1) amortised no matter how many joins
+arrive, unlike filtering a list of timestamps on every join.
+"""
+from array import array
+
+
+class BucketCounter:
+    """Kayan pencerede olay sayısı (sabit kovalar)"""
+
+    __slots__ = ("width", "counts", "last_epoch", "total")
+
+    def __init__(self, buckets: int = 60, width: float = 1.0):
+        self.width = width
+        self.counts = array("l", [0]) * buckets
+        self.last_epoch = None
+        self.total = 0
+
+    def _advance(self, epoch: int) -> None:
+        if self.last_epoch is None:
+            self.last_epoch = epoch
+            return
+        steps = min(epoch - self.last_epoch, len(self.counts))
+        for offset in range(1, steps + 1):
+            i = (self.last_epoch + offset) % len(self.counts)
+            self.total -= self.counts[i]
+            self.counts[i] = 0
+        self.last_epoch = max(self.last_epoch, epoch)
+
+    def add(self, now: float, amount: int = 1) -> int:
+        """Record `amount` events at `now`; returns the total over the window"""
+        epoch = int(now // self.width)
+        self._advance(epoch)
+        # Late events (clock skew) land in the current bucket
+        self.counts[self.last_epoch % len(self.counts)] += amount
+        self.total += amount
+        return self.total
+
+    def count(self, now: float) -> int:
+        self._advance(int(now // self.width))
+        return self.total
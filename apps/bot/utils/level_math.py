@@ -0,0 +1,68 @@
+"""
+Level curve over total (cumulative) XP.
+
+``user_levels.total_xp`` stores every XP point a member ever earned; the
+level is derived from it (``xp`` is still kept as progress within the level). Reaching level ``n + 1`` from ``n`` costs
+``5n² + 50n + 100`` XP. Cumulative thresholds are precomputed once, so a
+lookup is a bisect instead of a loop over levels.
+"""
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Tuple
+
+
+def xp_for_level(level: int) -> int:
+    """XP needed to go from `level` to `level + 1`"""
+    return 5 * (level ** 2) + (50 * level) + 100
+
+
+class LevelCurve:
+    """Toplam XP -> seviye eşikleri"""
+
+    def __init__(self, max_level: int = 1000):
+        # thresholds[n] = total XP needed to reach level n
+        self.thresholds: List[int] = [0]
+        self._extend(max_level)
+
+    def _extend(self, max_level: int) -> None:
+        for level in range(len(self.thresholds) - 1, max_level):
+            self.thresholds.append(self.thresholds[-1] + xp_for_level(level))
+
+    def total_for(self, level: int) -> int:
+        """Total XP at which `level` is reached"""
+        if level >= len(self.thresholds):
+            self._extend(level)
+        return self.thresholds[level]
+
+    def level_for(self, total_xp: int) -> int:
+        while total_xp >= self.thresholds[-1]:
+            self._extend(len(self.thresholds) * 2)
+        return bisect_right(self.thresholds, total_xp) - 1
+
+    def progress(self, total_xp: int) -> Tuple[int, int, int]:
+        """(level, XP into the level, XP the level costs)"""
+        level = self.level_for(total_xp)
+        return level, total_xp - self.thresholds[level], xp_for_level(level)
+
+
+class RewardTable:
+    """Seviye ödül rolleri, seviyeye göre sıralı"""
+
+    def __init__(self, rewards: Iterable[Tuple[int, int]] = ()):
+        pairs = sorted(rewards)
+        self.levels: List[int] = [level for level, _ in pairs]
+        self.role_ids: List[int] = [role_id for _, role_id in pairs]
+
+    def __bool__(self) -> bool:
+        return bool(self.levels)
+
+    def roles_up_to(self, level: int) -> List[int]:
+        """Every reward role earned at or below `level`"""
+        return self.role_ids[:bisect_right(self.levels, level)]
+
+
+def build_reward_tables(rows: Iterable[Tuple[str, int, str]]) -> Dict[int, RewardTable]:
+    """(guild_id, level_requirement, role_id) rows -> RewardTable per guild"""
+    grouped: Dict[int, List[Tuple[int, int]]] = {}
+    for guild_id, level, role_id in rows:
+        grouped.setdefault(int(guild_id), []).append((level, int(role_id)))
+    return {guild_id: RewardTable(pairs) for guild_id, pairs in grouped.items()}
@@ -0,0 +1,92 @@
+"""
+In-memory reaction-role index and per-member role change batching.
+
+Every reaction in a guild used to cost a ``reaction_role_menus`` lookup. The
+index keeps ``message_id -> {emoji: role_id}`` for every menu, so reactions
+on other messages are dropped with a dict lookup. Role changes from a burst
+of reactions by the same member are collected for ``delay`` seconds and
+applied with a single ``member.edit(roles=...)``.
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger("lithium-bot")
+
+
+class ReactionRoleIndex:
+    """Mesaj ID -> {emoji: rol ID} eşlemesi"""
+
+    def __init__(self):
+        self.menus: Dict[int, Dict[str, int]] = {}
+        self.guilds: Dict[int, int] = {}
+
+    def __contains__(self, message_id: int) -> bool:
+        return message_id in self.menus
+
+    def __len__(self) -> int:
+        return len(self.menus)
+
+    def set_menu(self, guild_id: int, message_id: int, options: Optional[dict]) -> None:
+        self.menus[message_id] = {emoji: int(role_id) for emoji, role_id in (options or {}).items()}
+        self.guilds[message_id] = guild_id
+
+    def remove_menu(self, message_id: int) -> bool:
+        self.guilds.pop(message_id, None)
+        return self.menus.pop(message_id, None) is not None
+
+    def replace_guild(self, guild_id: int, rows: Iterable[Tuple[int, Optional[dict]]]) -> None:
+        """Drop a guild's menus and load `rows` of (message_id, options) in their place"""
+        for message_id in [m for m, g in self.guilds.items() if g == guild_id]:
+            self.remove_menu(message_id)
+        for message_id, options in rows:
+            self.set_menu(guild_id, message_id, options)
+
+    def role_for(self, message_id: int, emoji: str) -> Optional[int]:
+        options = self.menus.get(message_id)
+        return options.get(emoji) if options else None
+
+
+# (guild_id, member_id, {role_id: True to add / False to remove}) -> None
+RoleApplier = Callable[[int, int, Dict[int, bool]], Awaitable[None]]
+
+
+class RoleChangeBatcher:
+    """Üye başına rol değişikliklerini toplayıp tek seferde uygular"""
+
+    def __init__(self, apply: RoleApplier, delay: float = 1.5):
+        self.apply = apply
+        self.delay = delay
+        self.pending: Dict[Tuple[int, int], Dict[int, bool]] = {}
+        self.tasks: Dict[Tuple[int, int], asyncio.Task] = {}
+
+    def queue(self, guild_id: int, member_id: int, role_id: int, add: bool) -> None:
+        key = (guild_id, member_id)
+        # The latest reaction for a role wins (add then remove cancels out)
+        self.pending.setdefault(key, {})[role_id] = add
+        task = self.tasks.get(key)
+        if task is None or task.done():
+            self.tasks[key] = asyncio.create_task(self._run(key))
+
+    async def _run(self, key: Tuple[int, int]) -> None:
+        # The task stays registered until the edit lands, so changes queued
+        # meanwhile wait for it and go out in the next round
+        try:
+            while key in self.pending:
+                await asyncio.sleep(self.delay)
+                changes = self.pending.pop(key, None)
+                if not changes:
+                    break
+                try:
+                    await self.apply(key[0], key[1], changes)
+                except Exception as e:
+                    logger.error(f"Reaction role update failed for {key[1]} in {key[0]}: {e}")
+        finally:
+            if self.tasks.get(key) is asyncio.current_task():
+                del self.tasks[key]
+
+    def stop(self) -> None:
+        for task in self.tasks.values():
+            task.cancel()
+        self.tasks.clear()
+        self.pending.clear()
@@ -0,0 +1,17 @@
+"""
+Role list helpers for single-call member.edit(roles=...) updates.
+"""
+
+
+def release_role_list(member, jail_role, previous_role_ids) -> list:
+    """
+    Hapisten çıkışta üyenin sahip olacağı tam rol listesi:
+    mevcut roller - jail rolü + geri verilebilen eski roller.
+    Tek bir member.edit(roles=...) çağrısı için kullanılır.
+    """
+    roles = [r for r in member.roles if r != jail_role and not r.is_default()]
+    for role_id in previous_role_ids or []:
+        role = member.guild.get_role(int(role_id))
+        if role and role not in roles and role.is_assignable():
+            roles.append(role)
+    return roles
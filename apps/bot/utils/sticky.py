@@ -0,0 +1,119 @@
+"""
+Debounced sticky-message reposting.
+
+Reposting a sticky on every message costs a fetch, a delete and a send per
+message. The coordinator instead waits for the channel to go quiet
+(``quiet`` seconds without messages), reposting no later than ``max_wait``
+after the first buried message or as soon as ``max_messages`` have piled
+up, and never more often than ``min_interval``. The previous sticky is
+deleted by id without fetching it. The last message id is kept in memory
+and written back to the database in bulk by the owning cog.
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger("lithium-bot")
+
+
+class StickyState:
+    __slots__ = ("sticky_id", "channel_id", "content", "last_message_id",
+                 "pending", "first_pending", "last_activity", "last_post", "dirty", "task")
+
+    def __init__(self, sticky_id: int, channel_id: int, content: str, last_message_id: Optional[int] = None):
+        self.sticky_id = sticky_id
+        self.channel_id = channel_id
+        self.content = content
+        self.last_message_id = last_message_id
+        # Messages posted since the last repost
+        self.pending = 0
+        self.first_pending = 0.0
+        self.last_activity = 0.0
+        self.last_post = float("-inf")
+        self.dirty = False
+        self.task: Optional[asyncio.Task] = None
+
+    def note_message(self, now: float) -> None:
+        if not self.pending:
+            self.first_pending = now
+        self.pending += 1
+        self.last_activity = now
+
+    def due_at(self, quiet: float, max_wait: float, min_interval: float, max_messages: int) -> float:
+        """When the sticky should be reposted, given the activity seen so far"""
+        if self.pending >= max_messages:
+            due = self.last_activity
+        else:
+            due = min(self.last_activity + quiet, self.first_pending + max_wait)
+        return max(due, self.last_post + min_interval)
+
+
+# (channel_id, content, previous message id) -> new message id
+Reposter = Callable[[int, str, Optional[int]], Awaitable[Optional[int]]]
+
+
+class StickyCoordinator:
+    """Kanal başına sabit mesaj yeniden gönderimini toplar"""
+
+    def __init__(self, repost: Reposter, quiet: float = 5, max_wait: float = 30,
+                 min_interval: float = 10, max_messages: int = 15):
+        self.repost = repost
+        self.quiet = quiet
+        self.max_wait = max_wait
+        self.min_interval = min_interval
+        self.max_messages = max_messages
+        self.states: Dict[int, StickyState] = {}
+
+    def set(self, sticky_id: int, channel_id: int, content: str, last_message_id: Optional[int] = None) -> None:
+        state = self.states.get(channel_id)
+        if state:
+            state.sticky_id, state.content = sticky_id, content
+        else:
+            self.states[channel_id] = StickyState(sticky_id, channel_id, content, last_message_id)
+
+    def remove(self, channel_id: int) -> None:
+        state = self.states.pop(channel_id, None)
+        if state and state.task:
+            state.task.cancel()
+
+    def note_message(self, channel_id: int) -> None:
+        state = self.states.get(channel_id)
+        if state is None:
+            return
+        state.note_message(time.monotonic())
+        if state.task is None or state.task.done():
+            state.task = asyncio.create_task(self._run(state))
+
+    def take_dirty(self) -> Iterable[Tuple[int, Optional[int]]]:
+        """(sticky_id, last_message_id) pairs changed since the last call"""
+        changed = []
+        for state in self.states.values():
+            if state.dirty:
+                state.dirty = False
+                changed.append((state.sticky_id, state.last_message_id))
+        return changed
+
+    def stop(self) -> None:
+        for state in self.states.values():
+            if state.task:
+                state.task.cancel()
+
+    async def _run(self, state: StickyState) -> None:
+        # Messages that arrive while reposting start another round
+        while state.pending:
+            delay = state.due_at(self.quiet, self.max_wait, self.min_interval, self.max_messages) - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            state.pending = 0
+            state.last_post = time.monotonic()
+            try:
+                message_id = await self.repost(state.channel_id, state.content, state.last_message_id)
+            except Exception as e:
+                logger.error(f"Sticky repost failed in {state.channel_id}: {e}")
+                continue
+            if message_id:
+                state.last_message_id = message_id
+                state.dirty = True
@@ -0,0 +1,60 @@
+"""
+Per-guild queue for temporary voice channel create/delete calls.
+
+Channel creation and deletion share tight per-guild rate limits. Operations
+are queued per guild and run one at a time with a small gap between them,
+so a crowd joining the hub cannot burst the bucket. Duplicate operations
+(the same member queued twice, the same channel deleted twice) collapse
+into one, and the handlers re-check state before acting.
+"""
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Tuple
+
+logger = logging.getLogger("lithium-bot")
+
+# (guild_id, member_id or channel_id) -> None
+VoiceOp = Callable[[int, int], Awaitable[None]]
+
+
+class TempVoiceQueue:
+    """Geçici ses kanalı işlemlerini sunucu başına sıraya koyar"""
+
+    def __init__(self, create: VoiceOp, delete: VoiceOp, min_interval: float = 1.0):
+        self.handlers = {"create": create, "delete": delete}
+        self.min_interval = min_interval
+        # guild_id -> ordered {(op, target_id): None}
+        self.pending: Dict[int, "OrderedDict[Tuple[str, int], None]"] = {}
+        self.tasks: Dict[int, asyncio.Task] = {}
+
+    def submit_create(self, guild_id: int, member_id: int) -> None:
+        self._submit(guild_id, ("create", member_id))
+
+    def submit_delete(self, guild_id: int, channel_id: int) -> None:
+        self._submit(guild_id, ("delete", channel_id))
+
+    def _submit(self, guild_id: int, op: Tuple[str, int]) -> None:
+        self.pending.setdefault(guild_id, OrderedDict())[op] = None
+        task = self.tasks.get(guild_id)
+        if task is None or task.done():
+            self.tasks[guild_id] = asyncio.create_task(self._run(guild_id))
+
+    async def _run(self, guild_id: int) -> None:
+        queue = self.pending[guild_id]
+        while queue:
+            (kind, target_id), _ = queue.popitem(last=False)
+            try:
+                await self.handlers[kind](guild_id, target_id)
+            except Exception as e:
+                logger.error(f"Temp voice {kind} failed for {target_id} in {guild_id}: {e}")
+            if queue:
+                await asyncio.sleep(self.min_interval)
+        self.pending.pop(guild_id, None)
+        self.tasks.pop(guild_id, None)
+
+    def stop(self) -> None:
+        for task in self.tasks.values():
+            task.cancel()
+        self.tasks.clear()
+        self.pending.clear()
@@ -0,0 +1,190 @@
+"""
+Central timer scheduler for expiring state (mutes, jails, giveaways, lockdowns...).
+
+Instead of every cog polling the database once a minute, cogs register a
+timer *kind* with a handler and a loader:
+
+    bot.timers.register("unmute", self.expire_mutes, self.load_pending_mutes)
+    bot.timers.schedule("unmute", mute.id, mute.unmute_at)
+
+Deadlines live in a single min-heap and a single task sleeps until the next
+one. Keys of the same kind that fall due together are handed to the handler
+as one batch. The database rows remain the source of truth: on startup each
+loader returns the pending ``(key, due)`` pairs, so restarts reload timers.
+Handlers that cannot act yet (guild unavailable, send failed) reschedule the
+key with ``retry_at``, which backs off and eventually gives up.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("lithium-bot")
+
+Handler = Callable[[List[Hashable]], Awaitable[None]]
+Loader = Callable[[], Awaitable[Iterable[Tuple[Hashable, datetime]]]]
+
+
+def to_timestamp(due) -> float:
+    """Naive datetimes are UTC throughout the codebase"""
+    if isinstance(due, datetime):
+        if due.tzinfo is None:
+            due = due.replace(tzinfo=timezone.utc)
+        return due.timestamp()
+    return float(due)
+
+
+def retry_at(
+    due: datetime,
+    now: datetime,
+    minimum: timedelta = timedelta(seconds=60),
+    maximum: timedelta = timedelta(hours=1),
+    give_up: timedelta = timedelta(days=1)
+) -> Optional[datetime]:
+    """Next attempt for a timer due at `due` that could not run; the wait grows with
+    how overdue it is. None once it is more than `give_up` overdue."""
+    overdue = now - due
+    if overdue > give_up:
+        return None
+    return now + min(max(overdue, minimum), maximum)
+
+
+class TimerHeap:
+    """Min-heap of (due, kind, key) with O(log n) reschedule/cancel via lazy deletion"""
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, str, Hashable]] = []
+        # (kind, key) -> sequence number of the live heap entry
+        self._live: Dict[Tuple[str, Hashable], int] = {}
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def push(self, kind: str, key: Hashable, due: float) -> None:
+        """Add or reschedule a timer"""
+        seq = next(self._seq)
+        self._live[(kind, key)] = seq
+        heapq.heappush(self._heap, (due, seq, kind, key))
+
+    def cancel(self, kind: str, key: Hashable) -> bool:
+        return self._live.pop((kind, key), None) is not None
+
+    def __contains__(self, item: Tuple[str, Hashable]) -> bool:
+        return item in self._live
+
+    def next_due(self) -> Optional[float]:
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float) -> Dict[str, List[Hashable]]:
+        """Remove every timer due at or before `now`, grouped by kind"""
+        due: Dict[str, List[Hashable]] = {}
+        while self._heap and self._heap[0][0] <= now:
+            _, seq, kind, key = heapq.heappop(self._heap)
+            if self._live.get((kind, key)) != seq:
+                continue
+            del self._live[(kind, key)]
+            due.setdefault(kind, []).append(key)
+        return due
+
+    def _discard_stale(self) -> None:
+        while self._heap:
+            _, seq, kind, key = self._heap[0]
+            if self._live.get((kind, key)) == seq:
+                return
+            heapq.heappop(self._heap)
+
+
+class TimerScheduler:
+    """Zamanlanmış görevleri tek bir heap üzerinden tetikler"""
+
+    def __init__(self):
+        self._timers = TimerHeap()
+        self._handlers: Dict[str, Handler] = {}
+        self._loaders: Dict[str, Loader] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def started(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def register(self, kind: str, handler: Handler, loader: Optional[Loader] = None) -> None:
+        """Register a timer kind; if already running, its pending timers are loaded now"""
+        self._handlers[kind] = handler
+        if loader:
+            self._loaders[kind] = loader
+            if self.started:
+                asyncio.create_task(self._load(kind, loader))
+
+    def unregister(self, kind: str) -> None:
+        self._handlers.pop(kind, None)
+        self._loaders.pop(kind, None)
+
+    def schedule(self, kind: str, key: Hashable, due: Any) -> None:
+        """Schedule (or reschedule) `key` to fire at `due` (datetime in UTC or unix timestamp)"""
+        self._timers.push(kind, key, to_timestamp(due))
+        self._wakeup.set()
+
+    def cancel(self, kind: str, key: Hashable) -> None:
+        if self._timers.cancel(kind, key):
+            self._wakeup.set()
+
+    def pending(self, kind: str, key: Hashable) -> bool:
+        return (kind, key) in self._timers
+
+    async def start(self) -> None:
+        """Load pending timers from every registered loader and start firing"""
+        if self.started:
+            return
+        await asyncio.gather(*(self._load(kind, loader) for kind, loader in list(self._loaders.items())))
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Timer scheduler started with {len(self._timers)} pending timers.")
+
+    def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _load(self, kind: str, loader: Loader) -> None:
+        try:
+            for key, due in await loader():
+                if due is not None:
+                    self._timers.push(kind, key, to_timestamp(due))
+            self._wakeup.set()
+        except Exception as e:
+            logger.error(f"Failed to load {kind} timers: {e}")
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            next_due = self._timers.next_due()
+            if next_due is None:
+                await self._wakeup.wait()
+                continue
+
+            delay = next_due - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                    # Woken by a new/cancelled timer: re-evaluate the head
+                    continue
+                except asyncio.TimeoutError:
+                    pass
+
+            for kind, keys in self._timers.pop_due(time.time()).items():
+                asyncio.create_task(self._fire(kind, keys))
+
+    async def _fire(self, kind: str, keys: List[Hashable]) -> None:
+        handler = self._handlers.get(kind)
+        if not handler:
+            logger.warning(f"No handler registered for {kind} timers, dropping {len(keys)}")
+            return
+        try:
+            await handler(keys)
+        except Exception as e:
+            logger.error(f"Timer handler {kind} failed: {e}")
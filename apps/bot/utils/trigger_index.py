@@ -0,0 +1,67 @@
+"""
+Aho–Corasick automaton for matching many auto-responder triggers at once.
+
+Matching is case-insensitive substring search, like the old per-responder
+``trigger.lower() in content.lower()`` check, but one pass over the message
+finds every trigger regardless of how many a guild has configured.
+"""
+from collections import deque
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+
+class TriggerIndex:
+    """Birden çok tetikleyiciyi tek geçişte eşleştirir"""
+
+    def __init__(self, triggers: Iterable[Tuple[str, Hashable]]):
+        # Node 0 is the root; goto[node][char] -> node
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Hashable]] = [[]]
+        self._size = 0
+
+        for trigger, value in triggers:
+            trigger = trigger.casefold()
+            if not trigger:
+                continue
+            node = 0
+            for char in trigger:
+                nxt = self._goto[node].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = nxt
+            self._out[node].append(value)
+            self._size += 1
+
+        self._build_failure_links()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                # Inherit matches that end at the suffix node
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def matches(self, text: str) -> Set[Hashable]:
+        """Values of every trigger that occurs in `text`"""
+        found: Set[Hashable] = set()
+        node = 0
+        for char in text.casefold():
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            if self._out[node]:
+                found.update(self._out[node])
+        return found
@@ -0,0 +1,62 @@
+"""
+Bounded tracker for voice join/leave spam.
+
+Each tracked member gets a fixed-size ring of their last ``threshold`` join
+times, so checking "``threshold`` joins within ``interval`` seconds" is one
+comparison against the oldest slot. Members are kept in a global LRU capped
+at ``max_members``; quiet members fall off the end instead of accumulating
+for the lifetime of the process.
+
+Rings hold at most ``MAX_THRESHOLD`` slots. ``/automod_config`` clamps the
+voice-spam threshold to that range; a larger stored value is treated as
+``MAX_THRESHOLD``.
+"""
+from array import array
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+MAX_THRESHOLD = 32
+
+
+class JoinRing:
+    __slots__ = ("times", "pos", "filled")
+
+    def __init__(self, size: int):
+        self.times = array("d", [0.0]) * size
+        self.pos = 0
+        self.filled = False
+
+    def record(self, now: float) -> Optional[float]:
+        """Store `now`; returns the oldest time still in the ring once it is full, else None"""
+        self.times[self.pos] = now
+        self.pos = (self.pos + 1) % len(self.times)
+        if self.pos == 0:
+            self.filled = True
+        return self.times[self.pos] if self.filled else None
+
+
+class VoiceJoinTracker:
+    """Üye başına son giriş zamanlarını sabit boyutlu halkada tutar"""
+
+    def __init__(self, max_members: int = 20000):
+        self.max_members = max_members
+        self.rings: "OrderedDict[Hashable, JoinRing]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.rings)
+
+    def hit(self, key: Hashable, now: float, threshold: int, interval: float) -> bool:
+        """Record a join; True if it is the `threshold`-th within `interval` seconds"""
+        size = max(1, min(threshold, MAX_THRESHOLD))
+        ring = self.rings.get(key)
+        if ring is None or len(ring.times) != size:
+            ring = self.rings[key] = JoinRing(size)
+            if len(self.rings) > self.max_members:
+                self.rings.popitem(last=False)
+        self.rings.move_to_end(key)
+
+        oldest = ring.record(now)
+        return oldest is not None and now - oldest < interval
+
+    def reset(self, key: Hashable) -> None:
+        self.rings.pop(key, None)
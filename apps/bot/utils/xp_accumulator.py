@@ -0,0 +1,125 @@
+"""
+Write-coalescing XP state for the leveling cog.
+
+Messages only touch memory: each (guild_id, user_id) has one entry holding
+its cooldown, the XP/level last read from the database and whatever was
+earned since. A periodic flush writes every dirty entry in one bulk upsert.
+
+Entries start *unloaded* (only the earned delta is known). The flush reads
+the stored rows for unloaded entries in one query and folds the delta in;
+from then on level-ups are computed straight from memory. The cache is an
+LRU bounded by ``max_entries``; dirty entries are kept past that bound (the
+owner should flush early once ``over_capacity``) and only dropped, with the
+loss logged, when the cache reaches ``hard_limit`` because flushes keep failing.
+"""
+import logging
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("lithium-bot")
+
+
+class XPEntry:
+    __slots__ = ("xp", "level", "pending", "loaded", "dirty", "last_award", "channel_id")
+
+    def __init__(self):
+        self.xp = 0
+        self.level = 0
+        # XP earned while the stored row has not been read yet
+        self.pending = 0
+        self.loaded = False
+        self.dirty = False
+        self.last_award = float("-inf")
+        # Where to announce a level-up discovered during the flush
+        self.channel_id: Optional[int] = None
+
+
+class XPAccumulator:
+    """Kullanıcı başına XP / cooldown önbelleği"""
+
+    def __init__(self, max_entries: int = 50000, cooldown: float = 60, hard_limit: Optional[int] = None):
+        self.max_entries = max_entries
+        self.hard_limit = hard_limit or max_entries * 2
+        self.cooldown = cooldown
+        self._entries: "OrderedDict[Hashable, XPEntry]" = OrderedDict()
+        # Unflushed entries dropped at the hard limit
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def over_capacity(self) -> bool:
+        """Too many unflushed entries to evict: flush now rather than at the next interval"""
+        return len(self._entries) > self.max_entries
+
+    def get(self, key: Hashable) -> Optional[XPEntry]:
+        return self._entries.get(key)
+
+    def award(self, key: Hashable, amount: int, now: float, channel_id: Optional[int] = None) -> Optional[XPEntry]:
+        """Add XP unless the key is on cooldown; returns the entry if XP was added"""
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = XPEntry()
+        else:
+            self._entries.move_to_end(key)
+            if now - entry.last_award < self.cooldown:
+                return None
+
+        entry.last_award = now
+        entry.channel_id = channel_id
+        if entry.loaded:
+            entry.xp += amount
+        else:
+            entry.pending += amount
+        entry.dirty = True
+        self._evict()
+        return entry
+
+    def load(self, key: Hashable, xp: int, level: int) -> Optional[XPEntry]:
+        """Fold the stored row into an unloaded entry"""
+        entry = self._entries.get(key)
+        if entry is None or entry.loaded:
+            return entry
+        entry.xp = xp + entry.pending
+        entry.level = level
+        entry.pending = 0
+        entry.loaded = True
+        return entry
+
+    def unloaded_keys(self) -> List[Hashable]:
+        return [key for key, entry in self._entries.items() if entry.dirty and not entry.loaded]
+
+    def take_dirty(self) -> Dict[Hashable, Tuple[int, int]]:
+        """Snapshot (xp, level) of loaded dirty entries and mark them clean"""
+        snapshot = {}
+        for key, entry in self._entries.items():
+            if entry.dirty and entry.loaded:
+                snapshot[key] = (entry.xp, entry.level)
+                entry.dirty = False
+        return snapshot
+
+    def mark_dirty(self, keys: Iterable[Hashable]) -> None:
+        """Re-queue keys whose write failed"""
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.dirty = True
+
+    def _evict(self) -> None:
+        if len(self._entries) <= self.max_entries:
+            return
+        for key in list(self._entries):
+            if len(self._entries) <= self.max_entries:
+                break
+            if not self._entries[key].dirty:
+                del self._entries[key]
+
+        # Flushes are failing: bound memory by dropping the oldest unflushed entries
+        dropped = 0
+        while len(self._entries) > self.hard_limit:
+            self._entries.popitem(last=False)
+            dropped += 1
+        if dropped:
+            self.dropped += dropped
+            logger.warning(f"XP cache full: dropped {dropped} unflushed entries ({self.dropped} in total)")
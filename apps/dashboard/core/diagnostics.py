@@ -3,6 +3,9 @@ import redis
 import json
 import uuid
 import time
+from lithium_core.utils.bot_status import (
+    GUILD_SHARD_MAP, SHARD_CLUSTER_MAP, BROADCAST_CHANNEL, cluster_commands_channel
+)
 
 def run_guild_diagnostics(guild_id):
     """
@@ -19,8 +22,14 @@ def run_guild_diagnostics(guild_id):
         "action": "DIAGNOSTIC"
     }
     
-    # Broadcast request
-    r.publish("guild_config_changed", json.dumps(payload))
+    # Route to the cluster owning the guild; broadcast if unknown
+    channel = BROADCAST_CHANNEL
+    shard_id = r.hget(GUILD_SHARD_MAP, str(guild_id))
+    if shard_id is not None:
+        cluster_id = r.hget(SHARD_CLUSTER_MAP, shard_id)
+        if cluster_id is not None:
+            channel = cluster_commands_channel(int(cluster_id))
+    r.publish(channel, json.dumps(payload))
     
     # Wait for response in Redis (using a unique key)
     # The bot should write to 'diag_res:{request_id}'
@@ -102,7 +102,7 @@ export default function DashboardPage() {
             es.onmessage = (event) => {
                 try {
                     const data = JSON.parse(event.data);
-                    if (data.type === 'stats_update' && dashboard) {
+                    if (data.type === 'stats_update') {
                         setDashboard(prev => prev ? {
                             ...prev,
                             members: data.data.members || prev.members,
@@ -119,9 +119,11 @@ export default function DashboardPage() {
 
             es.onerror = () => {
                 setIsConnected(false);
-                es.close();
-                // Retry after 5s
-                setTimeout(setupSSE, 5000);
+                // The browser reconnects on its own (sending Last-Event-ID);
+                // only recreate the stream if it was closed for good
+                if (es.readyState === EventSource.CLOSED) {
+                    setTimeout(setupSSE, 5000);
+                }
             };
         } catch (e) {
             console.warn('SSE setup failed:', e);
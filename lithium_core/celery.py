@@ -1,5 +1,7 @@
+import asyncio
 import os
 from celery import Celery
+from celery.schedules import crontab
 
 # Set the default Django settings module for the 'celery' program.
 # We might not need Django for celery if we use lithium_core logic, 
@@ -20,8 +22,34 @@ app.conf.update(
     worker_prefetch_multiplier=1, # One task at a time per worker for long tasks
     task_time_limit=1800, # 30 min hard limit
     task_soft_time_limit=1500, # 25 min soft limit
+    beat_schedule={
+        'maintain-audit-partitions': {
+            'task': 'lithium_core.celery.maintain_audit_partitions',
+            'schedule': crontab(hour=3, minute=0),
+        },
+    },
 )
 
 @app.task
 def debug_task():
     print('Request: Debug Task Executed')
+
+@app.task
+def maintain_audit_partitions():
+    """Create upcoming monthly audit partitions and drop expired ones"""
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    from sqlalchemy.pool import NullPool
+    from lithium_core.database.session import DATABASE_URL
+    from lithium_core.services.partition_service import PartitionService
+
+    async def _run():
+        # asyncio.run() makes a new loop per beat run; pooled connections
+        # from the shared engine would belong to an earlier, closed loop
+        engine = create_async_engine(DATABASE_URL, poolclass=NullPool)
+        try:
+            async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+                return await PartitionService(db).maintain()
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(_run())
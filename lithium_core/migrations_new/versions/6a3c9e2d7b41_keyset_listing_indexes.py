@@ -0,0 +1,85 @@
+"""keyset_listing_indexes
+
+Revision ID: 6a3c9e2d7b41
+Revises: 5f2a8c1b9d3e
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a3c9e2d7b41'
+down_revision: Union[str, None] = '5f2a8c1b9d3e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Dashboard listings paginated by (created_at, id)
+COUNTED_TABLES = ['audit_logs', 'moderation_cases', 'tickets']
+
+
+def upgrade() -> None:
+    """Keyset pagination indexes and per-guild row counters for dashboard listings"""
+    for table in COUNTED_TABLES:
+        op.create_index(
+            f'ix_{table}_guild_keyset',
+            table,
+            ['guild_id', sa.text('created_at DESC'), sa.text('id DESC')],
+            unique=False
+        )
+
+    # Approximate totals without COUNT(*) over millions of rows
+    op.create_table(
+        'listing_counters',
+        sa.Column('guild_id', sa.String(), nullable=False),
+        sa.Column('table_name', sa.String(length=50), nullable=False),
+        sa.Column('row_count', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('guild_id', 'table_name')
+    )
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_listing_counter() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO listing_counters (guild_id, table_name, row_count)
+                VALUES (NEW.guild_id, TG_TABLE_NAME, 1)
+                ON CONFLICT (guild_id, table_name)
+                DO UPDATE SET row_count = listing_counters.row_count + 1;
+                RETURN NEW;
+            ELSIF TG_OP = 'DELETE' THEN
+                UPDATE listing_counters SET row_count = GREATEST(row_count - 1, 0)
+                WHERE guild_id = OLD.guild_id AND table_name = TG_TABLE_NAME;
+                RETURN OLD;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    for table in COUNTED_TABLES:
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_listing_counter
+            AFTER INSERT OR DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION bump_listing_counter();
+        """)
+        op.execute(f"""
+            INSERT INTO listing_counters (guild_id, table_name, row_count)
+            SELECT guild_id, '{table}', COUNT(*) FROM {table}
+            WHERE guild_id IS NOT NULL
+            GROUP BY guild_id
+        """)
+
+
+def downgrade() -> None:
+    """Drop counters, triggers and keyset indexes"""
+    for table in COUNTED_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_listing_counter ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS bump_listing_counter()")
+    op.drop_table('listing_counters')
+
+    for table in COUNTED_TABLES:
+        op.drop_index(f'ix_{table}_guild_keyset', table_name=table)
@@ -0,0 +1,179 @@
+"""audit_composite_indexes_partitioning
+
+Revision ID: 7c4d1f8e2a93
+Revises: 6a3c9e2d7b41
+Create Date: 2026-10-19 10:00:00.000000
+
+Composite (guild_id, created_at) indexes for dashboard listings/analytics and
+optional monthly range partitioning of audit_logs and audit_events.
+
+Partitioning rewrites both tables, so it only runs when requested:
+
+    alembic -x partition_audit=true upgrade head
+
+Partitions are kept up to date by the `maintain_audit_partitions` Celery beat
+task (see lithium_core/services/partition_service.py).
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c4d1f8e2a93'
+down_revision: Union[str, None] = '6a3c9e2d7b41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+PARTITIONED_TABLES = ['audit_logs', 'audit_events']
+
+
+def upgrade() -> None:
+    # ========================================
+    # Composite Indexes
+    # moderation_cases / audit_logs (guild_id, created_at DESC) are covered by
+    # the keyset indexes from 6a3c9e2d7b41
+    # ========================================
+    op.create_index(
+        'ix_audit_logs_guild_action_created',
+        'audit_logs',
+        ['guild_id', 'action', 'created_at']
+    )
+    op.create_index(
+        'ix_mod_cases_guild_created',
+        'mod_cases',
+        ['guild_id', sa.text('created_at DESC')]
+    )
+    op.create_index(
+        'ix_audit_events_guild_created',
+        'audit_events',
+        ['guild_id', sa.text('created_at DESC')]
+    )
+    # Superseded ascending variants
+    op.execute("DROP INDEX IF EXISTS idx_cases_guild")
+    op.execute("DROP INDEX IF EXISTS idx_audit_guild")
+
+    # ========================================
+    # Partition Maintenance Functions
+    # No-ops for tables that are not partitioned
+    # ========================================
+    op.execute(r"""
+        CREATE OR REPLACE FUNCTION ensure_monthly_partitions(
+            parent text, months_ahead int DEFAULT 2, since date DEFAULT NULL
+        ) RETURNS int AS $$
+        DECLARE
+            part_start date := date_trunc('month', COALESCE(since, now()::date))::date;
+            last_start date := (date_trunc('month', now()) + make_interval(months => months_ahead))::date;
+            part_name text;
+            created int := 0;
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_partitioned_table pt
+                JOIN pg_class c ON c.oid = pt.partrelid
+                WHERE c.relname = parent
+            ) THEN
+                RETURN 0;
+            END IF;
+
+            WHILE part_start <= last_start LOOP
+                part_name := format('%s_%s', parent, to_char(part_start, 'YYYY_MM'));
+                IF to_regclass(part_name) IS NULL THEN
+                    EXECUTE format(
+                        'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                        part_name, parent, part_start, (part_start + interval '1 month')::date
+                    );
+                    created := created + 1;
+                END IF;
+                part_start := (part_start + interval '1 month')::date;
+            END LOOP;
+            RETURN created;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    op.execute(r"""
+        CREATE OR REPLACE FUNCTION drop_expired_partitions(parent text, retention_days int)
+        RETURNS int AS $$
+        DECLARE
+            part record;
+            cutoff date := (now() - make_interval(days => retention_days))::date;
+            dropped int := 0;
+        BEGIN
+            FOR part IN
+                SELECT c.relname FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                JOIN pg_class p ON p.oid = i.inhparent
+                WHERE p.relname = parent
+                  AND c.relname ~ ('^' || parent || '_\d{4}_\d{2}$')
+            LOOP
+                -- A partition covers [month, month + 1); drop it once fully past retention
+                IF (to_date(right(part.relname, 7), 'YYYY_MM') + interval '1 month')::date <= cutoff THEN
+                    EXECUTE format('DROP TABLE %I', part.relname);
+                    dropped := dropped + 1;
+                END IF;
+            END LOOP;
+            RETURN dropped;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    if context.get_x_argument(as_dictionary=True).get('partition_audit', '').lower() in ('1', 'true', 'yes'):
+        for table in PARTITIONED_TABLES:
+            _partition_by_month(table)
+
+
+def _partition_by_month(table: str) -> None:
+    """Swap `table` for a copy range-partitioned by month on created_at"""
+    conn = op.get_bind()
+    legacy = f'{table}_legacy'
+
+    # Secondary indexes to recreate on the partitioned parent
+    index_defs = conn.execute(
+        sa.text("SELECT indexdef FROM pg_indexes WHERE tablename = :t AND indexname NOT LIKE '%pkey'"),
+        {"t": table}
+    ).scalars().all()
+    has_counter_trigger = conn.execute(
+        sa.text("SELECT 1 FROM pg_trigger WHERE tgname = :name"),
+        {"name": f'trg_{table}_listing_counter'}
+    ).scalar() is not None
+    id_seq = conn.execute(
+        sa.text("SELECT pg_get_serial_sequence(:t, 'id')"), {"t": table}
+    ).scalar()
+
+    op.execute(f"UPDATE {table} SET created_at = now() WHERE created_at IS NULL")
+    op.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+    op.execute(f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)")
+    op.execute(f"ALTER TABLE {table} ALTER COLUMN created_at SET NOT NULL")
+    op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id, created_at)")
+    op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+    op.execute(f"SELECT ensure_monthly_partitions('{table}', 2, (SELECT MIN(created_at)::date FROM {legacy}))")
+    op.execute(f"INSERT INTO {table} SELECT * FROM {legacy}")
+    if id_seq:
+        op.execute(f"ALTER SEQUENCE {id_seq} OWNED BY {table}.id")
+    op.execute(f"DROP TABLE {legacy}")
+
+    for index_def in index_defs:
+        op.execute(index_def)
+    if has_counter_trigger:
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_listing_counter
+            AFTER INSERT OR DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION bump_listing_counter();
+        """)
+
+
+def downgrade() -> None:
+    """
+    Drop the composite indexes and maintenance functions.
+    Partitioned tables are left in place; they behave like plain tables for queries.
+    """
+    op.execute("DROP FUNCTION IF EXISTS drop_expired_partitions(text, int)")
+    op.execute("DROP FUNCTION IF EXISTS ensure_monthly_partitions(text, int, date)")
+
+    op.create_index('idx_audit_guild', 'audit_events', ['guild_id', 'created_at'])
+    op.create_index('idx_cases_guild', 'mod_cases', ['guild_id', 'created_at'])
+    op.drop_index('ix_audit_events_guild_created', table_name='audit_events')
+    op.drop_index('ix_mod_cases_guild_created', table_name='mod_cases')
+    op.drop_index('ix_audit_logs_guild_action_created', table_name='audit_logs')
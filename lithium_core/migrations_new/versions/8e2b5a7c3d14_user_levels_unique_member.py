@@ -0,0 +1,45 @@
+"""user_levels_unique_member
+
+Revision ID: 8e2b5a7c3d14
+Revises: 7c4d1f8e2a93
+Create Date: 2026-10-19 11:00:00.000000
+
+One row per (guild_id, user_id) so the leveling cog can flush XP with
+INSERT ... ON CONFLICT. Where a member has duplicate rows, only the one with
+the highest level/XP is kept; the others are deleted (XP is not summed).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e2b5a7c3d14'
+down_revision: Union[str, None] = '7c4d1f8e2a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    constraints = {c['name'] for c in inspector.get_unique_constraints('user_levels')}
+    if 'uq_user_levels_guild_user' not in constraints:
+        # Keep the highest row per member before adding the constraint
+        op.execute("""
+            DELETE FROM user_levels a
+            USING user_levels b
+            WHERE a.guild_id = b.guild_id
+              AND a.user_id = b.user_id
+              AND (a.level, a.xp, a.id) < (b.level, b.xp, b.id)
+        """)
+        op.create_unique_constraint(
+            'uq_user_levels_guild_user',
+            'user_levels',
+            ['guild_id', 'user_id']
+        )
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE IF EXISTS user_levels DROP CONSTRAINT IF EXISTS uq_user_levels_guild_user")
@@ -0,0 +1,49 @@
+"""user_levels_total_xp
+
+Revision ID: 9a4c6e1f2b58
+Revises: 8e2b5a7c3d14
+Create Date: 2026-10-19 12:00:00.000000
+
+Adds user_levels.total_xp, the total XP ever earned; the level is derived
+from it. ``xp`` keeps its old meaning (progress within the current level),
+so a bot started before or after this migration never misreads a row.
+Existing rows are backfilled with xp plus the XP for all completed levels:
+
+    sum(5n² + 50n + 100 for n < level)
+
+Only NULL totals are filled, so running it again does not add anything twice.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4c6e1f2b58'
+down_revision: Union[str, None] = '8e2b5a7c3d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Closed form of the cumulative threshold in apps/bot/utils/level_math.py
+# (tests/unit/test_level_math.py checks it against LevelCurve)
+BACKFILL_TOTAL_XP = """
+    UPDATE user_levels
+    SET total_xp = xp + (5 * (level - 1) * level * (2 * level - 1)) / 6
+                      + 25 * level * (level - 1)
+                      + 100 * level
+    WHERE total_xp IS NULL
+"""
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    columns = {c['name'] for c in inspector.get_columns('user_levels')}
+    if 'total_xp' not in columns:
+        op.add_column('user_levels', sa.Column('total_xp', sa.BigInteger(), nullable=True))
+    op.execute(BACKFILL_TOTAL_XP)
+
+
+def downgrade() -> None:
+    op.drop_column('user_levels', 'total_xp')
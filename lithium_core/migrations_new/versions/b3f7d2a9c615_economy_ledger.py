@@ -0,0 +1,83 @@
+"""economy_ledger
+
+Revision ID: b3f7d2a9c615
+Revises: 9a4c6e1f2b58
+Create Date: 2026-10-19 13:00:00.000000
+
+Unique (guild_id, user_id) on economy_profiles so balance changes can upsert,
+and the append-only economy_transactions ledger.
+
+Both tables may already have been created by the bot's schema sync, so each
+step checks what exists first.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f7d2a9c615'
+down_revision: Union[str, None] = '9a4c6e1f2b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    if inspector.has_table('economy_profiles'):
+        constraints = {c['name'] for c in inspector.get_unique_constraints('economy_profiles')}
+        if 'uq_economy_profiles_guild_user' not in constraints:
+            # Merge duplicate profiles into the oldest row before adding the constraint
+            op.execute("""
+                UPDATE economy_profiles keep
+                SET balance = merged.balance,
+                    daily_streak = merged.daily_streak,
+                    last_daily = merged.last_daily
+                FROM (
+                    SELECT guild_id, user_id, MIN(id) AS id, SUM(balance) AS balance,
+                           MAX(daily_streak) AS daily_streak, MAX(last_daily) AS last_daily
+                    FROM economy_profiles
+                    GROUP BY guild_id, user_id
+                    HAVING COUNT(*) > 1
+                ) merged
+                WHERE keep.id = merged.id
+            """)
+            op.execute("""
+                DELETE FROM economy_profiles a
+                USING economy_profiles b
+                WHERE a.guild_id = b.guild_id
+                  AND a.user_id = b.user_id
+                  AND a.id > b.id
+            """)
+            op.create_unique_constraint(
+                'uq_economy_profiles_guild_user',
+                'economy_profiles',
+                ['guild_id', 'user_id']
+            )
+
+    if not inspector.has_table('economy_transactions'):
+        op.create_table(
+            'economy_transactions',
+            sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column('guild_id', sa.String(), nullable=False),
+            sa.Column('user_id', sa.String(), nullable=False),
+            sa.Column('amount', sa.Float(), nullable=False),
+            sa.Column('balance_after', sa.Float(), nullable=False),
+            sa.Column('reason', sa.String(length=50), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
+            sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(
+            'ix_economy_transactions_member',
+            'economy_transactions',
+            ['guild_id', 'user_id', 'created_at']
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_economy_transactions_member', table_name='economy_transactions')
+    op.drop_table('economy_transactions')
+    op.execute("ALTER TABLE IF EXISTS economy_profiles DROP CONSTRAINT IF EXISTS uq_economy_profiles_guild_user")
@@ -0,0 +1,34 @@
+"""birthday_config_timezone
+
+Revision ID: c5e8a1d4f7b2
+Revises: b3f7d2a9c615
+Create Date: 2026-10-19 15:00:00.000000
+
+Per-guild IANA timezone for birthday announcements (NULL means UTC).
+The table may have been created by the bot's schema sync, so the column
+is only added when missing.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e8a1d4f7b2'
+down_revision: Union[str, None] = 'b3f7d2a9c615'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('birthday_configs'):
+        return
+    columns = {c['name'] for c in inspector.get_columns('birthday_configs')}
+    if 'timezone' not in columns:
+        op.add_column('birthday_configs', sa.Column('timezone', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE IF EXISTS birthday_configs DROP COLUMN IF EXISTS timezone")
@@ -0,0 +1,50 @@
+"""scheduled_messages_next_run
+
+Revision ID: d2a7f4c9e816
+Revises: c5e8a1d4f7b2
+Create Date: 2026-10-19 16:00:00.000000
+
+next_run_at on scheduled_messages with a partial index over enabled rows.
+One-off posts are backfilled from run_at; the bot computes cron rows the
+first time it loads them.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a7f4c9e816'
+down_revision: Union[str, None] = 'c5e8a1d4f7b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('scheduled_messages'):
+        return
+
+    columns = {c['name'] for c in inspector.get_columns('scheduled_messages')}
+    if 'next_run_at' not in columns:
+        op.add_column('scheduled_messages', sa.Column('next_run_at', sa.DateTime(), nullable=True))
+        op.execute("""
+            UPDATE scheduled_messages
+            SET next_run_at = run_at
+            WHERE enabled AND cron IS NULL AND run_at IS NOT NULL
+        """)
+
+    indexes = {i['name'] for i in inspector.get_indexes('scheduled_messages')}
+    if 'ix_scheduled_messages_next_run' not in indexes:
+        op.create_index(
+            'ix_scheduled_messages_next_run',
+            'scheduled_messages',
+            ['next_run_at'],
+            postgresql_where=sa.text('enabled')
+        )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_scheduled_messages_next_run")
+    op.execute("ALTER TABLE IF EXISTS scheduled_messages DROP COLUMN IF EXISTS next_run_at")
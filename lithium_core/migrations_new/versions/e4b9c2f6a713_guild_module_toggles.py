@@ -0,0 +1,43 @@
+"""guild_module_toggles
+
+Revision ID: e4b9c2f6a713
+Revises: d2a7f4c9e816
+Create Date: 2026-10-19 18:00:00.000000
+
+Per-guild module toggles on guilds, as read by the bot cogs and flipped by
+the dashboard's toggle_module view. Every toggle starts off.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b9c2f6a713'
+down_revision: Union[str, None] = 'd2a7f4c9e816'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TOGGLES = (
+    'afk_enabled',
+    'auto_responder_enabled',
+    'sticky_messages_enabled',
+    'starboard_enabled',
+    'custom_commands_enabled',
+    'automod_enabled',
+    'quarantine_enabled',
+)
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    columns = {c['name'] for c in inspector.get_columns('guilds')}
+    for name in TOGGLES:
+        if name not in columns:
+            op.add_column('guilds', sa.Column(name, sa.Boolean(), nullable=False, server_default=sa.false()))
+
+
+def downgrade() -> None:
+    for name in reversed(TOGGLES):
+        op.execute(f"ALTER TABLE IF EXISTS guilds DROP COLUMN IF EXISTS {name}")
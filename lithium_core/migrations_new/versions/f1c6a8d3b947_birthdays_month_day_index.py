@@ -0,0 +1,33 @@
+"""birthdays_month_day_index
+
+Revision ID: f1c6a8d3b947
+Revises: e4b9c2f6a713
+Create Date: 2026-10-19 19:00:00.000000
+
+The midnight birthday check looks rows up by (month, day) across every guild.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c6a8d3b947'
+down_revision: Union[str, None] = 'e4b9c2f6a713'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('birthdays'):
+        return
+
+    indexes = {i['name'] for i in inspector.get_indexes('birthdays')}
+    if 'ix_birthdays_month_day' not in indexes:
+        op.create_index('ix_birthdays_month_day', 'birthdays', ['month', 'day'])
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_birthdays_month_day")
@@ -13,7 +13,7 @@ from .advanced import (
 from .raid import QuarantineConfig, QuarantineLog
 from .social import ReactionRoleMenu
 from .embeds import EmbedConfig, WelcomeConfig
-from .economy import EconomyProfile
+from .economy import EconomyProfile, EconomyTransaction
 from .tickets import TicketConfig
 from .fun import (
     Giveaway, Birthday, BirthdayConfig, 
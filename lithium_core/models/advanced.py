@@ -1,4 +1,4 @@
-from sqlalchemy import String, Integer, ForeignKey, Text, JSON, Boolean, DateTime
+from sqlalchemy import String, Integer, ForeignKey, Text, JSON, Boolean, DateTime, Index, text
 from sqlalchemy.orm import Mapped, mapped_column
 from .base import Base, TimestampMixin
 from typing import Optional
@@ -14,6 +14,10 @@ class CommandPermission(Base, TimestampMixin):
 
 class AuditLog(Base, TimestampMixin):
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        Index("ix_audit_logs_guild_keyset", "guild_id", text("created_at DESC"), text("id DESC")),
+        Index("ix_audit_logs_guild_action_created", "guild_id", "action", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     guild_id: Mapped[str] = mapped_column(String, index=True)
@@ -17,6 +17,15 @@ class Guild(Base, TimestampMixin):
     discord_id: Mapped[str] = mapped_column(String, unique=True, index=True)
     name: Mapped[str] = mapped_column(String)
     owner_id: Mapped[str] = mapped_column(String)
+
+    # Module toggles (dashboard toggle_module flips `{module}_enabled`); off until enabled
+    afk_enabled: Mapped[bool] = mapped_column(Boolean, default=False, server_default="false")
+    auto_responder_enabled: Mapped[bool] = mapped_column(Boolean, default=False, server_default="false")
+    sticky_messages_enabled: Mapped[bool] = mapped_column(Boolean, default=False, server_default="false")
+    starboard_enabled: Mapped[bool] = mapped_column(Boolean, default=False, server_default="false")
+    custom_commands_enabled: Mapped[bool] = mapped_column(Boolean, default=False, server_default="false")
+    automod_enabled: Mapped[bool] = mapped_column(Boolean, default=False, server_default="false")
+    quarantine_enabled: Mapped[bool] = mapped_column(Boolean, default=False, server_default="false")
     
     # Module configs will link here
 
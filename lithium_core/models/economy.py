@@ -1,11 +1,14 @@
-from sqlalchemy import String, Integer, Float, DateTime
+from sqlalchemy import String, Integer, Float, DateTime, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 from .base import Base, TimestampMixin
 from datetime import datetime
 
 class EconomyProfile(Base, TimestampMixin):
     __tablename__ = "economy_profiles"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        UniqueConstraint("guild_id", "user_id", name="uq_economy_profiles_guild_user"),
+        {'extend_existing': True}
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     guild_id: Mapped[str] = mapped_column(String, index=True)
@@ -14,3 +17,18 @@ class EconomyProfile(Base, TimestampMixin):
     balance: Mapped[float] = mapped_column(Float, default=0.0)
     daily_streak: Mapped[int] = mapped_column(Integer, default=0)
     last_daily: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+
+class EconomyTransaction(Base, TimestampMixin):
+    """Append-only ledger of balance changes"""
+    __tablename__ = "economy_transactions"
+    __table_args__ = (
+        Index("ix_economy_transactions_member", "guild_id", "user_id", "created_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    guild_id: Mapped[str] = mapped_column(String)
+    user_id: Mapped[str] = mapped_column(String)
+
+    amount: Mapped[float] = mapped_column(Float)
+    balance_after: Mapped[float] = mapped_column(Float)
+    reason: Mapped[str] = mapped_column(String(50))
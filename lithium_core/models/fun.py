@@ -2,7 +2,7 @@
 Fun & Entertainment Models
 - Giveaways, Birthdays, Mini Games, Suggestions
 """
-from sqlalchemy import String, Integer, Text, Boolean, DateTime, JSON
+from sqlalchemy import String, Integer, Text, Boolean, DateTime, JSON, Index
 from sqlalchemy.orm import Mapped, mapped_column
 from .base import Base, TimestampMixin
 from typing import Optional, List
@@ -29,6 +29,10 @@ class Giveaway(Base, TimestampMixin):
 class Birthday(Base, TimestampMixin):
     """Doğum günü kayıtları"""
     __tablename__ = "birthdays"
+    __table_args__ = (
+        # The midnight check matches (month, day) across every guild
+        Index("ix_birthdays_month_day", "month", "day"),
+    )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     guild_id: Mapped[str] = mapped_column(String, index=True)
@@ -46,6 +50,7 @@ class BirthdayConfig(Base, TimestampMixin):
     channel_id: Mapped[str] = mapped_column(String)
     message_template: Mapped[str] = mapped_column(Text, default="🎂 Bugün {user}'in doğum günü! İyi ki doğdun! 🎉")
     role_id: Mapped[Optional[str]] = mapped_column(String, nullable=True)  # Birthday role
+    timezone: Mapped[Optional[str]] = mapped_column(String, nullable=True, default="UTC")  # IANA name
 
 
 class Suggestion(Base, TimestampMixin):
@@ -1,7 +1,7 @@
 """
 Governance Models - Bot Autocracy Core
 """
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Text, ForeignKey, BigInteger, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Text, ForeignKey, BigInteger, Index, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -251,6 +251,10 @@ class ModCase(Base):
     # Relationships
     evidence = relationship("Evidence", back_populates="case", lazy="dynamic")
     tickets = relationship("TicketV2", back_populates="related_case", lazy="dynamic")
+    
+    __table_args__ = (
+        Index("ix_mod_cases_guild_created", "guild_id", created_at.desc()),
+    )
 
 
 # ==================== EVIDENCE ====================
@@ -466,3 +470,7 @@ class AuditEvent(Base):
     ticket_id = Column(BigInteger)
     
     created_at = Column(DateTime, server_default=func.now(), index=True)
+    
+    __table_args__ = (
+        Index("ix_audit_events_guild_created", "guild_id", created_at.desc()),
+    )
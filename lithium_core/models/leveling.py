@@ -1,16 +1,23 @@
-from sqlalchemy import String, Integer, ForeignKey, Boolean
+from typing import Optional
+from sqlalchemy import String, Integer, BigInteger, ForeignKey, Boolean, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .base import Base, TimestampMixin
 
 class UserLevel(Base, TimestampMixin):
     __tablename__ = "user_levels"
+    __table_args__ = (
+        UniqueConstraint("guild_id", "user_id", name="uq_user_levels_guild_user"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     guild_id: Mapped[str] = mapped_column(String, index=True)
     user_id: Mapped[str] = mapped_column(String, index=True)
     
+    # XP into the current level
     xp: Mapped[int] = mapped_column(Integer, default=0)
     level: Mapped[int] = mapped_column(Integer, default=0)
+    # Total XP ever earned; level is derived from it (apps/bot/utils/level_math.py)
+    total_xp: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
     
 class LevelingConfig(Base, TimestampMixin):
     __tablename__ = "leveling_configs"
@@ -1,9 +1,12 @@
-from sqlalchemy import String, Integer, ForeignKey, Text, Boolean
+from sqlalchemy import String, Integer, ForeignKey, Text, Boolean, Index, text
 from sqlalchemy.orm import Mapped, mapped_column
 from .base import Base, TimestampMixin
 
 class ModerationCase(Base, TimestampMixin):
     __tablename__ = "moderation_cases"
+    __table_args__ = (
+        Index("ix_moderation_cases_guild_keyset", "guild_id", text("created_at DESC"), text("id DESC")),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     guild_id: Mapped[str] = mapped_column(String, index=True)
@@ -1,9 +1,12 @@
-from sqlalchemy import String, Integer, ForeignKey, Text, Boolean, JSON
+from sqlalchemy import String, Integer, ForeignKey, Text, Boolean, JSON, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .base import Base, TimestampMixin
 
 class Ticket(Base, TimestampMixin):
     __tablename__ = "tickets"
+    __table_args__ = (
+        Index("ix_tickets_guild_keyset", "guild_id", text("created_at DESC"), text("id DESC")),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     guild_id: Mapped[str] = mapped_column(String, index=True)
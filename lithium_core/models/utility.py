@@ -1,4 +1,4 @@
-from sqlalchemy import String, Integer, ForeignKey, Text, JSON, Boolean, DateTime
+from sqlalchemy import String, Integer, ForeignKey, Text, JSON, Boolean, DateTime, Index, text
 from sqlalchemy.orm import Mapped, mapped_column
 from .base import Base, TimestampMixin
 from typing import Optional
@@ -6,6 +6,10 @@ from datetime import datetime
 
 class ScheduledMessage(Base, TimestampMixin):
     __tablename__ = "scheduled_messages"
+    __table_args__ = (
+        # Due-row lookups only touch enabled posts
+        Index("ix_scheduled_messages_next_run", "next_run_at", postgresql_where=text("enabled")),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     guild_id: Mapped[str] = mapped_column(String, index=True)
@@ -14,6 +18,8 @@ class ScheduledMessage(Base, TimestampMixin):
     content: Mapped[str] = mapped_column(Text)
     cron: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     run_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    # Next due time: run_at for one-off posts, the next cron slot otherwise
+    next_run_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     
     last_run_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     enabled: Mapped[bool] = mapped_column(Boolean, default=True)
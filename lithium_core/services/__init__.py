@@ -5,10 +5,14 @@ from .policy_service import PolicyService
 from .risk_service import RiskService
 from .case_service import CaseService
 from .governance_service import GovernanceService
+from .partition_service import PartitionService
+from .economy_service import EconomyService
 
 __all__ = [
     "PolicyService",
     "RiskService", 
     "CaseService",
-    "GovernanceService"
+    "GovernanceService",
+    "PartitionService",
+    "EconomyService"
 ]
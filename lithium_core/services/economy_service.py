@@ -0,0 +1,139 @@
+"""
+Economy Service - Atomic balance changes with an append-only ledger
+"""
+from typing import Optional, Tuple
+from sqlalchemy import select, update, case, and_, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from lithium_core.models.economy import EconomyProfile, EconomyTransaction
+from datetime import datetime, timedelta
+import logging
+
+logger = logging.getLogger("lithium-bot")
+
+
+class EconomyService:
+    """
+    Bakiye değişiklikleri tek bir UPDATE ... RETURNING ile yapılır;
+    okuma-değiştirme-yazma yok, eşzamanlı işlemler birbirini ezemez.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_balance(self, guild_id: str, user_id: str) -> float:
+        balance = await self.db.scalar(
+            select(EconomyProfile.balance).where(
+                EconomyProfile.guild_id == guild_id,
+                EconomyProfile.user_id == user_id
+            )
+        )
+        return balance or 0.0
+
+    async def apply(
+        self,
+        guild_id: str,
+        user_id: str,
+        delta: float,
+        reason: str,
+        min_balance: Optional[float] = None,
+        commit: bool = True
+    ) -> Optional[float]:
+        """
+        Bakiyeye `delta` ekle ve deftere yaz. Yeni bakiyeyi döner; bakiye
+        `min_balance`'ın altındaysa hiçbir şey değişmez ve None döner.
+        Negatif delta için varsayılan `min_balance` = -delta (eksiye düşmez).
+        """
+        if min_balance is None and delta < 0:
+            min_balance = -delta
+
+        now = datetime.utcnow()
+        if min_balance is None:
+            # Unconditional credit: create the profile if needed
+            stmt = insert(EconomyProfile).values(
+                guild_id=guild_id, user_id=user_id, balance=delta,
+                daily_streak=0, created_at=now, updated_at=now
+            )
+            stmt = stmt.on_conflict_do_update(
+                constraint="uq_economy_profiles_guild_user",
+                set_={"balance": EconomyProfile.balance + delta, "updated_at": now}
+            ).returning(EconomyProfile.balance)
+        else:
+            stmt = (
+                update(EconomyProfile)
+                .where(
+                    EconomyProfile.guild_id == guild_id,
+                    EconomyProfile.user_id == user_id,
+                    EconomyProfile.balance >= min_balance
+                )
+                .values(balance=EconomyProfile.balance + delta, updated_at=now)
+                .returning(EconomyProfile.balance)
+            )
+
+        balance = await self.db.scalar(stmt)
+        if balance is None:
+            await self.db.rollback()
+            return None
+
+        self.db.add(EconomyTransaction(
+            guild_id=guild_id, user_id=user_id,
+            amount=delta, balance_after=balance, reason=reason
+        ))
+        if commit:
+            await self.db.commit()
+        return balance
+
+    async def claim_daily(
+        self,
+        guild_id: str,
+        user_id: str,
+        reward: float,
+        cooldown: timedelta = timedelta(hours=24)
+    ) -> Tuple[Optional[float], Optional[datetime]]:
+        """
+        Günlük ödülü atomik olarak ver. (yeni bakiye, None) ya da
+        cooldown dolmadıysa (None, son alım zamanı) döner.
+        """
+        now = datetime.utcnow()
+        await self.db.execute(
+            insert(EconomyProfile).values(
+                guild_id=guild_id, user_id=user_id, balance=0,
+                daily_streak=0, created_at=now, updated_at=now
+            ).on_conflict_do_nothing(constraint="uq_economy_profiles_guild_user")
+        )
+        balance = await self.db.scalar(
+            update(EconomyProfile)
+            .where(
+                EconomyProfile.guild_id == guild_id,
+                EconomyProfile.user_id == user_id,
+                or_(EconomyProfile.last_daily == None, EconomyProfile.last_daily <= now - cooldown)
+            )
+            .values(
+                balance=EconomyProfile.balance + reward,
+                # Streak continues if the previous claim was within two cooldowns
+                daily_streak=case(
+                    (and_(EconomyProfile.last_daily != None, EconomyProfile.last_daily > now - 2 * cooldown),
+                     EconomyProfile.daily_streak + 1),
+                    else_=1
+                ),
+                last_daily=now,
+                updated_at=now
+            )
+            .returning(EconomyProfile.balance)
+        )
+        if balance is None:
+            last_daily = await self.db.scalar(
+                select(EconomyProfile.last_daily).where(
+                    EconomyProfile.guild_id == guild_id,
+                    EconomyProfile.user_id == user_id
+                )
+            )
+            await self.db.rollback()
+            return None, last_daily
+
+        self.db.add(EconomyTransaction(
+            guild_id=guild_id, user_id=user_id,
+            amount=reward, balance_after=balance, reason="daily"
+        ))
+        await self.db.commit()
+        return balance, None
@@ -141,12 +141,23 @@ class GovernanceService:
         
         return True
     
-    async def check_expired_lockdowns(self):
-        """Süresi dolan lockdown'ları kaldır"""
+    async def get_pending_lockdowns(self) -> List[tuple]:
+        """Aktif lockdown'ların (guild_id, bitiş zamanı) listesi"""
+        stmt = select(GovernanceConfig.guild_id, GovernanceConfig.lockdown_expires_at).where(
+            GovernanceConfig.lockdown_active == True,
+            GovernanceConfig.lockdown_expires_at != None
+        )
+        result = await self.db.execute(stmt)
+        return result.all()
+    
+    async def check_expired_lockdowns(self, guild_ids: Optional[List[str]] = None):
+        """Süresi dolan lockdown'ları kaldır (guild_ids verilirse yalnızca onlarınkini)"""
         stmt = select(GovernanceConfig).where(
             GovernanceConfig.lockdown_active == True,
             GovernanceConfig.lockdown_expires_at <= datetime.utcnow()
         )
+        if guild_ids is not None:
+            stmt = stmt.where(GovernanceConfig.guild_id.in_(guild_ids))
         result = await self.db.execute(stmt)
         configs = result.scalars().all()
         
@@ -0,0 +1,49 @@
+"""
+Partition Service - Monthly partition maintenance for audit tables
+"""
+from typing import Dict, Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+import logging
+import os
+
+logger = logging.getLogger("lithium-bot")
+
+# Tables that may be range-partitioned by month on created_at
+PARTITIONED_TABLES = ("audit_logs", "audit_events")
+
+
+class PartitionService:
+    """Audit tabloları için aylık partition bakımı"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def maintain(
+        self,
+        months_ahead: int = 2,
+        retention_days: Optional[int] = None
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Gelecek aylar için partition oluştur, retention süresini aşanları düşür.
+        Partition'lanmamış tablolarda SQL fonksiyonları hiçbir şey yapmaz.
+        """
+        if retention_days is None:
+            retention_days = int(os.getenv("AUDIT_RETENTION_DAYS", "365"))
+
+        report = {}
+        for table in PARTITIONED_TABLES:
+            created = await self.db.scalar(
+                text("SELECT ensure_monthly_partitions(:parent, :ahead)"),
+                {"parent": table, "ahead": months_ahead}
+            )
+            dropped = await self.db.scalar(
+                text("SELECT drop_expired_partitions(:parent, :days)"),
+                {"parent": table, "days": retention_days}
+            )
+            report[table] = {"created": created or 0, "dropped": dropped or 0}
+            if created or dropped:
+                logger.info(f"Partitions for {table}: +{created} / -{dropped}")
+
+        await self.db.commit()
+        return report
@@ -0,0 +1,46 @@
+"""
+Bot liveness keys shared by the bot and the API.
+
+The bot writes one heartbeat per shard (``bot:heartbeat:shard:{id}``) and a
+``bot:guild_shards`` hash mapping guild ids to their shard. A guild's bot
+status is resolved server-side in a single round-trip.
+
+In cluster mode ``bot:shard_clusters`` maps shards to the cluster process
+running them, so commands for a guild can be sent to that cluster only.
+"""
+from typing import Optional, Union
+
+GUILD_SHARD_MAP = "bot:guild_shards"
+SHARD_CLUSTER_MAP = "bot:shard_clusters"
+# Broadcast channel every bot process listens on
+BROADCAST_CHANNEL = "guild_config_changed"
+HEARTBEAT_TTL = 30
+
+# guild -> shard -> heartbeat timestamp
+GUILD_HEARTBEAT_LUA = """
+local shard = redis.call('HGET', KEYS[1], ARGV[1])
+if not shard then return false end
+return redis.call('GET', 'bot:heartbeat:shard:' .. shard)
+"""
+_heartbeat_script = None
+
+
+def shard_heartbeat_key(shard_id: int) -> str:
+    """Heartbeat key for a single gateway shard"""
+    return f"bot:heartbeat:shard:{shard_id}"
+
+
+def cluster_commands_channel(cluster_id: int) -> str:
+    """Pub/sub channel for commands addressed to one cluster"""
+    return f"cluster:{cluster_id}:commands"
+
+
+async def get_guild_heartbeat(redis, guild_id: Union[int, str]) -> Optional[float]:
+    """Last heartbeat (unix timestamp) of the shard serving a guild, or None if offline"""
+    global _heartbeat_script
+    if _heartbeat_script is None:
+        _heartbeat_script = redis.register_script(GUILD_HEARTBEAT_LUA)
+    raw = await _heartbeat_script(keys=[GUILD_SHARD_MAP], args=[str(guild_id)], client=redis)
+    if not raw:
+        return None
+    return float(raw.decode() if isinstance(raw, bytes) else raw)
@@ -0,0 +1,44 @@
+"""
+Per-guild realtime events.
+
+The bot publishes dashboard events (stats updates, new cases, tickets) to
+``guild:{guild_id}:events``. Each event carries a per-guild monotonically
+increasing id so SSE clients can resume with ``Last-Event-ID``.
+"""
+import json
+from datetime import datetime
+from typing import Any, Dict, Union
+
+# INCR + PUBLISH in one round-trip so events can be queued on a pipeline.
+# ARGV[2] is the JSON body without its opening brace; the id is prepended.
+PUBLISH_LUA = """
+local id = redis.call('INCR', KEYS[1])
+redis.call('PUBLISH', ARGV[1], '{"id":' .. id .. ',' .. ARGV[2])
+return id
+"""
+_publish_script = None
+
+
+def guild_events_channel(guild_id: Union[int, str]) -> str:
+    """Redis pub/sub channel for a guild's dashboard events"""
+    return f"guild:{guild_id}:events"
+
+
+async def publish_guild_event(redis, guild_id: Union[int, str], event_type: str, data: Dict[str, Any]):
+    """
+    Publish an event to the guild channel.
+    `redis` is a redis.asyncio client (returns the event id) or pipeline (queues the event).
+    """
+    body = json.dumps({
+        "type": event_type,
+        "data": data,
+        "ts": datetime.utcnow().isoformat()
+    }, default=str)
+    global _publish_script
+    if _publish_script is None:
+        _publish_script = redis.register_script(PUBLISH_LUA)
+    return await _publish_script(
+        keys=[f"guild:{guild_id}:events:seq"],
+        args=[guild_events_channel(guild_id), body[1:]],
+        client=redis
+    )
@@ -0,0 +1,140 @@
+"""
+Per-guild leaderboards kept in Redis sorted sets.
+
+``lb:{guild_id}:xp`` and ``lb:{guild_id}:balance`` map user ids to their
+score. The write paths (XP flush, balance changes) update members as they
+change, so rank lookups are O(log n) and top-N pages never touch Postgres.
+The sets are rebuilt from Postgres when missing and reconciled hourly to
+correct any drift.
+
+A rebuild swaps in a set built from a Postgres read, which may be older than
+writes that land while it runs. ``begin_rebuild`` is called before the read;
+until the swap every write is also recorded in ``lb:{guild_id}:{board}:pending``
+and replayed onto the new set, so those writes are not lost.
+"""
+from typing import Dict, List, Optional, Tuple, Union
+
+XP_BOARD = "xp"
+BALANCE_BOARD = "balance"
+RECONCILE_SLOTS = 60
+# A rebuild that never finishes stops buffering writes after this many seconds
+REBUILD_BUFFER_TTL = 600
+
+# ZADD/ZREM on the board, also buffered while a rebuild is in progress.
+# ARGV holds member/score pairs; an empty score removes the member.
+WRITE_LUA = """
+local buffering = redis.call('EXISTS', KEYS[2]) == 1
+for i = 1, #ARGV, 2 do
+    if ARGV[i + 1] == '' then
+        redis.call('ZREM', KEYS[1], ARGV[i])
+    else
+        redis.call('ZADD', KEYS[1], ARGV[i + 1], ARGV[i])
+    end
+    if buffering then
+        redis.call('HSET', KEYS[2], ARGV[i], ARGV[i + 1])
+    end
+end
+"""
+# Replay buffered writes onto the rebuilt set, then swap it in.
+# The buffer's '' field is only the marker set by begin_rebuild.
+FINISH_REBUILD_LUA = """
+local buffered = redis.call('HGETALL', KEYS[3])
+for i = 1, #buffered, 2 do
+    local member, score = buffered[i], buffered[i + 1]
+    if member ~= '' then
+        if score == '' then
+            redis.call('ZREM', KEYS[1], member)
+        else
+            redis.call('ZADD', KEYS[1], score, member)
+        end
+    end
+end
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('RENAME', KEYS[1], KEYS[2])
+else
+    redis.call('DEL', KEYS[2])
+end
+redis.call('DEL', KEYS[3])
+"""
+_write_script = None
+_finish_rebuild_script = None
+
+
+def leaderboard_key(guild_id: Union[int, str], board: str) -> str:
+    return f"lb:{guild_id}:{board}"
+
+
+def pending_key(guild_id: Union[int, str], board: str) -> str:
+    return f"{leaderboard_key(guild_id, board)}:pending"
+
+
+def reconcile_slot(guild_id: Union[int, str], slots: int = RECONCILE_SLOTS) -> int:
+    """Slot (e.g. minute of the hour) a guild's leaderboards are reconciled in"""
+    return (int(guild_id) >> 22) % slots
+
+
+async def _write(redis, guild_id: Union[int, str], board: str, args: list):
+    global _write_script
+    if _write_script is None:
+        _write_script = redis.register_script(WRITE_LUA)
+    return await _write_script(
+        keys=[leaderboard_key(guild_id, board), pending_key(guild_id, board)], args=args, client=redis
+    )
+
+
+async def set_scores(redis, guild_id: Union[int, str], board: str, scores: Dict[Union[int, str], float]):
+    """Set absolute scores. `redis` may be a client or a pipeline"""
+    if scores:
+        await _write(redis, guild_id, board, [x for k, v in scores.items() for x in (str(k), v)])
+
+
+async def remove_member(redis, guild_id: Union[int, str], board: str, user_id: Union[int, str]):
+    await _write(redis, guild_id, board, [str(user_id), ""])
+
+
+async def begin_rebuild(redis, guild_id: Union[int, str], board: str):
+    """Start buffering writes; call before reading the scores passed to `rebuild`"""
+    await redis.hset(pending_key(guild_id, board), "", "")
+    await redis.expire(pending_key(guild_id, board), REBUILD_BUFFER_TTL)
+
+
+async def rebuild(redis, guild_id: Union[int, str], board: str, scores: Dict[Union[int, str], float], chunk: int = 5000):
+    """Replace a leaderboard atomically with scores read from Postgres, keeping writes buffered since `begin_rebuild`"""
+    global _finish_rebuild_script
+    if _finish_rebuild_script is None:
+        _finish_rebuild_script = redis.register_script(FINISH_REBUILD_LUA)
+    key = leaderboard_key(guild_id, board)
+    tmp = f"{key}:rebuild"
+    items = [(str(k), v) for k, v in scores.items()]
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.delete(tmp)
+        for i in range(0, len(items), chunk):
+            pipe.zadd(tmp, dict(items[i:i + chunk]))
+        await _finish_rebuild_script(keys=[tmp, key, pending_key(guild_id, board)], client=pipe)
+        await pipe.execute()
+
+
+async def exists(redis, guild_id: Union[int, str], board: str) -> bool:
+    return bool(await redis.exists(leaderboard_key(guild_id, board)))
+
+
+async def get_rank(redis, guild_id: Union[int, str], board: str, user_id: Union[int, str]) -> Tuple[Optional[int], Optional[float], int]:
+    """(1-based rank or None, score or None, board size) in one round-trip"""
+    key = leaderboard_key(guild_id, board)
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.zrevrank(key, str(user_id))
+        pipe.zscore(key, str(user_id))
+        pipe.zcard(key)
+        rank, score, total = await pipe.execute()
+    return (rank + 1 if rank is not None else None), score, total
+
+
+async def get_page(redis, guild_id: Union[int, str], board: str, page: int = 1, per_page: int = 10) -> Tuple[List[Tuple[int, float]], int]:
+    """Top-N page as [(user_id, score)] plus the board size"""
+    key = leaderboard_key(guild_id, board)
+    start = max(page - 1, 0) * per_page
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.zrevrange(key, start, start + per_page - 1, withscores=True)
+        pipe.zcard(key)
+        entries, total = await pipe.execute()
+    return [(int(member), score) for member, score in entries], total
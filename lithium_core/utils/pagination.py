@@ -0,0 +1,31 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Listings are ordered by ``(created_at DESC, id DESC)``. A cursor encodes the
+sort key of the last row on a page so the next page can be fetched with
+``WHERE (created_at, id) < (:cursor_created_at, :cursor_id)`` instead of an
+``OFFSET`` that grows with page depth.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode a row's sort key as an opaque, URL-safe cursor"""
+    payload = json.dumps({"t": created_at.isoformat(), "i": int(row_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_cursor.
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(data["t"]), int(data["i"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
@@ -0,0 +1,110 @@
+import asyncio
+import os
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from lithium_core.models.economy import EconomyProfile, EconomyTransaction
+from lithium_core.services.economy_service import EconomyService
+
+
+@asynccontextmanager
+async def economy_db():
+    """Session on DATABASE_URL with the economy tables; rows of the test guild are removed afterwards"""
+    db_url = os.getenv("DATABASE_URL")
+    if not db_url:
+        pytest.skip("DATABASE_URL not set")
+
+    engine = create_async_engine(db_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            EconomyProfile.metadata.create_all,
+            tables=[EconomyProfile.__table__, EconomyTransaction.__table__]
+        )
+    guild_id = f"test-{uuid.uuid4().hex}"
+    try:
+        async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+            yield db, guild_id
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(delete(EconomyTransaction).where(EconomyTransaction.guild_id == guild_id))
+            await conn.execute(delete(EconomyProfile).where(EconomyProfile.guild_id == guild_id))
+        await engine.dispose()
+
+
+class TestEconomyService:
+    def test_first_credit_creates_profile(self):
+        async def run():
+            async with economy_db() as (db, guild_id):
+                service = EconomyService(db)
+                assert await service.get_balance(guild_id, "1") == 0.0
+                assert await service.apply(guild_id, "1", 100, "test") == 100
+                assert await service.apply(guild_id, "1", 50, "test") == 150
+
+                ledger = (await db.execute(
+                    select(EconomyTransaction.amount, EconomyTransaction.balance_after)
+                    .where(EconomyTransaction.guild_id == guild_id)
+                    .order_by(EconomyTransaction.id)
+                )).all()
+                assert ledger == [(100, 100), (50, 150)]
+
+        asyncio.run(run())
+
+    def test_insufficient_funds_changes_nothing(self):
+        async def run():
+            async with economy_db() as (db, guild_id):
+                service = EconomyService(db)
+                # No profile yet: a debit cannot create one
+                assert await service.apply(guild_id, "1", -10, "test") is None
+                await service.apply(guild_id, "1", 100, "test")
+
+                assert await service.apply(guild_id, "1", -150, "test") is None
+                # An explicit floor overrides the default of -delta
+                assert await service.apply(guild_id, "1", -50, "test", min_balance=200) is None
+                assert await service.get_balance(guild_id, "1") == 100
+                assert await service.apply(guild_id, "1", -100, "test") == 0
+
+                count = len((await db.execute(
+                    select(EconomyTransaction.id).where(EconomyTransaction.guild_id == guild_id)
+                )).all())
+                assert count == 2
+
+        asyncio.run(run())
+
+    def test_daily_cooldown_boundary(self):
+        async def run():
+            async with economy_db() as (db, guild_id):
+                service = EconomyService(db)
+                cooldown = timedelta(hours=24)
+                balance, last_daily = await service.claim_daily(guild_id, "1", 100, cooldown)
+                assert (balance, last_daily) == (100, None)
+
+                # A second before the cooldown ends the claim is refused with the last claim time
+                claimed_at = datetime.utcnow() - cooldown + timedelta(seconds=1)
+                await db.execute(
+                    update(EconomyProfile)
+                    .where(EconomyProfile.guild_id == guild_id, EconomyProfile.user_id == "1")
+                    .values(last_daily=claimed_at)
+                )
+                await db.commit()
+                assert await service.claim_daily(guild_id, "1", 100, cooldown) == (None, claimed_at)
+
+                # Just past it the claim goes through and the streak continues
+                await db.execute(
+                    update(EconomyProfile)
+                    .where(EconomyProfile.guild_id == guild_id, EconomyProfile.user_id == "1")
+                    .values(last_daily=datetime.utcnow() - cooldown - timedelta(seconds=1))
+                )
+                await db.commit()
+                assert await service.claim_daily(guild_id, "1", 100, cooldown) == (200, None)
+                streak = await db.scalar(
+                    select(EconomyProfile.daily_streak)
+                    .where(EconomyProfile.guild_id == guild_id, EconomyProfile.user_id == "1")
+                )
+                assert streak == 2
+
+        asyncio.run(run())
@@ -0,0 +1,20 @@
+from datetime import date, datetime
+
+from apps.bot.utils.birthdays import announcement_gap, birthday_keys, next_local_midnight, local_today
+
+class TestBirthdayDates:
+    def test_local_midnight_in_utc(self):
+        now = datetime(2026, 10, 19, 22, 30)
+        # Istanbul is UTC+3: it is already the 20th there
+        assert local_today("Europe/Istanbul", now) == date(2026, 10, 20)
+        assert next_local_midnight("Europe/Istanbul", now) == datetime(2026, 10, 20, 21, 0)
+        assert next_local_midnight("UTC", now) == datetime(2026, 10, 20, 0, 0)
+
+    def test_leap_day_birthdays(self):
+        assert birthday_keys(date(2027, 2, 28)) == [(2, 28), (2, 29)]
+        assert birthday_keys(date(2028, 2, 28)) == [(2, 28)]
+
+    def test_announcement_gap(self):
+        assert announcement_gap(1) == 0.0
+        assert announcement_gap(10) == 5.0
+        assert announcement_gap(100000) == 0.5
@@ -0,0 +1,13 @@
+from apps.bot.cluster import split_shards
+
+class TestSplitShards:
+    def test_even_split(self):
+        assert split_shards(8, 4) == [[0, 1], [2, 3], [4, 5], [6, 7]]
+
+    def test_remainder_goes_to_first_clusters(self):
+        slices = split_shards(10, 3)
+        assert [len(s) for s in slices] == [4, 3, 3]
+        assert sum(slices, []) == list(range(10))
+
+    def test_more_clusters_than_shards(self):
+        assert split_shards(2, 8) == [[0], [1]]
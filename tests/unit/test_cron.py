@@ -0,0 +1,33 @@
+from datetime import datetime
+
+import pytest
+
+from apps.bot.utils.cron import CronExpression, is_misfire, jitter_seconds, next_run
+
+class TestCronExpression:
+    def test_steps_and_ranges(self):
+        cron = CronExpression("*/15 9-17 * * mon-fri")
+        # Friday 17:50 -> Monday 09:00
+        assert cron.next_after(datetime(2026, 10, 23, 17, 50)) == datetime(2026, 10, 26, 9, 0)
+        assert cron.next_after(datetime(2026, 10, 26, 9, 0)) == datetime(2026, 10, 26, 9, 15)
+
+    def test_macros_and_month_rollover(self):
+        assert CronExpression("@monthly").next_after(datetime(2026, 12, 15)) == datetime(2027, 1, 1)
+        assert CronExpression("0 12 29 2 *").next_after(datetime(2026, 3, 1)) == datetime(2028, 2, 29, 12, 0)
+
+    def test_day_of_month_or_weekday(self):
+        # The 1st, or any Sunday
+        cron = CronExpression("0 0 1 * 0")
+        assert cron.next_after(datetime(2026, 10, 19)) == datetime(2026, 10, 25)
+
+    def test_invalid(self):
+        for expression in ("* * *", "60 * * * *", "*/0 * * * *"):
+            with pytest.raises(ValueError):
+                CronExpression(expression)
+
+    def test_next_run_jitter_and_misfire(self):
+        jitter = jitter_seconds(42)
+        assert 0 <= jitter <= 30
+        assert next_run("@hourly", datetime(2026, 10, 19, 8, 0, 10), key=42) == datetime(2026, 10, 19, 9, 0, jitter)
+        assert not is_misfire(datetime(2026, 10, 19, 9), datetime(2026, 10, 19, 9, 4), grace=300)
+        assert is_misfire(datetime(2026, 10, 19, 9), datetime(2026, 10, 19, 9, 6), grace=300)
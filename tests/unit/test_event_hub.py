@@ -0,0 +1,63 @@
+import asyncio
+import json
+from apps.api.event_hub import GuildEventHub, Subscription
+
+def _event(event_id):
+    return json.dumps({"id": event_id, "type": "stats_update", "data": {}})
+
+class TestEventHub:
+    def test_bounded_queue_drops_oldest(self):
+        sub = Subscription("1", maxsize=2)
+        for frame in ("a", "b", "c"):
+            sub.push(frame)
+        assert sub.dropped == 1
+        assert [sub.queue.get_nowait(), sub.queue.get_nowait()] == ["b", "c"]
+
+    def test_dispatch_fans_out_and_resumes(self):
+        hub = GuildEventHub(redis_url="redis://unused")
+        first, second = Subscription("1", 10), Subscription("1", 10)
+        hub._subscribers["1"] = {first, second}
+        for event_id in (1, 2, 3):
+            hub._dispatch(b"guild:1:events", _event(event_id).encode())
+        assert first.queue.qsize() == second.queue.qsize() == 3
+
+        late = Subscription("1", 10)
+        assert hub._replay_into(late, "1") is True
+        assert late.queue.get_nowait().startswith("id: 2\n")
+        assert late.queue.qsize() == 1
+
+    def test_resume_gap_requires_snapshot(self):
+        hub = GuildEventHub(redis_url="redis://unused", replay_size=2)
+        hub._subscribers["1"] = {Subscription("1", 10)}
+        for event_id in (5, 6, 7):
+            hub._dispatch("guild:1:events", _event(event_id))
+        assert hub._replay_into(Subscription("1", 10), "3") is False
+        assert hub._replay_into(Subscription("1", 10), None) is False
+
+    def test_resume_after_last_subscriber_left(self):
+        class PubSub:
+            def __init__(self):
+                self.unsubscribed = []
+
+            async def unsubscribe(self, channel):
+                self.unsubscribed.append(channel)
+
+        async def run():
+            hub = GuildEventHub(redis_url="redis://unused", replay_grace=0.05)
+            hub._pubsub = PubSub()
+            only = Subscription("1", 10)
+            hub._subscribers["1"] = {only}
+            hub._dispatch("guild:1:events", _event(1))
+            await hub.unsubscribe(only)
+
+            # Events published while the viewer reconnects are still buffered
+            hub._dispatch("guild:1:events", _event(2))
+            back = Subscription("1", 10)
+            assert hub._replay_into(back, "1") is True
+            assert back.queue.get_nowait().startswith("id: 2\n")
+
+            await asyncio.sleep(0.1)
+            assert "1" not in hub._replay and "1" not in hub._subscribers
+            assert hub._pubsub.unsubscribed == ["guild:1:events"]
+
+        asyncio.run(run())
@@ -0,0 +1,32 @@
+from apps.bot.utils.game_state import BlackjackState, DuelState, GameStore
+
+class TestGameState:
+    def test_hash_round_trip(self):
+        state = BlackjackState.deal(guild_id=1, user_id=2, amount=100, balance=900.0)
+        data = {k.encode(): v.encode() for k, v in state.to_hash().items()}
+        loaded = BlackjackState.from_hash(state.game_id, data)
+        assert loaded.game_id == state.game_id
+        assert loaded.player_hand == state.player_hand
+        assert loaded.deck == state.deck
+        assert (loaded.user_id, loaded.amount, loaded.message_id) == (2, 100, None)
+        # The move counter is stored with the game for GameStore.update
+        assert "version" in state.to_hash() and loaded.version is None
+
+    def test_slots_only(self):
+        state = DuelState(guild_id=1, player1_id=2, player2_id=3)
+        assert not hasattr(state, "__dict__")
+        assert GameStore.key(state.kind, state.game_id) == f"game:duel:{state.game_id}"
+
+    def test_blackjack_scoring(self):
+        assert BlackjackState.calculate_score([11, 11, 9]) == 21
+        state = BlackjackState(deck=[10], player_hand=[10, 9], dealer_hand=[10, 6])
+        # Dealer draws to 26 and busts
+        assert state.dealer_play() == "dealer_bust"
+
+    def test_duel_winner(self):
+        state = DuelState(player1_id=1, player2_id=2, player1_choice="rock", player2_choice="scissors")
+        assert state.winner_id() == 1
+        state.player2_choice = "paper"
+        assert state.winner_id() == 2
+        state.player2_choice = "rock"
+        assert state.winner_id() is None
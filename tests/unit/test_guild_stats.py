@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+import discord
+from apps.bot.utils.guild_stats import GuildStatsTracker
+
+def _member(guild, status):
+    return SimpleNamespace(guild=guild, status=status)
+
+class TestGuildStatsTracker:
+    def setup_method(self):
+        self.guild = SimpleNamespace(id=1, member_count=3, members=[])
+        self.guild.members = [
+            _member(self.guild, discord.Status.online),
+            _member(self.guild, discord.Status.idle),
+            _member(self.guild, discord.Status.offline),
+        ]
+        self.tracker = GuildStatsTracker()
+        self.tracker.recount(self.guild)
+
+    def test_recount(self):
+        assert self.tracker.get(1) == (3, 2)
+
+    def test_join_and_leave(self):
+        self.tracker.member_joined(_member(self.guild, discord.Status.online))
+        assert self.tracker.get(1) == (4, 3)
+        self.tracker.member_left(_member(self.guild, discord.Status.offline))
+        assert self.tracker.get(1) == (3, 3)
+
+    def test_presence_transitions(self):
+        before = _member(self.guild, discord.Status.offline)
+        after = _member(self.guild, discord.Status.dnd)
+        self.tracker.presence_changed(before, after)
+        assert self.tracker.get(1) == (3, 3)
+        # online -> idle does not change the online count
+        self.tracker.presence_changed(after, _member(self.guild, discord.Status.idle))
+        assert self.tracker.get(1) == (3, 3)
+
+    def test_unknown_guild_is_ignored(self):
+        other = SimpleNamespace(id=2)
+        self.tracker.member_joined(_member(other, discord.Status.online))
+        assert self.tracker.get(2) is None
+
+    def test_publish_only_on_change(self):
+        assert self.tracker.should_publish(1, (3, 2)) is True
+        # Not recorded until the write succeeded
+        assert self.tracker.should_publish(1, (3, 2)) is True
+        self.tracker.mark_published(1, (3, 2))
+        assert self.tracker.should_publish(1, (3, 2)) is False
+        assert self.tracker.should_publish(1, (4, 2)) is True
+
+    def test_reconcile_corrects_drift(self):
+        tracker = GuildStatsTracker(reconcile_interval=0)
+        tracker.recount(self.guild)
+        tracker.member_joined(_member(self.guild, discord.Status.online))
+        assert tracker.get(1) == (4, 3)
+        assert tracker.reconcile_due([self.guild]) == 1
+        assert tracker.get(1) == (3, 2)
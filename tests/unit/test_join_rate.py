@@ -0,0 +1,16 @@
+from apps.bot.utils.join_rate import BucketCounter
+
+class TestBucketCounter:
+    def test_sliding_minute(self):
+        counter = BucketCounter(buckets=60, width=1.0)
+        for t in range(10):
+            counter.add(100 + t * 0.5)
+        assert counter.count(104.9) == 10
+        # Buckets for 100-101 expire once the window moves past them
+        assert counter.count(161.0) == 6
+        assert counter.count(200.0) == 0
+
+    def test_gap_longer_than_window(self):
+        counter = BucketCounter(buckets=60, width=1.0)
+        counter.add(0, amount=500)
+        assert counter.add(1000) == 1
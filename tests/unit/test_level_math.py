@@ -0,0 +1,65 @@
+import importlib.util
+import sqlite3
+from pathlib import Path
+
+from apps.bot.utils.level_math import LevelCurve, RewardTable, build_reward_tables, xp_for_level
+
+class TestLevelCurve:
+    def setup_method(self):
+        self.curve = LevelCurve(max_level=10)
+
+    def test_thresholds_are_cumulative(self):
+        assert self.curve.total_for(0) == 0
+        assert self.curve.total_for(1) == 100
+        assert self.curve.total_for(2) == 100 + 155
+
+    def test_level_for_boundaries(self):
+        assert self.curve.level_for(0) == 0
+        assert self.curve.level_for(99) == 0
+        assert self.curve.level_for(100) == 1
+        assert self.curve.level_for(254) == 1
+        assert self.curve.level_for(255) == 2
+
+    def test_overflow_is_kept(self):
+        assert self.curve.progress(300) == (2, 45, xp_for_level(2))
+
+    def test_grows_past_precomputed_levels(self):
+        total = self.curve.total_for(50)
+        assert self.curve.level_for(total) == 50
+        assert self.curve.level_for(total - 1) == 49
+
+class TestRewardTable:
+    def test_roles_up_to(self):
+        table = RewardTable([(10, 3), (5, 2), (20, 4)])
+        assert table.roles_up_to(4) == []
+        assert table.roles_up_to(10) == [2, 3]
+        assert table.roles_up_to(99) == [2, 3, 4]
+
+    def test_build_per_guild(self):
+        tables = build_reward_tables([("1", 5, "11"), ("2", 1, "22"), ("1", 2, "12")])
+        assert tables[1].roles_up_to(5) == [12, 11]
+        assert tables[2].roles_up_to(1) == [22]
+
+class TestTotalXPBackfill:
+    def test_migration_matches_curve(self):
+        path = Path(__file__).parents[2] / "lithium_core/migrations_new/versions/9a4c6e1f2b58_user_levels_total_xp.py"
+        spec = importlib.util.spec_from_file_location("total_xp_migration", path)
+        migration = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(migration)
+
+        curve = LevelCurve()
+        db = sqlite3.connect(":memory:")
+        db.execute("CREATE TABLE user_levels (id INTEGER PRIMARY KEY, xp INTEGER, level INTEGER, total_xp INTEGER)")
+        rows = [(level, level, level * 3) for level in range(0, 300)]
+        db.executemany("INSERT INTO user_levels (id, level, xp) VALUES (?, ?, ?)", rows)
+        db.execute("INSERT INTO user_levels (id, level, xp, total_xp) VALUES (1000, 5, 10, 42)")
+
+        db.execute(migration.BACKFILL_TOTAL_XP)
+        db.execute(migration.BACKFILL_TOTAL_XP)  # second run is a no-op
+
+        for row_id, level, xp, total in db.execute("SELECT id, level, xp, total_xp FROM user_levels"):
+            if row_id == 1000:
+                assert total == 42
+            else:
+                assert total == curve.total_for(level) + xp
+                assert curve.level_for(total) == level
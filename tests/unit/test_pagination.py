@@ -0,0 +1,17 @@
+import pytest
+from datetime import datetime
+from lithium_core.utils.pagination import encode_cursor, decode_cursor
+
+class TestCursor:
+    def test_round_trip(self):
+        created_at = datetime(2026, 1, 4, 12, 30, 15, 123456)
+        cursor = encode_cursor(created_at, 42)
+        assert decode_cursor(cursor) == (created_at, 42)
+
+    def test_cursor_is_url_safe(self):
+        cursor = encode_cursor(datetime(2026, 1, 4), 10**12)
+        assert all(c.isalnum() or c in "-_" for c in cursor)
+
+    def test_invalid_cursor(self):
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
@@ -0,0 +1,32 @@
+import asyncio
+from types import SimpleNamespace
+
+from apps.bot.utils.raid_responder import RaidResponder, chunked
+
+class TestRaidResponder:
+    def test_bans_are_bulk_and_logged_once(self):
+        bulk_calls, records = [], []
+
+        async def bulk_ban(users, **kwargs):
+            bulk_calls.append([u.id for u in users])
+            return SimpleNamespace(banned=[SimpleNamespace(id=u.id) for u in users], failed=[])
+
+        async def record(rows):
+            records.append(rows)
+
+        guild = SimpleNamespace(id=1, bulk_ban=bulk_ban)
+        members = [SimpleNamespace(id=i, guild=guild) for i in range(250)]
+
+        async def run():
+            responder = RaidResponder(record, window=0.01)
+            for member in members:
+                responder.submit(member, "BAN", "raid")
+            await asyncio.sleep(0.05)
+
+        asyncio.run(run())
+        assert [len(c) for c in bulk_calls] == [200, 50]
+        assert len(records) == 1 and len(records[0]) == 250
+        assert records[0][0] == (1, 0, "BAN", "raid")
+
+    def test_chunked(self):
+        assert chunked([1, 2, 3], 2) == [[1, 2], [3]]
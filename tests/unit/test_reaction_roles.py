@@ -0,0 +1,55 @@
+import asyncio
+
+from apps.bot.utils.reaction_roles import ReactionRoleIndex, RoleChangeBatcher
+
+class TestReactionRoleIndex:
+    def test_lookup_and_replace(self):
+        index = ReactionRoleIndex()
+        index.set_menu(1, 10, {"🎮": "100", "🎵": "200"})
+        index.set_menu(2, 20, {"🎨": "300"})
+        assert 10 in index and 99 not in index
+        assert index.role_for(10, "🎵") == 200
+        assert index.role_for(10, "🎨") is None
+
+        index.replace_guild(1, [(11, {"🎮": "100"})])
+        assert 10 not in index and index.role_for(11, "🎮") == 100
+        assert 20 in index
+
+class TestRoleChangeBatcher:
+    def test_burst_is_one_call(self):
+        calls = []
+
+        async def apply(guild_id, member_id, changes):
+            calls.append((guild_id, member_id, changes))
+
+        async def run():
+            batcher = RoleChangeBatcher(apply, delay=0.01)
+            batcher.queue(1, 5, 100, True)
+            batcher.queue(1, 5, 200, True)
+            batcher.queue(1, 5, 100, False)
+            await asyncio.sleep(0.05)
+
+        asyncio.run(run())
+        assert calls == [(1, 5, {100: False, 200: True})]
+
+    def test_changes_during_apply_run_after_it(self):
+        calls, in_flight = [], []
+
+        async def run():
+            async def apply(guild_id, member_id, changes):
+                assert not in_flight, "edits for one member must not overlap"
+                in_flight.append(True)
+                calls.append(changes)
+                if len(calls) == 1:
+                    # A reaction arrives while the first edit is in flight
+                    batcher.queue(1, 5, 200, True)
+                await asyncio.sleep(0.03)
+                in_flight.pop()
+
+            batcher = RoleChangeBatcher(apply, delay=0.01)
+            batcher.queue(1, 5, 100, True)
+            await asyncio.sleep(0.15)
+            assert not batcher.tasks and not batcher.pending
+
+        asyncio.run(run())
+        assert calls == [{100: True}, {200: True}]
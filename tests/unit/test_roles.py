@@ -0,0 +1,22 @@
+from types import SimpleNamespace
+from apps.bot.utils.roles import release_role_list
+
+def _role(role_id, default=False, assignable=True):
+    return SimpleNamespace(id=role_id, is_default=lambda: default, is_assignable=lambda: assignable)
+
+class TestReleaseRoleList:
+    def test_swaps_jail_role_for_previous_roles(self):
+        everyone, jail, booster = _role(0, default=True), _role(1), _role(2)
+        member_role, locked_role = _role(3), _role(4, assignable=False)
+        roles = {r.id: r for r in (everyone, jail, booster, member_role, locked_role)}
+        guild = SimpleNamespace(get_role=roles.get)
+        member = SimpleNamespace(guild=guild, roles=[everyone, jail, booster])
+
+        result = release_role_list(member, jail, ["3", "4", "99"])
+
+        assert result == [booster, member_role]
+
+    def test_no_previous_roles(self):
+        jail = _role(1)
+        member = SimpleNamespace(guild=SimpleNamespace(get_role=lambda _: None), roles=[jail])
+        assert release_role_list(member, jail, None) == []
@@ -0,0 +1,26 @@
+from apps.bot.utils.sticky import StickyState
+
+DEFAULTS = dict(quiet=5, max_wait=30, min_interval=10, max_messages=15)
+
+class TestStickyState:
+    def test_waits_for_quiet(self):
+        state = StickyState(1, 1, "hi")
+        state.note_message(100)
+        state.note_message(103)
+        assert state.due_at(**DEFAULTS) == 108
+
+    def test_max_wait_caps_busy_channels(self):
+        state = StickyState(1, 1, "hi")
+        for t in range(100, 140, 3):
+            if state.pending >= 14:
+                break
+            state.note_message(t)
+        assert state.due_at(**DEFAULTS) == 130
+
+    def test_message_burst_and_min_interval(self):
+        state = StickyState(1, 1, "hi")
+        state.last_post = 100
+        for _ in range(15):
+            state.note_message(101)
+        # Buried by max_messages, but not sooner than min_interval after the last post
+        assert state.due_at(**DEFAULTS) == 110
@@ -0,0 +1,27 @@
+import asyncio
+
+from apps.bot.utils.temp_voice import TempVoiceQueue
+
+class TestTempVoiceQueue:
+    def test_serialises_and_collapses_duplicates(self):
+        calls = []
+
+        async def create(guild_id, member_id):
+            calls.append(("create", guild_id, member_id))
+
+        async def delete(guild_id, channel_id):
+            calls.append(("delete", guild_id, channel_id))
+
+        async def run():
+            queue = TempVoiceQueue(create, delete, min_interval=0)
+            queue.submit_create(1, 10)
+            queue.submit_create(1, 10)
+            queue.submit_delete(1, 99)
+            queue.submit_delete(1, 99)
+            queue.submit_create(2, 20)
+            await asyncio.sleep(0.05)
+            assert not queue.tasks and not queue.pending
+
+        asyncio.run(run())
+        assert [c for c in calls if c[1] == 1] == [("create", 1, 10), ("delete", 1, 99)]
+        assert ("create", 2, 20) in calls
@@ -0,0 +1,55 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from apps.bot.utils.timer_scheduler import TimerHeap, TimerScheduler, retry_at, to_timestamp
+
+class TestTimerHeap:
+    def test_pop_due_groups_by_kind(self):
+        heap = TimerHeap()
+        heap.push("unmute", 1, 10.0)
+        heap.push("unmute", 2, 20.0)
+        heap.push("giveaway", 7, 15.0)
+        assert heap.pop_due(16.0) == {"unmute": [1], "giveaway": [7]}
+        assert heap.next_due() == 20.0
+        assert len(heap) == 1
+
+    def test_reschedule_and_cancel(self):
+        heap = TimerHeap()
+        heap.push("unjail", 1, 10.0)
+        heap.push("unjail", 1, 30.0)
+        heap.push("unjail", 2, 5.0)
+        assert heap.cancel("unjail", 2) is True
+        assert heap.pop_due(20.0) == {}
+        assert heap.next_due() == 30.0
+
+    def test_retry_backs_off_then_gives_up(self):
+        now = datetime(2026, 1, 2, 12, 0)
+        assert retry_at(now, now) == now + timedelta(seconds=60)
+        assert retry_at(now - timedelta(minutes=10), now) == now + timedelta(minutes=10)
+        assert retry_at(now - timedelta(hours=5), now) == now + timedelta(hours=1)
+        assert retry_at(now - timedelta(days=2), now) is None
+
+    def test_naive_datetimes_are_utc(self):
+        naive = datetime(2026, 1, 1, 12, 0)
+        assert to_timestamp(naive) == naive.replace(tzinfo=timezone.utc).timestamp()
+
+class TestTimerScheduler:
+    def test_fires_in_batches(self):
+        fired = []
+
+        async def handler(keys):
+            fired.append(sorted(keys))
+
+        async def loader():
+            return [(1, time.time() - 1), (2, time.time() - 1)]
+
+        async def run():
+            scheduler = TimerScheduler()
+            scheduler.register("unmute", handler, loader)
+            await scheduler.start()
+            scheduler.schedule("unmute", 3, time.time() + 0.05)
+            await asyncio.sleep(0.2)
+            scheduler.stop()
+
+        asyncio.run(run())
+        assert fired == [[1, 2], [3]]
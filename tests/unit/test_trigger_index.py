@@ -0,0 +1,25 @@
+import random
+from apps.bot.utils.trigger_index import TriggerIndex
+
+class TestTriggerIndex:
+    def test_overlapping_triggers(self):
+        index = TriggerIndex([("he", 1), ("she", 2), ("his", 3), ("hers", 4)])
+        assert index.matches("ushers") == {1, 2, 4}
+        assert index.matches("nothing here") == {1}
+
+    def test_case_insensitive(self):
+        index = TriggerIndex([("Hello World", "greet")])
+        assert index.matches("well HELLO world!") == {"greet"}
+
+    def test_empty_triggers_ignored(self):
+        index = TriggerIndex([("", 1), ("a", 2)])
+        assert len(index) == 1
+        assert index.matches("") == set()
+
+    def test_matches_naive_search(self):
+        rng = random.Random(7)
+        triggers = ["".join(rng.choice("ab") for _ in range(rng.randint(1, 4))) for _ in range(30)]
+        index = TriggerIndex((t, i) for i, t in enumerate(triggers))
+        for _ in range(50):
+            text = "".join(rng.choice("abc") for _ in range(20))
+            assert index.matches(text) == {i for i, t in enumerate(triggers) if t in text}
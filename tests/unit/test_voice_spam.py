@@ -0,0 +1,24 @@
+from apps.bot.utils.voice_spam import MAX_THRESHOLD, VoiceJoinTracker
+
+class TestVoiceJoinTracker:
+    def test_threshold_within_interval(self):
+        tracker = VoiceJoinTracker()
+        hits = [tracker.hit("a", t, threshold=3, interval=10) for t in (0, 4, 8)]
+        assert hits == [False, False, True]
+        # Oldest of the last three joins (4) is 11s old
+        tracker.reset("a")
+        hits = [tracker.hit("a", t, threshold=3, interval=10) for t in (4, 9, 15)]
+        assert hits == [False, False, False]
+
+    def test_lru_cap(self):
+        tracker = VoiceJoinTracker(max_members=2)
+        tracker.hit("a", 0, 3, 10)
+        tracker.hit("b", 0, 3, 10)
+        tracker.hit("a", 1, 3, 10)
+        tracker.hit("c", 1, 3, 10)
+        assert len(tracker) == 2 and "b" not in tracker.rings
+
+    def test_threshold_above_cap_uses_cap(self):
+        tracker = VoiceJoinTracker()
+        hits = [tracker.hit("a", t, threshold=MAX_THRESHOLD + 10, interval=100) for t in range(MAX_THRESHOLD)]
+        assert hits[-1] is True and not any(hits[:-1])
@@ -0,0 +1,49 @@
+from apps.bot.utils.xp_accumulator import XPAccumulator
+
+class TestXPAccumulator:
+    def test_cooldown(self):
+        acc = XPAccumulator(cooldown=60)
+        assert acc.award((1, 1), 15, now=0) is not None
+        assert acc.award((1, 1), 15, now=30) is None
+        assert acc.award((1, 1), 15, now=61) is not None
+        assert acc.get((1, 1)).pending == 30
+
+    def test_load_folds_pending_xp(self):
+        acc = XPAccumulator()
+        acc.award((1, 1), 15, now=0)
+        assert acc.unloaded_keys() == [(1, 1)]
+        entry = acc.load((1, 1), xp=100, level=2)
+        assert (entry.xp, entry.level, entry.pending) == (115, 2, 0)
+        assert acc.unloaded_keys() == []
+
+    def test_take_dirty_and_requeue(self):
+        acc = XPAccumulator(cooldown=0)
+        acc.award((1, 1), 15, now=0)
+        acc.load((1, 1), xp=0, level=0)
+        assert acc.take_dirty() == {(1, 1): (15, 0)}
+        assert acc.take_dirty() == {}
+        acc.mark_dirty([(1, 1)])
+        assert acc.take_dirty() == {(1, 1): (15, 0)}
+
+    def test_eviction_keeps_dirty_entries(self):
+        acc = XPAccumulator(max_entries=2)
+        acc.award((1, 1), 15, now=0)
+        acc.load((1, 1), xp=0, level=0)
+        acc.take_dirty()
+        acc.award((1, 2), 15, now=0)
+        acc.award((1, 3), 15, now=0)
+        # The clean entry goes first
+        assert acc.get((1, 1)) is None
+        acc.award((1, 4), 15, now=0)
+        # Everything left is unflushed, so nothing is dropped
+        assert len(acc) == 3
+
+    def test_hard_limit_drops_oldest_unflushed(self):
+        acc = XPAccumulator(max_entries=2, hard_limit=3)
+        for user_id in range(1, 4):
+            acc.award((1, user_id), 15, now=0)
+        assert acc.over_capacity and acc.dropped == 0
+        acc.award((1, 4), 15, now=0)
+        # Flushes never ran: the least recently active entry is given up
+        assert len(acc) == 3 and acc.dropped == 1
+        assert acc.get((1, 1)) is None